@@ -0,0 +1,51 @@
+"""Allow several push subscriptions per user, keyed by endpoint
+
+Revision ID: a6c2e9f07b13
+Revises: f1b7d3a95c28
+Create Date: 2025-10-01 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2e9f07b13'
+down_revision = 'f1b7d3a95c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Подписка теперь принадлежит устройству: у пользователя их может быть несколько
+    op.drop_constraint('push_subscriptions_user_id_key', 'push_subscriptions', type_='unique')
+    op.create_index(op.f('ix_push_subscriptions_user_id'), 'push_subscriptions', ['user_id'], unique=False)
+    
+    # Один endpoint - одна подписка (оставляем самую новую)
+    op.execute("""
+        DELETE FROM push_subscriptions ps
+        USING push_subscriptions newer
+        WHERE ps.endpoint = newer.endpoint
+          AND ps.id < newer.id
+    """)
+    op.create_unique_constraint('uq_push_subscriptions_endpoint', 'push_subscriptions', ['endpoint'])
+    
+    # Учет ошибок доставки по устройству
+    op.add_column('push_subscriptions', sa.Column('failure_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('push_subscriptions', sa.Column('last_failure_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('push_subscriptions', 'last_failure_at')
+    op.drop_column('push_subscriptions', 'failure_count')
+    op.drop_constraint('uq_push_subscriptions_endpoint', 'push_subscriptions', type_='unique')
+    op.drop_index(op.f('ix_push_subscriptions_user_id'), table_name='push_subscriptions')
+    
+    # Оставляем по одной (самой новой) подписке на пользователя
+    op.execute("""
+        DELETE FROM push_subscriptions ps
+        USING push_subscriptions newer
+        WHERE ps.user_id = newer.user_id
+          AND ps.id < newer.id
+    """)
+    op.create_unique_constraint('push_subscriptions_user_id_key', 'push_subscriptions', ['user_id'])
@@ -0,0 +1,95 @@
+"""Add change sequence and tombstones for delta sync
+
+Revision ID: a8d5e2f61c07
+Revises: f4c2a7e95b31
+Create Date: 2025-10-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d5e2f61c07'
+down_revision = 'f4c2a7e95b31'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = (('tasks', 'task'), ('task_steps', 'step'), ('goals', 'goal'))
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE sync_change_seq")
+
+    for table, _ in SYNCED_TABLES:
+        # Существующие строки получают номера при добавлении столбца
+        op.add_column(table, sa.Column(
+            'change_seq', sa.BigInteger(), server_default=sa.text("nextval('sync_change_seq')"), nullable=False
+        ))
+    op.create_index('ix_tasks_user_id_change_seq', 'tasks', ['user_id', 'change_seq'])
+    op.create_index('ix_task_steps_task_id_change_seq', 'task_steps', ['task_id', 'change_seq'])
+    op.create_index('ix_goals_user_id_change_seq', 'goals', ['user_id', 'change_seq'])
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('entity_type', sa.String(16), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('sync_change_seq')"), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    op.create_index('ix_sync_tombstones_user_id_change_seq', 'sync_tombstones', ['user_id', 'change_seq'])
+
+    # Номер изменения выдается базой: так его получают и массовые UPDATE
+    # (просрочка, повторения серий), минуя ORM
+    op.execute("""
+        CREATE FUNCTION sync_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_seq := nextval('sync_change_seq');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Этап удаляется и каскадом вместе с задачей - тогда задачи уже нет,
+    # и достаточно удаления самой задачи
+    op.execute("""
+        CREATE FUNCTION sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            IF TG_ARGV[0] = 'step' THEN
+                INSERT INTO sync_tombstones (user_id, entity_type, entity_id)
+                SELECT tasks.user_id, 'step', OLD.id FROM tasks WHERE tasks.id = OLD.task_id;
+            ELSE
+                INSERT INTO sync_tombstones (user_id, entity_type, entity_id)
+                VALUES (OLD.user_id, TG_ARGV[0], OLD.id);
+            END IF;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table, entity_type in SYNCED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_touch BEFORE UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION sync_touch()"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION sync_tombstone('{entity_type}')"
+        )
+
+
+def downgrade() -> None:
+    for table, _ in SYNCED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_sync_tombstone ON {table}")
+        op.execute(f"DROP TRIGGER {table}_sync_touch ON {table}")
+    op.execute("DROP FUNCTION sync_tombstone()")
+    op.execute("DROP FUNCTION sync_touch()")
+
+    op.drop_index('ix_sync_tombstones_user_id_change_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_index('ix_goals_user_id_change_seq', table_name='goals')
+    op.drop_index('ix_task_steps_task_id_change_seq', table_name='task_steps')
+    op.drop_index('ix_tasks_user_id_change_seq', table_name='tasks')
+    for table, _ in SYNCED_TABLES:
+        op.drop_column(table, 'change_seq')
+    op.execute("DROP SEQUENCE sync_change_seq")
@@ -0,0 +1,30 @@
+"""Add task indexes for the calendar range queries
+
+Revision ID: b3d8e4a61f29
+Revises: a6c2e9f07b13
+Create Date: 2025-10-03 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d8e4a61f29'
+down_revision = 'a6c2e9f07b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Задачи пользователя за период и повторяющиеся задачи пользователя
+    op.create_index('ix_tasks_user_id_deadline', 'tasks', ['user_id', 'deadline'], unique=False)
+    op.create_index(
+        'ix_tasks_user_id_recurring', 'tasks', ['user_id'], unique=False,
+        postgresql_where=sa.text('is_recurring')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_id_recurring', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_deadline', table_name='tasks')
@@ -0,0 +1,108 @@
+"""Assign sync change numbers under a per-user lock
+
+Revision ID: b5e1d7c93f40
+Revises: a8d5e2f61c07
+Create Date: 2025-10-12 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e1d7c93f40'
+down_revision = 'a8d5e2f61c07'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = (('tasks', 'task'), ('task_steps', 'step'), ('goals', 'goal'))
+
+
+def upgrade() -> None:
+    # Номер изменения выдается под блокировкой строки пользователя, которая
+    # держится до конца транзакции: у одного пользователя номера идут в
+    # порядке commit, и курсор синхронизации не обгоняет незавершенные записи
+    op.execute("""
+        CREATE FUNCTION sync_lock_user(entity_type text, entity_user_id integer, task_id integer)
+        RETURNS integer AS $$
+        DECLARE
+            uid integer := entity_user_id;
+        BEGIN
+            IF entity_type = 'step' THEN
+                SELECT tasks.user_id INTO uid FROM tasks WHERE tasks.id = task_id;
+            END IF;
+            PERFORM 1 FROM users WHERE users.id = uid FOR NO KEY UPDATE;
+            RETURN uid;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_touch() RETURNS trigger AS $$
+        BEGIN
+            IF TG_ARGV[0] = 'step' THEN
+                PERFORM sync_lock_user('step', NULL, NEW.task_id);
+            ELSE
+                PERFORM sync_lock_user(TG_ARGV[0], NEW.user_id, NULL);
+            END IF;
+            NEW.change_seq := nextval('sync_change_seq');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Этап удаляется и каскадом вместе с задачей - тогда задачи уже нет,
+    # и достаточно удаления самой задачи
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger AS $$
+        DECLARE
+            uid integer;
+        BEGIN
+            IF TG_ARGV[0] = 'step' THEN
+                uid := sync_lock_user('step', NULL, OLD.task_id);
+            ELSE
+                uid := sync_lock_user(TG_ARGV[0], OLD.user_id, NULL);
+            END IF;
+            IF uid IS NOT NULL THEN
+                INSERT INTO sync_tombstones (user_id, entity_type, entity_id)
+                VALUES (uid, TG_ARGV[0], OLD.id);
+            END IF;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table, entity_type in SYNCED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_sync_touch ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION sync_touch('{entity_type}')"
+        )
+
+
+def downgrade() -> None:
+    for table, _ in SYNCED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_sync_touch ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_touch BEFORE UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION sync_touch()"
+        )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            IF TG_ARGV[0] = 'step' THEN
+                INSERT INTO sync_tombstones (user_id, entity_type, entity_id)
+                SELECT tasks.user_id, 'step', OLD.id FROM tasks WHERE tasks.id = OLD.task_id;
+            ELSE
+                INSERT INTO sync_tombstones (user_id, entity_type, entity_id)
+                VALUES (OLD.user_id, TG_ARGV[0], OLD.id);
+            END IF;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_seq := nextval('sync_change_seq');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP FUNCTION sync_lock_user(text, integer, integer)")
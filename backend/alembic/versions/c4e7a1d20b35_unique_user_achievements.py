@@ -0,0 +1,38 @@
+"""Add unique constraint on user_achievements (user_id, achievement_id)
+
+Revision ID: c4e7a1d20b35
+Revises: b91ddce9a7a2
+Create Date: 2025-09-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a1d20b35'
+down_revision = 'b91ddce9a7a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Удаляем дубликаты, оставшиеся от параллельных проверок достижений (оставляем самую раннюю запись)
+    op.execute("""
+        DELETE FROM user_achievements ua
+        USING user_achievements earlier
+        WHERE ua.user_id = earlier.user_id
+          AND ua.achievement_id = earlier.achievement_id
+          AND ua.id > earlier.id
+    """)
+
+    # Достижение присваивается пользователю не больше одного раза
+    op.create_unique_constraint(
+        'uq_user_achievements_user_achievement',
+        'user_achievements',
+        ['user_id', 'achievement_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_achievements_user_achievement', 'user_achievements', type_='unique')
@@ -0,0 +1,41 @@
+"""Materialize recurring task occurrences
+
+Revision ID: c7f2a9d04e18
+Revises: b3d8e4a61f29
+Create Date: 2025-10-04 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2a9d04e18'
+down_revision = 'b3d8e4a61f29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('recurrence_exdates', postgresql.ARRAY(sa.Date()), nullable=True))
+    op.add_column('tasks', sa.Column('recurrence_materialized_until', sa.Date(), nullable=True))
+    op.add_column('tasks', sa.Column('recurrence_master_id', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('occurrence_date', sa.Date(), nullable=True))
+    op.create_foreign_key(
+        'tasks_recurrence_master_id_fkey', 'tasks', 'tasks',
+        ['recurrence_master_id'], ['id'], ondelete='SET NULL'
+    )
+    # Повторения создаются идемпотентно: ON CONFLICT по (recurrence_master_id, occurrence_date)
+    op.create_unique_constraint(
+        'uq_tasks_recurrence_occurrence', 'tasks', ['recurrence_master_id', 'occurrence_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_tasks_recurrence_occurrence', 'tasks', type_='unique')
+    op.drop_constraint('tasks_recurrence_master_id_fkey', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'occurrence_date')
+    op.drop_column('tasks', 'recurrence_master_id')
+    op.drop_column('tasks', 'recurrence_materialized_until')
+    op.drop_column('tasks', 'recurrence_exdates')
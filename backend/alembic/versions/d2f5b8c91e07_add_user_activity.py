@@ -0,0 +1,33 @@
+"""Add user_activity table with daily activity bitmap
+
+Revision ID: d2f5b8c91e07
+Revises: c4e7a1d20b35
+Create Date: 2025-09-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f5b8c91e07'
+down_revision = 'c4e7a1d20b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Битовая строка дней активности пользователя.
+    # Строки заполняются по истории задач при первом обращении
+    op.create_table('user_activity',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('bitmap', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_activity')
@@ -0,0 +1,25 @@
+"""Add per-user data version for conditional GETs
+
+Revision ID: e3b9f6c12a47
+Revises: d5a1c8e37b64
+Create Date: 2025-10-06 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9f6c12a47'
+down_revision = 'd5a1c8e37b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Значение по умолчанию - константа, поэтому столбец добавляется без перезаписи таблицы
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,42 @@
+"""Add user_points table for the leaderboard
+
+Revision ID: e8a3c6f41d92
+Revises: d2f5b8c91e07
+Create Date: 2025-09-22 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3c6f41d92'
+down_revision = 'd2f5b8c91e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Очки достижений пользователя, поддерживаются при каждом присвоении
+    op.create_table('user_points',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_points_points'), 'user_points', ['points'], unique=False)
+    
+    # Заполняем по уже полученным достижениям
+    op.execute("""
+        INSERT INTO user_points (user_id, points)
+        SELECT ua.user_id, SUM(a.points)
+        FROM user_achievements ua
+        JOIN achievements a ON a.id = ua.achievement_id
+        GROUP BY ua.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_points_points'), table_name='user_points')
+    op.drop_table('user_points')
@@ -0,0 +1,33 @@
+"""Add automatic progress task filters to goals
+
+Revision ID: f1b7d3a95c28
+Revises: e8a3c6f41d92
+Create Date: 2025-09-26 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7d3a95c28'
+down_revision = 'e8a3c6f41d92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Фильтр задач для автоматического прогресса цели; типы enum уже созданы для tasks
+    tasktype = postgresql.ENUM(name='tasktype', create_type=False)
+    taskpriority = postgresql.ENUM(name='taskpriority', create_type=False)
+    
+    op.add_column('goals', sa.Column('auto_progress', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.add_column('goals', sa.Column('task_type_filter', tasktype, nullable=True))
+    op.add_column('goals', sa.Column('task_priority_filter', taskpriority, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('goals', 'task_priority_filter')
+    op.drop_column('goals', 'task_type_filter')
+    op.drop_column('goals', 'auto_progress')
@@ -0,0 +1,52 @@
+"""Add per-user task counters
+
+Revision ID: f4c2a7e95b31
+Revises: e3b9f6c12a47
+Create Date: 2025-10-08 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c2a7e95b31'
+down_revision = 'e3b9f6c12a47'
+branch_labels = None
+depends_on = None
+
+STATUSES = ('pending', 'in_progress', 'completed', 'overdue')
+PRIORITIES = ('yearly_debt', 'semester_debt', 'current')
+TYPES = ('coursework', 'exam', 'laboratory', 'lecture', 'seminar', 'project', 'homework', 'other')
+
+
+def upgrade() -> None:
+    counters = (
+        ['total', 'created']
+        + [f'status_{value}' for value in STATUSES]
+        + [f'priority_{value}' for value in PRIORITIES]
+        + [f'type_{value}' for value in TYPES]
+    )
+    op.create_table(
+        'user_task_counters',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in counters],
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+
+    # Начальные значения - по существующим задачам
+    aggregates = (
+        ['count(tasks.id)', 'count(tasks.id) FILTER (WHERE tasks.occurrence_date IS NULL)']
+        + [f"count(tasks.id) FILTER (WHERE coalesce(tasks.status, 'pending') = '{value}')" for value in STATUSES]
+        + [f"count(tasks.id) FILTER (WHERE tasks.priority = '{value}')" for value in PRIORITIES]
+        + [f"count(tasks.id) FILTER (WHERE tasks.task_type = '{value}')" for value in TYPES]
+    )
+    op.execute(
+        f"INSERT INTO user_task_counters (user_id, {', '.join(counters)}) "
+        f"SELECT users.id, {', '.join(aggregates)} "
+        "FROM users LEFT OUTER JOIN tasks ON tasks.user_id = users.id GROUP BY users.id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_task_counters')
@@ -1,9 +1,12 @@
 from fastapi import APIRouter
-from .endpoints import auth, tasks, achievements, goals
+from .endpoints import auth, tasks, achievements, goals, leaderboard, sync, dashboard
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(achievements.router, prefix="/achievements", tags=["achievements"])
-api_router.include_router(goals.router, prefix="/goals", tags=["goals"]) 
\ No newline at end of file
+api_router.include_router(goals.router, prefix="/goals", tags=["goals"])
+api_router.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
\ No newline at end of file
@@ -0,0 +1,53 @@
+import hashlib
+import time
+from typing import Callable, Union
+from fastapi import Depends, HTTPException, Request, Response
+
+from ...core.config import settings
+from ...schemas.user import User
+from .endpoints.auth import get_current_user
+
+# Ответ можно хранить, но перед использованием нужно проверить ETag
+CACHE_CONTROL = "private, no-cache"
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Слабое сравнение: W/ не учитывается
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def user_etag(time_dependent: Union[bool, Callable[[Request], bool]] = False) -> Callable[..., str]:
+    """
+    Зависимость условного GET для данных пользователя.
+    
+    ETag строится из data_version пользователя (увеличивается при любом
+    изменении задач, целей и достижений), пути и параметров запроса.
+    Пользователь уже загружен get_current_user, поэтому при совпадении
+    If-None-Match ответ 304 отдается до запросов самого эндпоинта.
+    Для ответов, зависящих от текущего времени (ближайшие и просроченные
+    задачи), в ETag входит номер интервала ETAG_TIME_BUCKET_SECONDS;
+    time_dependent может быть функцией от запроса, если это зависит от параметров.
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        current_user: User = Depends(get_current_user)
+    ) -> str:
+        variant = f"{settings.VERSION}|{request.url.path}|{request.url.query}"
+        if time_dependent(request) if callable(time_dependent) else time_dependent:
+            variant += f"|{int(time.time()) // settings.ETAG_TIME_BUCKET_SECONDS}"
+        digest = hashlib.blake2b(variant.encode(), digest_size=8).hexdigest()
+        etag = f'W/"{current_user.id}-{current_user.data_version}-{digest}"'
+        
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
+        return etag
+    
+    return dependency
@@ -1,10 +1,14 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from ....core.config import settings
 from ....crud import achievement as crud_achievement
+from ....crud import activity as crud_activity
 from ....db.session import get_db
 from ....schemas.user import User
-from ....schemas.achievement import Achievement, UserAchievement, UserStats
+from ....schemas.achievement import Achievement, UserAchievement, UserStats, ActivityHeatmap
+from ....services.achievement_catalog import achievement_catalog
+from ..conditional import user_etag
 from .auth import get_current_user
 
 router = APIRouter()
@@ -12,15 +16,25 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Achievement])
 def read_achievements(
+    request: Request,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Получить все доступные достижения
     """
-    return crud_achievement.get_all_achievements(db)
+    catalog = achievement_catalog.get(db)
+    headers = {
+        "ETag": catalog.etag,
+        "Cache-Control": f"public, max-age={settings.ACHIEVEMENT_CATALOG_MAX_AGE}"
+    }
+    
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
 
 
-@router.get("/user", response_model=List[UserAchievement])
+@router.get("/user", response_model=List[UserAchievement], dependencies=[Depends(user_etag())])
 def read_user_achievements(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -43,6 +57,18 @@ def read_user_stats(
     return UserStats(**stats)
 
 
+@router.get("/activity", response_model=ActivityHeatmap)
+def read_activity_heatmap(
+    days: int = Query(365, ge=1, le=3660),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить тепловую карту активности и серии дней текущего пользователя
+    """
+    return crud_activity.get_heatmap(db, current_user.id, days)
+
+
 @router.post("/check")
 def check_achievements(
     db: Session = Depends(get_db),
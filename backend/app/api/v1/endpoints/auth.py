@@ -143,12 +143,16 @@ def save_push_subscription(
     """
     Сохранить push-подписку для уведомлений
     """
-    success = crud_user.save_push_subscription(
+    changed = crud_user.save_push_subscription(
         db, current_user.id, subscription.endpoint, subscription.keys['p256dh'], subscription.keys['auth']
     )
-    if not success:
+    if changed is None:
         raise HTTPException(status_code=400, detail="Ошибка сохранения подписки")
     
+    # PWA переподписывается при каждой загрузке - приветствие только для новой подписки
+    if not changed:
+        return {"message": "Push-подписка не изменилась"}
+    
     # Отправляем тестовое уведомление асинхронно
     import asyncio
     try:
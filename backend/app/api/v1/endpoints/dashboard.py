@@ -0,0 +1,34 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ....db.session import get_db
+from ....schemas.user import User
+from ....schemas.dashboard import Dashboard
+from ....services.dashboard import SECTIONS, dashboard_service
+from ..conditional import user_etag
+from .auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=Dashboard,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(user_etag(time_dependent=True))]
+)
+async def read_dashboard(
+    fields: Optional[str] = Query(None, description="Разделы через запятую: " + ", ".join(SECTIONS)),
+    days: int = Query(7, ge=1, le=365, description="Количество дней вперед для ближайших задач"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить данные главной страницы: пользователя, ближайшие и просроченные
+    задачи, статистику и цели. Без fields возвращаются все разделы.
+    """
+    requested = set(SECTIONS) if fields is None else {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные разделы: {', '.join(sorted(unknown))}")
+    return await dashboard_service.build(db, current_user, requested, days)
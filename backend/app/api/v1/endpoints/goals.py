@@ -4,13 +4,14 @@ from sqlalchemy.orm import Session
 from ....crud import goal as crud_goal
 from ....db.session import get_db
 from ....schemas.user import User
-from ....schemas.goal import Goal, GoalCreate, GoalUpdate, GoalProgressUpdate
+from ....schemas.goal import Goal, GoalCreate, GoalUpdate, GoalProgressUpdate, GoalProgressBatch
+from ..conditional import user_etag
 from .auth import get_current_user
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Goal])
+@router.get("/", response_model=List[Goal], dependencies=[Depends(user_etag())])
 def read_goals(
     skip: int = 0,
     limit: int = 100,
@@ -36,7 +37,25 @@ def create_goal(
     return crud_goal.create_goal(db, goal, current_user.id)
 
 
-@router.get("/{goal_id}", response_model=Goal)
+@router.post("/progress", response_model=List[Goal])
+def apply_goals_progress(
+    progress_batch: GoalProgressBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Обновить прогресс нескольких целей одним запросом (все или ни одной)
+    """
+    increments = {}
+    for item in progress_batch.items:
+        increments[item.goal_id] = increments.get(item.goal_id, 0) + item.increment
+    goals = crud_goal.apply_goal_progress(db, current_user.id, increments)
+    if goals is None:
+        raise HTTPException(status_code=404, detail="Цель не найдена")
+    return goals
+
+
+@router.get("/{goal_id}", response_model=Goal, dependencies=[Depends(user_etag())])
 def read_goal(
     goal_id: int,
     db: Session = Depends(get_db),
@@ -0,0 +1,52 @@
+from typing import Any, List, Tuple
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from ....crud import points as crud_points
+from ....db.session import get_db
+from ....schemas.user import User
+from ....schemas.leaderboard import LeaderboardEntry, LeaderboardPage, LeaderboardAround
+from ....services.leaderboard import leaderboard
+from .auth import get_current_user
+
+router = APIRouter()
+
+
+def _entries(db: Session, rows: List[Tuple[int, int, int]]) -> List[LeaderboardEntry]:
+    names = crud_points.get_user_names(db, [user_id for _, user_id, _ in rows])
+    return [
+        LeaderboardEntry(rank=rank, user_id=user_id, full_name=names.get(user_id), points=points)
+        for rank, user_id, points in rows
+    ]
+
+
+@router.get("/", response_model=LeaderboardPage)
+def read_leaderboard(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить рейтинг пользователей по очкам достижений
+    """
+    rows = leaderboard.top(db, limit, offset)
+    return LeaderboardPage(total_users=leaderboard.total, entries=_entries(db, rows))
+
+
+@router.get("/me", response_model=LeaderboardAround)
+def read_my_position(
+    radius: int = Query(5, ge=0, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить место текущего пользователя и соседей по рейтингу
+    """
+    rank, rows = leaderboard.around(db, current_user.id, radius)
+    points = next((p for _, user_id, p in rows if user_id == current_user.id), 0)
+    return LeaderboardAround(
+        total_users=leaderboard.total,
+        rank=rank,
+        points=points,
+        entries=_entries(db, rows)
+    )
@@ -0,0 +1,47 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ....crud import sync as crud_sync
+from ....core.config import settings
+from ....db.session import get_db
+from ....schemas.user import User
+from ....schemas.sync import SyncChanges, SyncMutationBatch, SyncMutationResults
+from ..conditional import user_etag
+from .auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SyncChanges, dependencies=[Depends(user_etag())])
+def read_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить изменения задач, этапов и целей после курсора since
+    (0 - первая загрузка). Клиент сохраняет cursor из ответа и передает
+    его в следующем запросе; при has_more запрос повторяется сразу.
+    """
+    return crud_sync.get_changes(db, current_user.id, since, limit)
+
+
+@router.post("/mutations", response_model=SyncMutationResults)
+def apply_mutations(
+    batch: SyncMutationBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Применить очередь офлайн-изменений одним запросом: изменения
+    выполняются по порядку в одной транзакции, для каждого возвращается
+    результат (applied, conflict, not_found, invalid)
+    """
+    if len(batch.mutations) > settings.SYNC_MAX_MUTATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Слишком много изменений в пакете (максимум {settings.SYNC_MAX_MUTATIONS})"
+        )
+    results = crud_sync.apply_mutations(db, current_user.id, batch.mutations)
+    return SyncMutationResults(results=results)
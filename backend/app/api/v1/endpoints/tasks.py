@@ -1,27 +1,56 @@
-from typing import List, Optional, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Any, Union
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from ....core.config import settings
+from ....core.serialization import json_response
 from ....crud import task as crud_task
 from ....db.session import get_db
 from ....schemas.user import User
-from ....schemas.task import Task, TaskCreate, TaskUpdate, TaskFilter, TaskStats, TaskStep
+from ....schemas.task import (
+    Task, TaskCreate, TaskUpdate, TaskFilter, TaskStats, TaskStep, CalendarOccurrence, TaskSearchPage, TaskSummary
+)
+from ..conditional import user_etag
 from .auth import get_current_user
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Task])
+def task_fields(
+    fields: Optional[str] = Query(
+        None, description="Поля задач через запятую - сокращенное представление (id, title, deadline, color, ...)"
+    )
+) -> Optional[List[str]]:
+    """Запрошенные поля сокращенного представления задач; None - полные задачи"""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in crud_task.TASK_SUMMARY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля задачи: {', '.join(unknown)}")
+    return names
+
+
+# Фильтр по просрочке зависит от текущего времени
+@router.get(
+    "/", response_model=Union[List[Task], List[TaskSummary]], response_model_exclude_unset=True,
+    dependencies=[Depends(user_etag(time_dependent=lambda request: request.query_params.get("status") == "overdue"))]
+)
 def read_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     task_type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    fields: Optional[List[str]] = Depends(task_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
-    Получить список задач пользователя с фильтрацией
+    Получить список задач пользователя с фильтрацией; с fields - только
+    указанные поля задач. Список сериализуется напрямую из строк запроса,
+    response_model описывает ответ в документации.
     """
     filters = TaskFilter()
     if task_type:
@@ -32,9 +61,9 @@ def read_tasks(
         filters.status = status
     
     tasks = crud_task.get_tasks(
-        db=db, user_id=current_user.id, skip=skip, limit=limit, filters=filters
+        db=db, user_id=current_user.id, skip=skip, limit=limit, filters=filters, fields=fields
     )
-    return tasks
+    return json_response(tasks, response)
 
 
 @router.post("/", response_model=Task)
@@ -49,7 +78,69 @@ def create_task(
     return crud_task.create_task(db=db, task=task, user_id=current_user.id)
 
 
-@router.get("/{task_id}", response_model=Task)
+@router.get("/calendar", response_model=List[CalendarOccurrence])
+def read_calendar(
+    date_from: datetime = Query(..., alias="from"),
+    date_to: datetime = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Получить задачи за период [from, to) с развернутыми повторениями
+    (представления календаря: день, неделя, месяц)
+    """
+    if date_from.tzinfo is None:
+        date_from = date_from.replace(tzinfo=timezone.utc)
+    if date_to.tzinfo is None:
+        date_to = date_to.replace(tzinfo=timezone.utc)
+    
+    if date_to <= date_from:
+        raise HTTPException(status_code=400, detail="Конец периода должен быть позже начала")
+    if date_to - date_from > timedelta(days=settings.CALENDAR_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Период не может быть длиннее {settings.CALENDAR_MAX_RANGE_DAYS} дней"
+        )
+    
+    return crud_task.get_calendar(db=db, user_id=current_user.id, date_from=date_from, date_to=date_to)
+
+
+@router.get("/search", response_model=TaskSearchPage)
+def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Поиск задач по названию и описанию, лучшие совпадения первыми.
+    Для следующей страницы передайте next_cursor из ответа.
+    """
+    position = None
+    if cursor:
+        try:
+            position = crud_task.decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Неверный курсор страницы")
+    
+    return crud_task.search_tasks(db=db, user_id=current_user.id, q=q, limit=limit, cursor=position)
+
+
+@router.get("/search/suggest", response_model=List[str])
+def suggest_tasks(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Подсказки названий задач по началу слова (автодополнение поиска)
+    """
+    return crud_task.suggest_task_titles(db=db, user_id=current_user.id, prefix=q, limit=limit)
+
+
+@router.get("/{task_id}", response_model=Task, dependencies=[Depends(user_etag())])
 def read_task(
     task_id: int,
     db: Session = Depends(get_db),
@@ -97,30 +188,42 @@ def delete_task(
     return {"message": "Задача удалена"}
 
 
-@router.get("/upcoming/list", response_model=List[Task])
+@router.get(
+    "/upcoming/list", response_model=Union[List[Task], List[TaskSummary]], response_model_exclude_unset=True,
+    dependencies=[Depends(user_etag(time_dependent=True))]
+)
 def read_upcoming_tasks(
+    response: Response,
     days: int = Query(7, description="Количество дней вперед"),
+    fields: Optional[List[str]] = Depends(task_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Получить ближайшие задачи
     """
-    return crud_task.get_upcoming_tasks(db=db, user_id=current_user.id, days=days)
+    tasks = crud_task.get_upcoming_tasks(db=db, user_id=current_user.id, days=days, fields=fields)
+    return json_response(tasks, response)
 
 
-@router.get("/overdue/list", response_model=List[Task])
+@router.get(
+    "/overdue/list", response_model=Union[List[Task], List[TaskSummary]], response_model_exclude_unset=True,
+    dependencies=[Depends(user_etag(time_dependent=True))]
+)
 def read_overdue_tasks(
+    response: Response,
+    fields: Optional[List[str]] = Depends(task_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Получить просроченные задачи
     """
-    return crud_task.get_overdue_tasks(db=db, user_id=current_user.id)
+    tasks = crud_task.get_overdue_tasks(db=db, user_id=current_user.id, fields=fields)
+    return json_response(tasks, response)
 
 
-@router.get("/stats/summary", response_model=TaskStats)
+@router.get("/stats/summary", response_model=TaskStats, dependencies=[Depends(user_etag(time_dependent=True))])
 def read_task_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -142,7 +245,7 @@ def complete_task_step(
     """
     Отметить этап задачи как выполненный/невыполненный
     """
-    step = crud_task.update_task_step(db=db, step_id=step_id, is_completed=is_completed)
+    step = crud_task.update_task_step(db=db, step_id=step_id, is_completed=is_completed, user_id=current_user.id)
     if not step:
         raise HTTPException(status_code=404, detail="Этап задачи не найден")
     return {"message": "Статус этапа обновлен"} 
\ No newline at end of file
@@ -42,7 +42,41 @@ class Settings(BaseSettings):
     VAPID_PRIVATE_KEY: Optional[str] = None
     VAPID_PUBLIC_KEY: Optional[str] = None
     VAPID_SUBJECT: str = "mailto:admin@studentplanner.ru"
-    
+
+    # Группировка уведомлений в дайджест
+    NOTIFICATION_DIGEST_MAX_ITEMS: int = 10  # максимум пунктов в одном дайджесте
+    NOTIFICATION_DIGEST_MAX_DELAY: float = 5.0  # максимальная задержка отправки, секунды
+
+    # Массовая рассылка push-уведомлений
+    PUSH_ENCRYPTION_WORKERS: int = 2  # процессов для шифрования, 0 - шифровать в основном процессе
+    PUSH_ENCRYPTION_BATCH_SIZE: int = 64  # сообщений на один вызов пула
+    PUSH_SEND_CONCURRENCY: int = 100  # одновременных HTTP-запросов к push-сервисам
+    PUSH_CHECK_CONNECTIVITY: bool = True  # проверять доступность интернета перед рассылкой
+    PUSH_SEND_TIMEOUT: float = 10.0  # таймаут запроса к push-сервису одного устройства, секунды
+    PUSH_DEVICE_FAILURE_THRESHOLD: int = 3  # ошибок подряд, после которых устройство откладывается
+    PUSH_DEVICE_BACKOFF_SECONDS: int = 300  # начальная пауза для ненадежного устройства, удваивается
+    PUSH_DEVICE_MAX_BACKOFF_SECONDS: int = 86400  # максимальная пауза
+
+    # Фоновые задачи
+    SCHEDULER_SCAN_CHUNK_SIZE: int = 1000  # строк на одну пачку при потоковом чтении
+    TASK_COUNTERS_RECONCILE_CHUNK_SIZE: int = 5000  # пользователей на одну пачку сверки счетчиков задач
+
+    # Достижения
+    ACHIEVEMENT_CATALOG_MAX_AGE: int = 3600  # Cache-Control max-age каталога, секунды
+    ACHIEVEMENT_SWEEP_CHUNK_SIZE: int = 5000  # пользователей на одну пачку ночной проверки
+    LEADERBOARD_REFRESH_SECONDS: int = 60  # как часто перечитывать user_points (изменения других процессов)
+
+    # Календарь
+    CALENDAR_MAX_RANGE_DAYS: int = 366  # максимальная длина запрашиваемого периода, дни
+    CALENDAR_CACHE_TTL_SECONDS: int = 60  # срок жизни кэша (изменения других процессов)
+    RECURRENCE_HORIZON_WEEKS: int = 8  # на сколько недель вперед создаются повторения задач
+
+    # Условные GET-запросы
+    ETAG_TIME_BUCKET_SECONDS: int = 60  # шаг времени в ETag ответов, зависящих от текущего момента
+
+    # Синхронизация офлайн-клиентов
+    SYNC_MAX_MUTATIONS: int = 200  # изменений в одном пакете
+
     # Telegram
     TELEGRAM_BOT_TOKEN: Optional[str] = None
     
@@ -0,0 +1,23 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+# Время в UTC - с суффиксом Z, как у pydantic
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class JSONResponse(ORJSONResponse):
+    """Ответ API по умолчанию: JSON через orjson (datetime, date и Enum - без jsonable_encoder)"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def json_response(content, response: Response) -> JSONResponse:
+    """
+    Готовый ответ из словарей и списков в обход проверки response_model.
+    Для списков, построенных из строк запроса (crud), когда валидация
+    pydantic и jsonable_encoder - основная часть времени ответа.
+    Заголовки, выставленные зависимостями (ETag), переносятся в ответ.
+    """
+    return JSONResponse(content, headers=dict(response.headers))
@@ -1,10 +1,18 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func, distinct
+from sqlalchemy import and_, desc, func, distinct, select, literal, union_all, values, column, Integer, String
+from sqlalchemy.dialects.postgresql import insert
 from ..db.models.goal import Achievement, UserAchievement, Goal
-from ..db.models.task import Task, TaskStatus
+from ..db.models.task_counters import UserTaskCounters
 from ..db.models.user import User
-from datetime import datetime, timedelta
+from ..db.models.activity import UserActivity
+from ..services.achievement_catalog import achievement_catalog
+from ..services.leaderboard import leaderboard
+from .activity import get_streaks
+from .points import add_points, add_points_bulk, get_user_points
+from .task_counters import get_counter_values
+from .user import bump_data_version
+from datetime import datetime, timedelta, timezone
 
 
 def get_all_achievements(db: Session) -> List[Achievement]:
@@ -21,113 +29,197 @@ def get_user_achievements(db: Session, user_id: int) -> List[UserAchievement]:
 
 def award_achievement(db: Session, user_id: int, achievement_id: int) -> UserAchievement:
     """Присвоить достижение пользователю"""
-    # Проверяем, есть ли уже это достижение у пользователя
-    existing = db.query(UserAchievement).filter(
+    awarded = award_achievements(db, user_id, [achievement_id])
+    if awarded:
+        return awarded[0]
+    
+    # Достижение уже было получено раньше
+    return db.query(UserAchievement).filter(
         and_(
             UserAchievement.user_id == user_id,
             UserAchievement.achievement_id == achievement_id
         )
     ).first()
+
+
+def award_achievements(db: Session, user_id: int, achievement_ids: List[int]) -> List[UserAchievement]:
+    """
+    Присвоить несколько достижений одним запросом.
+    Уже полученные достижения пропускаются уникальным ключом (user_id, achievement_id),
+    возвращаются только новые.
+    """
+    if not achievement_ids:
+        return []
     
-    if existing:
-        return existing
+    stmt = insert(UserAchievement).values([
+        {"user_id": user_id, "achievement_id": achievement_id, "earned_at": datetime.now()}
+        for achievement_id in dict.fromkeys(achievement_ids)
+    ]).on_conflict_do_nothing(
+        index_elements=[UserAchievement.user_id, UserAchievement.achievement_id]
+    ).returning(UserAchievement)
     
-    user_achievement = UserAchievement(
-        user_id=user_id,
-        achievement_id=achievement_id,
-        earned_at=datetime.now()
-    )
-    db.add(user_achievement)
+    awarded = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    
+    # Очки рейтинга увеличиваются в той же транзакции
+    total_points = None
+    if awarded:
+        points_by_id = achievement_catalog.get(db).points_by_id
+        gained = sum(points_by_id.get(ua.achievement_id, 0) for ua in awarded)
+        total_points = add_points(db, user_id, gained)
+        bump_data_version(db, user_id)
     db.commit()
-    db.refresh(user_achievement)
-    return user_achievement
+    
+    if total_points is not None:
+        leaderboard.set_points(user_id, total_points)
+    return awarded
 
 
 def get_user_stats(db: Session, user_id: int) -> Dict[str, Any]:
     """Получить статистику пользователя для достижений"""
-    # Базовая статистика задач
-    total_tasks = db.query(Task).filter(Task.user_id == user_id).count()
-    completed_tasks = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.status == TaskStatus.completed)
-    ).count()
-    pending_tasks = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.status == TaskStatus.pending)
-    ).count()
-    overdue_tasks = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.status == TaskStatus.overdue)
-    ).count()
+    # Базовая статистика задач - из счетчиков пользователя
+    task_counters = get_counter_values(db, user_id)
+    total_tasks = task_counters["total"]
+    completed_tasks = task_counters["status_completed"]
+    pending_tasks = task_counters["status_pending"]
+    overdue_tasks = task_counters["status_overdue"]
     
     # Статистика целей
     completed_goals = db.query(Goal).filter(
         and_(Goal.user_id == user_id, Goal.is_completed == True)
     ).count()
     
-    # Подсчет очков
-    user_achievements = db.query(UserAchievement).filter(
+    # Очки и количество достижений
+    total_points = get_user_points(db, user_id)
+    achievements_count = db.query(UserAchievement).filter(
         UserAchievement.user_id == user_id
-    ).all()
-    
-    total_points = 0
-    for ua in user_achievements:
-        achievement = db.query(Achievement).filter(Achievement.id == ua.achievement_id).first()
-        if achievement:
-            total_points += achievement.points
+    ).count()
     
     # Расчет completion_rate
     completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
-    # Подсчет streak (упрощенная версия - количество выполненных задач за последние 7 дней)
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_completed = db.query(Task).filter(
-        and_(
-            Task.user_id == user_id,
-            Task.status == TaskStatus.completed,
-            Task.completed_at >= week_ago
-        )
-    ).count()
+    # Серии дней по битовой строке активности, без сканирования задач
+    streaks = get_streaks(db, user_id)
     
     return {
+        "created_tasks": task_counters["created"],
         "total_tasks": total_tasks,
         "completed_tasks": completed_tasks,
         "pending_tasks": pending_tasks,
         "overdue_tasks": overdue_tasks,
         "completion_rate": round(completion_rate, 1),
-        "current_streak": recent_completed,  # Упрощенная версия streak
+        "current_streak": streaks["current_streak"],
+        "longest_streak": streaks["longest_streak"],
         "total_points": total_points,
-        "achievements_count": len(user_achievements),
+        "achievements_count": achievements_count,
         "completed_goals": completed_goals
     }
 
 
 def check_and_award_achievements(db: Session, user_id: int) -> List[UserAchievement]:
     """Проверить и присвоить новые достижения пользователю"""
-    new_achievements = []
+    from ..services.achievement_engine import (
+        achievement_engine, achievement_index, TASKS_CREATED, TASKS_COMPLETED, GOALS_COMPLETED, STREAK_DAYS
+    )
+    
     stats = get_user_stats(db, user_id)
+    counters = {
+        TASKS_COMPLETED: stats["completed_tasks"],
+        # Повторения серий создает планировщик - в счетчик созданных задач они не входят
+        TASKS_CREATED: stats["created_tasks"],
+        STREAK_DAYS: stats["current_streak"],
+        GOALS_COMPLETED: stats["completed_goals"],
+    }
+    
+    # Полный пересчет дает точные счетчики - дальше движок работает с ними инкрементально
+    for condition_type in (TASKS_CREATED, TASKS_COMPLETED, GOALS_COMPLETED, STREAK_DAYS):
+        achievement_engine.remember(user_id, condition_type, counters[condition_type])
+    
+    # Пороги берем из индекса: только достигнутые достижения каждого типа
+    candidates = [
+        achievement_id
+        for condition_type, value in counters.items()
+        for achievement_id in achievement_index.reached(db, condition_type, value)
+    ]
+    if not candidates:
+        return []
+    
+    return award_achievements(db, user_id, candidates)
+
+
+def sweep_achievements(db: Session, user_id_from: int, user_id_to: int) -> List[Tuple[int, int]]:
+    """
+    Проверить достижения всех пользователей с id в [user_id_from, user_id_to]
+    одним INSERT ... SELECT: счетчики пользователей соединяются с порогами
+    каталога, уже полученные достижения пропускаются уникальным ключом.
+    Возвращает пары (user_id, achievement_id) новых достижений.
+    """
+    from ..services.achievement_engine import TASKS_CREATED, TASKS_COMPLETED, GOALS_COMPLETED, STREAK_DAYS
+    from ..services.activity_bitmap import ActivityBitmap
+    
+    task_counts = select(
+        UserTaskCounters.user_id,
+        UserTaskCounters.created,
+        UserTaskCounters.status_completed.label("completed")
+    ).where(
+        UserTaskCounters.user_id.between(user_id_from, user_id_to)
+    ).cte("task_counts")
+    
+    goal_counts = select(
+        Goal.user_id,
+        func.count().label("completed")
+    ).where(
+        and_(Goal.user_id.between(user_id_from, user_id_to), Goal.is_completed == True)
+    ).group_by(Goal.user_id).cte("goal_counts")
+    
+    user_values = [
+        select(task_counts.c.user_id, literal(TASKS_CREATED).label("condition_type"), task_counts.c.created.label("value")),
+        select(task_counts.c.user_id, literal(TASKS_COMPLETED), task_counts.c.completed),
+        select(goal_counts.c.user_id, literal(GOALS_COMPLETED), goal_counts.c.completed),
+    ]
+    
+    # Серии дней считаются по битовым строкам активности в Python
+    today = datetime.now(timezone.utc).date()
+    streaks = []
+    for row in db.query(UserActivity).filter(UserActivity.user_id.between(user_id_from, user_id_to)):
+        streak = ActivityBitmap.from_bytes(row.start_date, row.bitmap).current_streak(today)
+        if streak > 0:
+            streaks.append((row.user_id, STREAK_DAYS, streak))
+    if streaks:
+        streak_values = values(
+            column("user_id", Integer), column("condition_type", String), column("value", Integer),
+            name="streaks"
+        ).data(streaks)
+        user_values.append(select(streak_values))
+    
+    user_values = union_all(*user_values).subquery("user_values")
+    earned = select(
+        user_values.c.user_id,
+        Achievement.id,
+        func.now()
+    ).join(
+        Achievement,
+        and_(
+            Achievement.condition_type == user_values.c.condition_type,
+            Achievement.condition_value <= user_values.c.value
+        )
+    )
+    
+    stmt = insert(UserAchievement).from_select(
+        ["user_id", "achievement_id", "earned_at"], earned
+    ).on_conflict_do_nothing(
+        index_elements=[UserAchievement.user_id, UserAchievement.achievement_id]
+    ).returning(UserAchievement.user_id, UserAchievement.achievement_id)
+    awarded = [(row.user_id, row.achievement_id) for row in db.execute(stmt)]
+    
+    # Очки рейтинга - одним запросом на всю пачку
+    points_by_id = achievement_catalog.get(db).points_by_id
+    gained: Dict[int, int] = {}
+    for user_id, achievement_id in awarded:
+        gained[user_id] = gained.get(user_id, 0) + points_by_id.get(achievement_id, 0)
+    totals = add_points_bulk(db, gained)
+    bump_data_version(db, *gained)
+    db.commit()
     
-    # Получаем все достижения
-    all_achievements = get_all_achievements(db)
-    
-    # Получаем уже полученные достижения
-    earned_achievement_ids = {ua.achievement_id for ua in get_user_achievements(db, user_id)}
-    
-    for achievement in all_achievements:
-        if achievement.id in earned_achievement_ids:
-            continue
-            
-        should_award = False
-        
-        # Проверяем условия для каждого типа достижения
-        if achievement.condition_type == "tasks_completed" and stats["completed_tasks"] >= achievement.condition_value:
-            should_award = True
-        elif achievement.condition_type == "tasks_created" and stats["total_tasks"] >= achievement.condition_value:
-            should_award = True
-        elif achievement.condition_type == "streak_days" and stats["current_streak"] >= achievement.condition_value:
-            should_award = True
-        elif achievement.condition_type == "goals_completed" and stats["completed_goals"] >= achievement.condition_value:
-            should_award = True
-            
-        if should_award:
-            new_achievement = award_achievement(db, user_id, achievement.id)
-            new_achievements.append(new_achievement)
-    
-    return new_achievements 
\ No newline at end of file
+    for user_id, points in totals.items():
+        leaderboard.set_points(user_id, points)
+    return awarded
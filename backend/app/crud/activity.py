@@ -0,0 +1,97 @@
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timedelta, timezone
+from ..db.models.activity import UserActivity
+from ..db.models.task import Task, TaskStatus
+from ..services.activity_bitmap import ActivityBitmap
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _build_from_history(db: Session, user_id: int) -> ActivityBitmap:
+    """Собрать битовую строку по датам выполнения задач (один раз для пользователя)"""
+    completed_day = func.date(func.timezone("UTC", Task.completed_at))
+    rows = db.query(completed_day).filter(
+        and_(
+            Task.user_id == user_id,
+            Task.status == TaskStatus.completed,
+            Task.completed_at.isnot(None)
+        )
+    ).distinct().all()
+    return ActivityBitmap.from_days(day for (day,) in rows)
+
+
+def _get_row(db: Session, user_id: int, for_update: bool = False) -> UserActivity:
+    """Строка активности пользователя; при первом обращении создается по истории задач"""
+    query = db.query(UserActivity).filter(UserActivity.user_id == user_id)
+    if for_update:
+        query = query.with_for_update()
+    row = query.first()
+    if row:
+        return row
+
+    bitmap = _build_from_history(db, user_id)
+    db.execute(
+        insert(UserActivity).values(
+            user_id=user_id,
+            start_date=bitmap.start,
+            bitmap=bitmap.to_bytes()
+        ).on_conflict_do_nothing(index_elements=[UserActivity.user_id])
+    )
+    return query.populate_existing().one()
+
+
+def get_activity(db: Session, user_id: int) -> ActivityBitmap:
+    """
+    Получить дни активности пользователя (только чтение, без commit).
+    Если строки еще нет, дни собираются по истории задач; строка
+    создается при первой записи активности (record_activity).
+    """
+    row = db.query(UserActivity).filter(UserActivity.user_id == user_id).first()
+    if row is None:
+        return _build_from_history(db, user_id)
+    return ActivityBitmap.from_bytes(row.start_date, row.bitmap)
+
+
+def record_activity(db: Session, user_id: int, day: Optional[date] = None) -> int:
+    """
+    Отметить день активным (выполнена задача) и вернуть текущую серию дней.
+    Строка блокируется, чтобы параллельные выполнения не потеряли биты.
+    """
+    day = day or _today()
+    row = _get_row(db, user_id, for_update=True)
+    bitmap = ActivityBitmap.from_bytes(row.start_date, row.bitmap)
+
+    if bitmap.set(day):
+        row.start_date = bitmap.start
+        row.bitmap = bitmap.to_bytes()
+    db.commit()
+
+    return bitmap.current_streak(max(day, _today()))
+
+
+def get_streaks(db: Session, user_id: int) -> Dict[str, int]:
+    """Текущая и самая длинная серии дней с выполненными задачами"""
+    bitmap = get_activity(db, user_id)
+    return {
+        "current_streak": bitmap.current_streak(_today()),
+        "longest_streak": bitmap.longest_streak()
+    }
+
+
+def get_heatmap(db: Session, user_id: int, days: int = 365) -> Dict[str, Any]:
+    """Тепловая карта активности за последние days дней"""
+    bitmap = get_activity(db, user_id)
+    today = _today()
+    date_from = today - timedelta(days=days - 1)
+    return {
+        "date_from": date_from,
+        "date_to": today,
+        "active_days": bitmap.active_days(date_from, today),
+        "current_streak": bitmap.current_streak(today),
+        "longest_streak": bitmap.longest_streak()
+    }
@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, case, column, func, select, update, values, Integer
 from ..db.models.goal import Goal
+from ..db.models.task import Task
 from ..schemas.goal import GoalCreate, GoalUpdate
+from ..services.achievement_engine import achievement_engine
+from ..services.goal_rules import goal_rule_index
+from .user import bump_data_version, lock_user_data
 from datetime import datetime
 
 
@@ -32,10 +36,18 @@ def create_goal(db: Session, goal: GoalCreate, user_id: int) -> Goal:
         start_date=goal.start_date,
         end_date=goal.end_date,
         is_active=goal.is_active,
-        is_completed=False
+        is_completed=False,
+        auto_progress=goal.auto_progress,
+        task_type_filter=goal.task_type_filter,
+        task_priority_filter=goal.task_priority_filter
     )
     db.add(db_goal)
+    bump_data_version(db, user_id)
     db.commit()
+    
+    if db_goal.auto_progress:
+        goal_rule_index.invalidate(user_id)
+    
     db.refresh(db_goal)
     return db_goal
 
@@ -47,6 +59,7 @@ def update_goal(db: Session, goal_id: int, user_id: int, goal_update: GoalUpdate
         return None
     
     update_data = goal_update.dict(exclude_unset=True)
+    was_completed = db_goal.is_completed
     for field, value in update_data.items():
         setattr(db_goal, field, value)
     
@@ -60,31 +73,118 @@ def update_goal(db: Session, goal_id: int, user_id: int, goal_update: GoalUpdate
             db_goal.completed_at = None
     
     db_goal.updated_at = datetime.now()
+    bump_data_version(db, user_id)
     db.commit()
+    
+    goal_rule_index.invalidate(user_id)
+    _notify_completion_change(db, user_id, was_completed, db_goal.is_completed)
+    
     db.refresh(db_goal)
     return db_goal
 
 
 def update_goal_progress(db: Session, goal_id: int, user_id: int, increment: int) -> Optional[Goal]:
     """Обновить прогресс цели"""
-    db_goal = get_goal(db, goal_id, user_id)
-    if not db_goal:
-        return None
+    goals = apply_goal_progress(db, user_id, {goal_id: increment})
+    return goals[0] if goals else None
+
+
+def apply_goal_progress(db: Session, user_id: int, increments: Dict[int, int]) -> Optional[List[Goal]]:
+    """
+    Применить приращения прогресса к целям пользователя. Цели возвращаются
+    в порядке increments, с нулевым приращением - без изменений. Если
+    какой-то цели нет (или она удалена), ничего не применяется и
+    возвращается None.
+    """
+    rows = _advance_goals(db, user_id, increments)
+    goals = {goal.id: goal for goal, _ in rows}
+    unchanged = [goal_id for goal_id in increments if goal_id not in goals]
+    if unchanged:
+        for goal in db.query(Goal).filter(
+            and_(Goal.id.in_(unchanged), Goal.user_id == user_id, Goal.is_active == True)
+        ):
+            db.expunge(goal)
+            goals[goal.id] = goal
+        if len(goals) < len(increments):
+            db.rollback()
+            return None
+    db.commit()
     
-    db_goal.current_value = max(0, db_goal.current_value + increment)
+    notify_goal_transitions(db, user_id, rows)
+    return [goals[goal_id] for goal_id in increments]
+
+
+def apply_task_completion(db: Session, user_id: int, task: Task, delta: int) -> List[Tuple[Goal, bool]]:
+    """
+    Продвинуть цели с автоматическим прогрессом, подходящие под задачу
+    (delta = 1 при выполнении, -1 при отмене выполнения). Выполняется в
+    транзакции изменения задачи, commit и notify_goal_transitions - у вызывающего.
+    """
+    # Отмена снимает приращение только с целей, существовавших при выполнении
+    goal_ids = goal_rule_index.matching(
+        db, user_id, task, task.completed_at, created_by=delta < 0 and task.completed_at is not None
+    )
+    if not goal_ids:
+        return []
+    return _advance_goals(db, user_id, {goal_id: delta for goal_id in goal_ids})
+
+
+def _advance_goals(db: Session, user_id: int, increments: Dict[int, int]) -> List[Tuple[Goal, bool]]:
+    """
+    Применить приращения прогресса к целям пользователя одним UPDATE (без commit).
     
-    # Проверяем, достигнута ли цель
-    if db_goal.current_value >= db_goal.target_value and not db_goal.is_completed:
-        db_goal.is_completed = True
-        db_goal.completed_at = datetime.now()
-    elif db_goal.current_value < db_goal.target_value and db_goal.is_completed:
-        db_goal.is_completed = False
-        db_goal.completed_at = None
+    Новое значение и признак выполнения вычисляются в базе, поэтому быстрые
+    параллельные нажатия не теряют обновлений. Прежний is_completed берется
+    из CTE, блокирующего строки в том же запросе, - по нему движок
+    достижений узнает о выполнении цели. Несколько приращений одной цели
+    складываются, ограничение снизу нулем применяется к сумме.
+    """
+    increments = {goal_id: increment for goal_id, increment in increments.items() if increment}
+    if not increments:
+        return []
+    lock_user_data(db, user_id)
     
-    db_goal.updated_at = datetime.now()
-    db.commit()
-    db.refresh(db_goal)
-    return db_goal
+    deltas = values(
+        column("goal_id", Integer), column("increment", Integer), name="deltas"
+    ).data(sorted(increments.items()))
+    
+    previous = select(Goal.id, Goal.is_completed, deltas.c.increment).join(
+        deltas, deltas.c.goal_id == Goal.id
+    ).where(
+        and_(Goal.user_id == user_id, Goal.is_active == True)
+    ).order_by(Goal.id).with_for_update(of=Goal).cte("previous")
+    
+    new_value = func.greatest(0, Goal.current_value + previous.c.increment)
+    reached = new_value >= Goal.target_value
+    stmt = update(Goal).where(Goal.id == previous.c.id).values(
+        current_value=new_value,
+        is_completed=reached,
+        completed_at=case((reached, func.coalesce(Goal.completed_at, func.now())), else_=None),
+        updated_at=func.now()
+    ).returning(Goal, previous.c.is_completed.label("was_completed"))
+    
+    rows = db.execute(stmt, execution_options={"populate_existing": True}).all()
+    # RETURNING уже вернул актуальные значения: отсоединяем цели, чтобы commit
+    # не пометил их устаревшими и чтение полей не перечитывало строку
+    for goal, _ in rows:
+        db.expunge(goal)
+    if rows:
+        bump_data_version(db, user_id)
+    return rows
+
+
+def notify_goal_transitions(db: Session, user_id: int, rows: List[Tuple[Goal, bool]]) -> None:
+    """Сообщить движку достижений о целях, выполненных или отмененных после commit"""
+    for goal, was_completed in rows:
+        _notify_completion_change(db, user_id, bool(was_completed), goal.is_completed)
+
+
+def _notify_completion_change(db: Session, user_id: int, was_completed: bool, is_completed: bool) -> None:
+    """Сообщить движку достижений о выполнении цели или его отмене"""
+    if is_completed and not was_completed:
+        achievement_engine.on_goal_completed(db, user_id)
+    elif was_completed and not is_completed:
+        achievement_engine.on_goal_uncompleted(db, user_id)
 
 
 def delete_goal(db: Session, goal_id: int, user_id: int) -> bool:
@@ -95,7 +195,10 @@ def delete_goal(db: Session, goal_id: int, user_id: int) -> bool:
     
     db_goal.is_active = False
     db_goal.updated_at = datetime.now()
+    bump_data_version(db, user_id)
     db.commit()
+    
+    goal_rule_index.invalidate(user_id)
     return True
 
 
@@ -0,0 +1,80 @@
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from ..db.models.goal import Achievement, UserAchievement
+from ..db.models.leaderboard import UserPoints
+from ..db.models.user import User
+
+
+def add_points(db: Session, user_id: int, points: int) -> int:
+    """
+    Увеличить очки пользователя (без commit - в транзакции присвоения достижений).
+    Возвращает новое значение.
+    """
+    stmt = insert(UserPoints).values(user_id=user_id, points=points)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserPoints.user_id],
+        set_={"points": UserPoints.points + stmt.excluded.points, "updated_at": func.now()}
+    ).returning(UserPoints.points)
+    return db.execute(stmt).scalar_one()
+
+
+def add_points_bulk(db: Session, gained: Dict[int, int]) -> Dict[int, int]:
+    """Увеличить очки нескольких пользователей одним запросом (без commit)"""
+    if not gained:
+        return {}
+    stmt = insert(UserPoints).values([
+        {"user_id": user_id, "points": points} for user_id, points in gained.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserPoints.user_id],
+        set_={"points": UserPoints.points + stmt.excluded.points, "updated_at": func.now()}
+    ).returning(UserPoints.user_id, UserPoints.points)
+    return {row.user_id: row.points for row in db.execute(stmt)}
+
+
+def get_user_points(db: Session, user_id: int) -> int:
+    """Получить очки пользователя"""
+    points = db.query(UserPoints.points).filter(UserPoints.user_id == user_id).scalar()
+    return points or 0
+
+
+def get_user_names(db: Session, user_ids: List[int]) -> Dict[int, str]:
+    """Имена пользователей для страницы рейтинга"""
+    if not user_ids:
+        return {}
+    rows = db.query(User.id, User.full_name).filter(User.id.in_(user_ids)).all()
+    return {row.id: row.full_name for row in rows}
+
+
+def reconcile_user_points(db: Session) -> int:
+    """
+    Сверить user_points с user_achievements и исправить расхождения.
+    Возвращает количество исправленных строк.
+    """
+    totals = select(
+        UserAchievement.user_id,
+        func.sum(Achievement.points).label("points")
+    ).join(
+        Achievement, Achievement.id == UserAchievement.achievement_id
+    ).group_by(UserAchievement.user_id)
+
+    upsert = insert(UserPoints).from_select(["user_id", "points"], totals)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[UserPoints.user_id],
+        set_={"points": upsert.excluded.points, "updated_at": func.now()},
+        where=UserPoints.points.is_distinct_from(upsert.excluded.points)
+    )
+    fixed = db.execute(upsert).rowcount
+
+    # Пользователи, у которых больше нет достижений
+    fixed += db.execute(
+        update(UserPoints).where(
+            UserPoints.points != 0,
+            UserPoints.user_id.not_in(select(UserAchievement.user_id))
+        ).values(points=0)
+    ).rowcount
+
+    db.commit()
+    return fixed
@@ -0,0 +1,161 @@
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy import select
+from ..db.models.goal import Goal
+from ..db.models.sync import SyncTombstone
+from ..db.models.task import Task, TaskStep
+from ..schemas.sync import (
+    SyncChanges, SyncTask, SyncTaskStep, SyncGoal, SyncTombstone as SyncTombstoneSchema,
+    SyncMutation, SyncMutationResult
+)
+from . import task as crud_task
+from .user import lock_user_data
+
+APPLIED = "applied"
+CONFLICT = "conflict"
+NOT_FOUND = "not_found"
+INVALID = "invalid"
+
+
+def get_changes(db: Session, user_id: int, since: int, limit: int = 500) -> SyncChanges:
+    """
+    Задачи, этапы и цели пользователя, измененные после номера изменения
+    since, и удаления после него - не больше limit записей по порядку
+    номеров. Каждый источник читается по индексу (user_id, change_seq),
+    поэтому объем работы пропорционален числу изменений, а не данных.
+    При since = 0 (первая загрузка) удаления не передаются.
+    """
+    # По limit + 1 строк из каждого источника: первые limit изменений
+    # в общем порядке гарантированно среди них
+    tasks = db.scalars(
+        select(Task).where(Task.user_id == user_id, Task.change_seq > since)
+        .order_by(Task.change_seq).limit(limit + 1)
+    ).all()
+    steps = db.scalars(
+        select(TaskStep).join(Task, Task.id == TaskStep.task_id)
+        .where(Task.user_id == user_id, TaskStep.change_seq > since)
+        .order_by(TaskStep.change_seq).limit(limit + 1)
+    ).all()
+    goals = db.scalars(
+        select(Goal).where(Goal.user_id == user_id, Goal.change_seq > since)
+        .order_by(Goal.change_seq).limit(limit + 1)
+    ).all()
+    deleted = []
+    if since > 0:
+        deleted = db.scalars(
+            select(SyncTombstone).where(SyncTombstone.user_id == user_id, SyncTombstone.change_seq > since)
+            .order_by(SyncTombstone.change_seq).limit(limit + 1)
+        ).all()
+
+    change_seqs = sorted(row.change_seq for rows in (tasks, steps, goals, deleted) for row in rows)
+    has_more = len(change_seqs) > limit
+    cursor = change_seqs[:limit][-1] if change_seqs else since
+
+    def upto(rows):
+        return [row for row in rows if row.change_seq <= cursor]
+
+    return SyncChanges(
+        cursor=cursor,
+        has_more=has_more,
+        tasks=[SyncTask.model_validate(row) for row in upto(tasks)],
+        steps=[SyncTaskStep.model_validate(row) for row in upto(steps)],
+        goals=[SyncGoal.model_validate(row) for row in upto(goals)],
+        deleted=[SyncTombstoneSchema.model_validate(row) for row in upto(deleted)]
+    )
+
+
+def _task_result(db: Session, index: int, db_task: Task) -> SyncMutationResult:
+    # Массовые запросы по серии меняют строку задачи в обход ORM - версия перечитывается
+    db.refresh(db_task, ["change_seq"])
+    return SyncMutationResult(index=index, status=APPLIED, id=db_task.id, version=db_task.change_seq)
+
+
+def _apply_mutation(
+    db: Session, user_id: int, index: int, mutation: SyncMutation, created: Dict[str, int]
+) -> SyncMutationResult:
+    """Применить одно изменение (без commit)"""
+    if mutation.op == "create_task":
+        if mutation.task is None:
+            return SyncMutationResult(index=index, status=INVALID, detail="Нет данных задачи")
+        db_task = crud_task.create_task(db, mutation.task, user_id, commit=False)
+        if mutation.client_id is not None:
+            created[mutation.client_id] = db_task.id
+        return _task_result(db, index, db_task)
+
+    if mutation.op == "toggle_step":
+        db_step = crud_task.get_task_step(db, mutation.step_id, user_id) if mutation.step_id else None
+        if db_step is None:
+            return SyncMutationResult(index=index, status=NOT_FOUND, id=mutation.step_id)
+        if mutation.is_completed is None:
+            return SyncMutationResult(index=index, status=INVALID, id=db_step.id, detail="Не указан is_completed")
+        if mutation.base_version is not None and db_step.change_seq != mutation.base_version:
+            return SyncMutationResult(index=index, status=CONFLICT, id=db_step.id, version=db_step.change_seq)
+        crud_task.update_task_step(db, db_step.id, mutation.is_completed, user_id, commit=False)
+        return SyncMutationResult(index=index, status=APPLIED, id=db_step.id, version=db_step.change_seq)
+
+    task_id = mutation.task_id
+    if mutation.task_client_id is not None:
+        task_id = created.get(mutation.task_client_id)
+    db_task = crud_task.get_task(db, task_id, user_id) if task_id else None
+    if db_task is None:
+        return SyncMutationResult(index=index, status=NOT_FOUND, id=task_id)
+    if mutation.base_version is not None and db_task.change_seq != mutation.base_version:
+        return SyncMutationResult(index=index, status=CONFLICT, id=db_task.id)
+
+    if mutation.op == "update_task":
+        if mutation.changes is None:
+            return SyncMutationResult(index=index, status=INVALID, id=db_task.id, detail="Нет изменений задачи")
+        crud_task.update_task(db, db_task.id, user_id, mutation.changes, commit=False)
+        return _task_result(db, index, db_task)
+
+    crud_task.delete_task(db, db_task.id, user_id, commit=False)
+    return SyncMutationResult(index=index, status=APPLIED, id=task_id)
+
+
+def apply_mutations(db: Session, user_id: int, mutations: List[SyncMutation]) -> List[SyncMutationResult]:
+    """
+    Применить пакет изменений клиента по порядку в одной транзакции.
+    Каждое изменение выполняется в точке сохранения: конфликт версий или
+    ошибка данных откатывает только его, остальные применяются.
+    Задачи и этапы не блокируются - версии строк (change_seq) проверяются
+    при записи, и изменение, записанное другим запросом после чтения, тоже
+    дает конфликт; блокируется только строка пользователя (lock_user_data).
+    """
+    results = []
+    created: Dict[str, int] = {}
+    lock_user_data(db, user_id)
+    for index, mutation in enumerate(mutations):
+        pending_callbacks = len(db.info.get(crud_task.AFTER_COMMIT, []))
+        savepoint = db.begin_nested()
+        try:
+            result = _apply_mutation(db, user_id, index, mutation, created)
+        except StaleDataError:
+            result = SyncMutationResult(index=index, status=CONFLICT, id=mutation.task_id or mutation.step_id)
+        except DBAPIError:
+            # Ограничения и типы столбцов (IntegrityError, DataError) - откатывается только это изменение
+            result = SyncMutationResult(index=index, status=INVALID, detail="Изменение нарушает ограничения данных")
+
+        if result.status == APPLIED:
+            savepoint.commit()
+        else:
+            savepoint.rollback()
+            del db.info.get(crud_task.AFTER_COMMIT, [])[pending_callbacks:]
+        result.client_id = mutation.client_id or mutation.task_client_id
+        results.append(result)
+
+    db.commit()
+    crud_task.run_after_commit(db)
+
+    # Для конфликтов по задачам клиент получает текущую версию сервера
+    for mutation, result in zip(mutations, results):
+        if result.status == CONFLICT and mutation.op in ("update_task", "delete_task") and result.id:
+            db_task = crud_task.get_task(db, result.id, user_id)
+            if db_task is not None:
+                result.version = db_task.change_seq
+                result.current = SyncTask.model_validate(db_task)
+        elif result.status == CONFLICT and mutation.op == "toggle_step" and result.id:
+            db_step = crud_task.get_task_step(db, result.id, user_id)
+            result.version = db_step.change_seq if db_step else None
+    return results
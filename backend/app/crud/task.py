@@ -1,9 +1,105 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime
-from ..db.models.task import Task, TaskStep, TaskStatus
-from ..schemas.task import TaskCreate, TaskUpdate, TaskFilter, TaskStepCreate
+import base64
+import logging
+import re
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, delete, func, select, update, cast, tuple_, literal
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timedelta, timezone
+from ..core.config import settings
+from ..db.models.task import Task, TaskStep, TaskStatus, TaskPriority, TaskType
+from ..schemas.task import (
+    TaskCreate, TaskUpdate, TaskFilter, TaskStepCreate, CalendarOccurrence, TaskSearchResult, TaskSearchPage,
+    TaskSummary, Task as TaskSchema, TaskStep as TaskStepSchema
+)
+from ..services.achievement_engine import achievement_engine
+from ..services.calendar_cache import calendar_cache
+from ..services.recurrence import occurrences
+from .activity import record_activity
+from .goal import apply_task_completion, notify_goal_transitions
+from .task_counters import add_delta, apply_counter_deltas, get_counter_values, refresh_task_counters, task_delta
+from .user import bump_data_version, lock_user_data
+
+logger = logging.getLogger(__name__)
+
+
+# Действия после commit, отложенные изменениями с commit=False
+AFTER_COMMIT = "after_commit"
+
+# Поля исходной задачи серии, которые копируются в ее повторения
+SERIES_FIELDS = ("title", "description", "task_type", "priority", "color")
+# Поля, изменение которых меняет даты повторений
+SCHEDULE_FIELDS = ("deadline", "is_recurring", "recurrence_pattern")
+
+
+def _finish(db: Session, commit: bool, after_commit: Callable[[], None]) -> None:
+    """
+    Завершить изменение: commit, затем действия после него (кэши, достижения).
+    При commit=False изменение только записывается (flush) в транзакцию
+    вызывающего, а действия ждут run_after_commit.
+    """
+    if commit:
+        db.commit()
+        after_commit()
+    else:
+        db.flush()
+        db.info.setdefault(AFTER_COMMIT, []).append(after_commit)
+
+
+def run_after_commit(db: Session) -> None:
+    """Выполнить действия изменений с commit=False после commit транзакции"""
+    for callback in db.info.pop(AFTER_COMMIT, []):
+        callback()
+
+
+# Поля ответа списков задач по порядку схем и их столбцы: полная задача
+# (Task), сокращенная (TaskSummary) и этап. Списки строятся словарями
+# прямо из строк запроса - без загрузки задач в ORM и проверки pydantic
+TASK_FIELDS = tuple(name for name in TaskSchema.model_fields if name != "steps")
+TASK_COLUMNS = tuple(getattr(Task, name) for name in TASK_FIELDS)
+TASK_SUMMARY_FIELDS = {
+    name: getattr(Task, name) for name in TaskSummary.model_fields if name != "steps"
+}
+TASK_SUMMARY_FIELDS["steps"] = None  # этапы - отдельным запросом
+TASK_STEP_FIELDS = tuple(TaskStepSchema.model_fields)
+TASK_STEP_COLUMNS = tuple(getattr(TaskStep, name) for name in TASK_STEP_FIELDS)
+
+
+def _project(query, fields: Optional[List[str]]) -> List[dict]:
+    """
+    Выполнить запрос задач и вернуть словари для ответа (поля схемы Task,
+    с fields - только запрошенные поля TaskSummary). Выбираются только
+    нужные столбцы, этапы загружаются одним запросом на все задачи.
+    """
+    if fields is None:
+        names, columns, with_steps = TASK_FIELDS, TASK_COLUMNS, True
+    else:
+        names = tuple(
+            name for name in TASK_SUMMARY_FIELDS if name == "id" or (name in fields and name != "steps")
+        )
+        columns, with_steps = [TASK_SUMMARY_FIELDS[name] for name in names], "steps" in fields
+    
+    items = [dict(zip(names, row)) for row in query.with_entities(*columns)]
+    if with_steps:
+        steps = {item["id"]: [] for item in items}
+        for task_id, step in _task_steps(query.session, list(steps)):
+            steps[task_id].append(step)
+        for item in items:
+            item["steps"] = steps[item["id"]]
+    return items
+
+
+def _task_steps(db: Session, task_ids: List[int]) -> List[Tuple[int, dict]]:
+    """Этапы задач по порядку: (id задачи, этап словарем)"""
+    if not task_ids:
+        return []
+    rows = db.execute(
+        select(*TASK_STEP_COLUMNS).where(TaskStep.task_id.in_(task_ids)).order_by(
+            TaskStep.task_id, TaskStep.order, TaskStep.id
+        )
+    )
+    return [(row.task_id, dict(zip(TASK_STEP_FIELDS, row))) for row in rows]
 
 
 def get_task(db: Session, task_id: int, user_id: int) -> Optional[Task]:
@@ -17,8 +113,9 @@ def get_tasks(
     user_id: int, 
     skip: int = 0, 
     limit: int = 100,
-    filters: Optional[TaskFilter] = None
-) -> List[Task]:
+    filters: Optional[TaskFilter] = None,
+    fields: Optional[List[str]] = None
+) -> List[dict]:
     query = db.query(Task).filter(Task.user_id == user_id)
     
     if filters:
@@ -45,10 +142,11 @@ def get_tasks(
         if filters.end_date:
             query = query.filter(Task.deadline <= filters.end_date)
     
-    return query.offset(skip).limit(limit).all()
+    return _project(query.offset(skip).limit(limit), fields)
 
 
-def create_task(db: Session, task: TaskCreate, user_id: int) -> Task:
+def create_task(db: Session, task: TaskCreate, user_id: int, commit: bool = True) -> Task:
+    lock_user_data(db, user_id)
     db_task = Task(
         user_id=user_id,
         title=task.title,
@@ -60,66 +158,159 @@ def create_task(db: Session, task: TaskCreate, user_id: int) -> Task:
         recurrence_pattern=task.recurrence_pattern,
         color=task.color
     )
+    # Этапы создаются в той же транзакции, что и задача
+    for step_data in task.steps:
+        db_task.steps.append(TaskStep(
+            title=step_data.title,
+            description=step_data.description,
+            order=step_data.order
+        ))
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    db.flush()
+    apply_counter_deltas(db, {user_id: task_delta(db_task)})
+    if db_task.is_recurring:
+        materialize_occurrences(db, [db_task])
+    bump_data_version(db, user_id)
     
-    # Создаем этапы задачи
-    for step_data in task.steps:
-        create_task_step(db, step_data, db_task.id)
+    def after_commit():
+        calendar_cache.invalidate(user_id)
+        achievement_engine.on_task_created(db, user_id)
     
-    db.refresh(db_task)
+    _finish(db, commit, after_commit)
+    if commit:
+        db.refresh(db_task)
     return db_task
 
 
-def update_task(db: Session, task_id: int, user_id: int, task_update: TaskUpdate) -> Optional[Task]:
+def update_task(
+    db: Session, task_id: int, user_id: int, task_update: TaskUpdate, commit: bool = True
+) -> Optional[Task]:
+    lock_user_data(db, user_id)
     db_task = get_task(db, task_id, user_id)
     if not db_task:
         return None
     
     update_data = task_update.dict(exclude_unset=True)
+    was_completed = db_task.status == TaskStatus.completed
+    is_master = db_task.recurrence_master_id is None and (
+        db_task.is_recurring or update_data.get("is_recurring")
+    )
     
     # Если статус меняется на "выполнено", устанавливаем время завершения
-    if update_data.get("status") == TaskStatus.completed and db_task.status != TaskStatus.completed:
+    if update_data.get("status") == TaskStatus.completed and not was_completed:
         update_data["completed_at"] = datetime.utcnow()
     
+    # Счетчики задач: старый вклад задачи вычитается, новый прибавляется
+    deltas = add_delta({}, user_id, task_delta(db_task, -1))
     for field, value in update_data.items():
         setattr(db_task, field, value)
+    add_delta(deltas, user_id, task_delta(db_task))
     
-    db.commit()
-    db.refresh(db_task)
+    # Цели с автоматическим прогрессом продвигаются в той же транзакции
+    is_completed = db_task.status == TaskStatus.completed
+    goal_transitions = []
+    if is_completed != was_completed:
+        goal_transitions = apply_task_completion(db, user_id, db_task, 1 if is_completed else -1)
+    
+    # Будущие повторения серии следуют за исходной задачей
+    if is_master:
+        schedule_changed = any(field in update_data for field in SCHEDULE_FIELDS)
+        if schedule_changed:
+            db_task.recurrence_materialized_until = None
+        # Сама задача записывается до массовых запросов по серии: они
+        # меняют ее строку в обход ORM
+        db.flush()
+        if schedule_changed:
+            _delete_future_occurrences(db, db_task.id, deltas)
+            if db_task.is_recurring:
+                materialize_occurrences(db, [db_task])
+        else:
+            changes = {field: update_data[field] for field in SERIES_FIELDS if field in update_data}
+            if changes:
+                db.execute(
+                    update(Task).where(Task.id.in_(_future_occurrences(db_task.id)))
+                    .values(**changes).execution_options(synchronize_session=False)
+                )
+                if "priority" in changes or "task_type" in changes:
+                    # Вклад повторений заранее неизвестен - счетчики пересчитываются
+                    # по таблице целиком, включая изменения самой задачи
+                    refresh_task_counters(db, [user_id])
+                    deltas.clear()
+    
+    apply_counter_deltas(db, deltas)
+    bump_data_version(db, user_id)
+    
+    def after_commit():
+        calendar_cache.invalidate(user_id)
+        notify_goal_transitions(db, user_id, goal_transitions)
+        if is_completed and not was_completed:
+            achievement_engine.on_task_completed(db, user_id)
+            achievement_engine.on_streak_changed(db, user_id, record_activity(db, user_id))
+        elif was_completed and not is_completed:
+            achievement_engine.on_task_uncompleted(db, user_id)
+    
+    _finish(db, commit, after_commit)
+    if commit:
+        db.refresh(db_task)
     return db_task
 
 
-def delete_task(db: Session, task_id: int, user_id: int) -> bool:
+def delete_task(db: Session, task_id: int, user_id: int, commit: bool = True) -> bool:
+    lock_user_data(db, user_id)
     db_task = get_task(db, task_id, user_id)
     if not db_task:
         return False
     
+    deltas = add_delta({}, user_id, task_delta(db_task, -1))
+    if db_task.recurrence_master_id is not None:
+        # Удаленное повторение не должно создаться заново
+        db.execute(
+            update(Task).where(Task.id == db_task.recurrence_master_id).values(
+                recurrence_exdates=func.array_append(
+                    func.coalesce(Task.recurrence_exdates, "{}"), db_task.occurrence_date
+                )
+            ).execution_options(synchronize_session=False)
+        )
+    elif db_task.is_recurring:
+        # Будущие невыполненные повторения удаляются вместе с серией,
+        # остальные остаются самостоятельными задачами (SET NULL)
+        _delete_future_occurrences(db, db_task.id, deltas)
+    
     db.delete(db_task)
-    db.commit()
+    apply_counter_deltas(db, deltas)
+    bump_data_version(db, user_id)
+    
+    def after_commit():
+        calendar_cache.invalidate(user_id)
+        achievement_engine.on_task_deleted(db, user_id)
+    
+    _finish(db, commit, after_commit)
     return True
 
 
-def get_upcoming_tasks(db: Session, user_id: int, days: int = 7) -> List[Task]:
+def get_upcoming_tasks(
+    db: Session, user_id: int, days: int = 7, fields: Optional[List[str]] = None
+) -> List[dict]:
     """Получить задачи на ближайшие N дней"""
     from datetime import timedelta
     end_date = datetime.utcnow() + timedelta(days=days)
     
-    return db.query(Task).filter(
+    return _project(db.query(Task).filter(
         and_(
             Task.user_id == user_id,
             Task.status != TaskStatus.completed,
             Task.deadline <= end_date,
             Task.deadline >= datetime.utcnow()
         )
-    ).order_by(Task.deadline).all()
+    ).order_by(Task.deadline), fields)
 
 
-def get_overdue_tasks(db: Session, user_id: int) -> List[Task]:
+def get_overdue_tasks(
+    db: Session, user_id: int, fields: Optional[List[str]] = None
+) -> List[dict]:
     """Получить просроченные задачи"""
     # Используем новое поле is_overdue для более точной фильтрации
-    return db.query(Task).filter(
+    return _project(db.query(Task).filter(
         and_(
             Task.user_id == user_id,
             or_(
@@ -130,7 +321,314 @@ def get_overdue_tasks(db: Session, user_id: int) -> List[Task]:
                 )
             )
         )
+    ), fields)
+
+
+def get_dashboard_tasks(db: Session, user_id: int, days: int = 7) -> Tuple[List[Task], List[Task]]:
+    """
+    Ближайшие (как get_upcoming_tasks) и просроченные (как get_overdue_tasks)
+    задачи одним запросом, этапы - вторым (selectin), без запроса на задачу
+    """
+    now = datetime.now(timezone.utc)
+    end_date = now + timedelta(days=days)
+    
+    def is_upcoming(task: Task) -> bool:
+        return task.status != TaskStatus.completed and now <= task.deadline <= end_date
+    
+    def is_overdue(task: Task) -> bool:
+        return bool(task.is_overdue) or (
+            task.status in (TaskStatus.pending, TaskStatus.in_progress) and task.deadline < now
+        )
+    
+    tasks = db.query(Task).options(selectinload(Task.steps)).filter(
+        Task.user_id == user_id,
+        or_(
+            and_(Task.status != TaskStatus.completed, Task.deadline <= end_date, Task.deadline >= now),
+            Task.is_overdue == True,
+            and_(Task.status.in_([TaskStatus.pending, TaskStatus.in_progress]), Task.deadline < now)
+        )
+    ).order_by(Task.deadline).all()
+    return [task for task in tasks if is_upcoming(task)], [task for task in tasks if is_overdue(task)]
+
+
+# Повторяющиеся задачи
+def _occurrence_date(deadline: datetime) -> date:
+    return deadline.astimezone(timezone.utc).date()
+
+
+def materialized_until(now: Optional[datetime] = None) -> datetime:
+    """До какого момента повторения серий существуют как задачи"""
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(weeks=settings.RECURRENCE_HORIZON_WEEKS)
+
+
+def _future_occurrences(master_id: int):
+    """Созданные, но еще не начатые повторения серии"""
+    return select(Task.id).where(
+        Task.recurrence_master_id == master_id,
+        Task.status == TaskStatus.pending,
+        Task.deadline >= func.now()
+    )
+
+
+def _delete_future_occurrences(db: Session, master_id: int, deltas: dict) -> None:
+    """Удалить будущие повторения серии; их вклад в счетчики вычитается из deltas"""
+    future = _future_occurrences(master_id)
+    db.execute(
+        delete(TaskStep).where(TaskStep.task_id.in_(future)).execution_options(synchronize_session=False)
+    )
+    deleted = db.execute(
+        delete(Task).where(Task.id.in_(future))
+        .returning(Task.user_id, Task.status, Task.priority, Task.task_type, Task.occurrence_date)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for row in deleted:
+        add_delta(deltas, row.user_id, task_delta(row, -1))
+
+
+def get_recurring_tasks(db: Session, after_id: int, limit: int, now: Optional[datetime] = None) -> List[Task]:
+    """Пачка исходных задач серий с id больше after_id, повторения которых не доходят до горизонта"""
+    until = materialized_until(now).date()
+    return db.query(Task).filter(
+        Task.is_recurring == True,
+        Task.recurrence_master_id.is_(None),
+        or_(Task.recurrence_materialized_until.is_(None), Task.recurrence_materialized_until < until),
+        Task.id > after_id
+    ).order_by(Task.id).limit(limit).all()
+
+
+def _occurrence_rows(master: Task, today: datetime, until: datetime) -> List[dict]:
+    """Строки задач-повторения серии от recurrence_materialized_until (не раньше today) до until"""
+    window_from = today
+    if master.recurrence_materialized_until is not None:
+        next_day = master.recurrence_materialized_until + timedelta(days=1)
+        window_from = max(today, datetime.combine(next_day, datetime.min.time(), tzinfo=timezone.utc))
+    exdates = set(master.recurrence_exdates or ())
+    rows = []
+    for deadline in occurrences(master.deadline, master.recurrence_pattern, window_from, until + timedelta(days=1)):
+        day = _occurrence_date(deadline)
+        if deadline == master.deadline or day in exdates:
+            continue
+        rows.append({
+            "user_id": master.user_id,
+            "title": master.title,
+            "description": master.description,
+            "task_type": master.task_type,
+            "priority": master.priority,
+            "status": TaskStatus.pending,
+            "deadline": deadline,
+            "is_overdue": False,
+            "is_recurring": False,
+            "color": master.color,
+            "recurrence_master_id": master.id,
+            "occurrence_date": day
+        })
+    return rows
+
+
+def materialize_occurrences(db: Session, masters: List[Task], now: Optional[datetime] = None) -> int:
+    """
+    Создать задачи-повторения серий до горизонта RECURRENCE_HORIZON_WEEKS
+    (без commit). Каждая серия продолжается с даты, до которой повторения уже
+    созданы (recurrence_materialized_until), но не раньше сегодняшнего дня;
+    вставка идемпотентна, удаленные пользователем даты пропускаются.
+    Серия, которую не удалось развернуть, пропускается (с записью в лог) и
+    не отмечается продленной - остальные серии пачки создаются.
+    Возвращает количество созданных задач.
+    """
+    until = materialized_until(now)
+    today = until - timedelta(weeks=settings.RECURRENCE_HORIZON_WEEKS)
+    
+    rows = []
+    expanded = []
+    for master in masters:
+        try:
+            master_rows = _occurrence_rows(master, today, until)
+        except Exception as e:
+            logger.error(f"Не удалось развернуть серию задачи {master.id}: {e}", exc_info=True)
+            continue
+        rows.extend(master_rows)
+        expanded.append(master)
+    
+    if expanded:
+        lock_user_data(db, *[master.user_id for master in expanded])
+        db.execute(
+            update(Task).where(Task.id.in_([master.id for master in expanded]))
+            .values(recurrence_materialized_until=until.date())
+            .execution_options(synchronize_session=False)
+        )
+    if not rows:
+        return 0
+    stmt = insert(Task).on_conflict_do_nothing(constraint="uq_tasks_recurrence_occurrence")
+    created = db.execute(
+        stmt.returning(Task.user_id, Task.status, Task.priority, Task.task_type, Task.occurrence_date), rows
     ).all()
+    deltas = {}
+    for row in created:
+        add_delta(deltas, row.user_id, task_delta(row))
+    apply_counter_deltas(db, deltas)
+    bump_data_version(db, *deltas)
+    return len(created)
+
+
+def get_calendar(db: Session, user_id: int, date_from: datetime, date_to: datetime) -> List[CalendarOccurrence]:
+    """
+    Задачи пользователя в периоде [date_from, date_to). Задачи, в том числе
+    созданные повторения серий, выбираются по индексу (user_id, deadline).
+    Серии разворачиваются на лету на весь период, кроме дат, для которых
+    повторение уже создано (где бы оно ни оказалось после переноса) или
+    удалено: так календарь не зависит от того, до какой даты и когда
+    серия материализована. Результат кэшируется до изменения задач.
+    """
+    cached = calendar_cache.get(user_id, date_from, date_to)
+    if cached is not None:
+        return cached
+    
+    rows = db.query(
+        Task.id, Task.title, Task.task_type, Task.priority, Task.status,
+        Task.deadline, Task.color, Task.is_recurring, Task.recurrence_pattern,
+        Task.recurrence_exdates, Task.recurrence_master_id, Task.occurrence_date
+    ).filter(
+        Task.user_id == user_id,
+        or_(
+            and_(Task.deadline >= date_from, Task.deadline < date_to),
+            and_(Task.is_recurring == True, Task.deadline < date_to)
+        )
+    ).all()
+    
+    # Даты периода, для которых повторения серий существуют как задачи
+    # (по ограничению uq_tasks_recurrence_occurrence)
+    master_ids = [row.id for row in rows if row.is_recurring]
+    materialized = set()
+    if master_ids:
+        materialized = {
+            (row.recurrence_master_id, row.occurrence_date) for row in db.query(
+                Task.recurrence_master_id, Task.occurrence_date
+            ).filter(
+                Task.recurrence_master_id.in_(master_ids),
+                Task.occurrence_date.between(_occurrence_date(date_from), _occurrence_date(date_to))
+            )
+        }
+    
+    def item(row, deadline: datetime, is_occurrence: bool) -> CalendarOccurrence:
+        return CalendarOccurrence(
+            task_id=row.id,
+            title=row.title,
+            task_type=row.task_type,
+            priority=row.priority,
+            # Будущие повторения еще не начаты, статус исходной задачи к ним не относится
+            status=TaskStatus.pending if is_occurrence else row.status,
+            deadline=deadline,
+            color=row.color,
+            is_recurring=row.is_recurring,
+            is_occurrence=is_occurrence,
+            recurrence_master_id=row.id if is_occurrence else row.recurrence_master_id
+        )
+    
+    items = []
+    for row in rows:
+        if date_from <= row.deadline < date_to:
+            items.append(item(row, row.deadline, False))
+        if not row.is_recurring:
+            continue
+        
+        exdates = set(row.recurrence_exdates or ())
+        for deadline in occurrences(row.deadline, row.recurrence_pattern, date_from, date_to):
+            day = _occurrence_date(deadline)
+            if deadline == row.deadline or day in exdates or (row.id, day) in materialized:
+                continue
+            items.append(item(row, deadline, True))
+    items.sort(key=lambda entry: (entry.deadline, entry.task_id))
+    
+    calendar_cache.put(user_id, date_from, date_to, items)
+    return items
+
+
+# Поиск задач
+SEARCH_MAX_WORDS = 8
+SEARCH_WORD = re.compile(r"[^\W_]+")
+
+
+def _search_query(words: List[str]):
+    """
+    tsquery по обоим словарям: все слова обязательны, последнее - как префикс
+    (пользователь еще печатает). Слова состоят только из букв и цифр, поэтому
+    безопасны и для синтаксиса to_tsquery, и для шаблонов LIKE.
+    """
+    expression = " & ".join(words[:-1] + [words[-1] + ":*"])
+    return func.to_tsquery("russian", expression).op("||")(func.to_tsquery("english", expression))
+
+
+def encode_search_cursor(rank: float, task_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}:{task_id}".encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Позиция (ранг, id) последнего результата страницы; ValueError для неверного курсора"""
+    rank, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+    return float(rank), int(task_id)
+
+
+def search_tasks(
+    db: Session, user_id: int, q: str, limit: int = 20, cursor: Optional[Tuple[float, int]] = None
+) -> TaskSearchPage:
+    """
+    Поиск задач пользователя по названию и описанию. Совпадения ищутся по
+    поисковому вектору (GIN-индекс) и по подстроке названия (триграммный
+    индекс); ранг - ts_rank_cd плюс похожесть названия на запрос.
+    Страницы по ключу (ранг, id): cursor - позиция последнего результата
+    предыдущей страницы.
+    """
+    words = SEARCH_WORD.findall(q.lower())[:SEARCH_MAX_WORDS]
+    if not words:
+        return TaskSearchPage(items=[])
+    
+    query = _search_query(words)
+    phrase = " ".join(words)
+    # double precision: ранг возвращается в курсоре и сравнивается без потери точности
+    rank = cast(
+        func.ts_rank_cd(Task.search_vector, query) + func.similarity(Task.title, phrase), DOUBLE_PRECISION
+    ).label("rank")
+    
+    stmt = select(
+        Task.id, Task.title, Task.description, Task.task_type, Task.priority,
+        Task.status, Task.deadline, Task.color, rank
+    ).where(
+        Task.user_id == user_id,
+        or_(
+            Task.search_vector.op("@@")(query),
+            Task.title.ilike(f"%{phrase}%")
+        )
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(rank, Task.id) < tuple_(literal(cursor[0], DOUBLE_PRECISION), cursor[1]))
+    rows = db.execute(stmt.order_by(rank.desc(), Task.id.desc()).limit(limit + 1)).all()
+    
+    items = [TaskSearchResult(**row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_search_cursor(items[-1].rank, items[-1].id)
+    return TaskSearchPage(items=items, next_cursor=next_cursor)
+
+
+def suggest_task_titles(db: Session, user_id: int, prefix: str, limit: int = 10) -> List[str]:
+    """Названия задач, в которых есть слово с началом prefix (автодополнение)"""
+    prefix = " ".join(SEARCH_WORD.findall(prefix.lower()))
+    if not prefix:
+        return []
+    rows = db.execute(
+        select(Task.title).where(
+            Task.user_id == user_id,
+            or_(
+                Task.title.ilike(f"{prefix}%"),
+                Task.title.ilike(f"% {prefix}%")
+            )
+        ).group_by(Task.title)
+        .order_by(func.similarity(Task.title, prefix).desc(), func.length(Task.title), Task.title)
+        .limit(limit)
+    ).scalars().all()
+    return list(rows)
 
 
 # CRUD для этапов задач
@@ -142,13 +640,25 @@ def create_task_step(db: Session, step: TaskStepCreate, task_id: int) -> TaskSte
         order=step.order
     )
     db.add(db_step)
+    bump_data_version(db, db.query(Task.user_id).filter(Task.id == task_id).scalar())
     db.commit()
     db.refresh(db_step)
     return db_step
 
 
-def update_task_step(db: Session, step_id: int, is_completed: bool) -> Optional[TaskStep]:
-    db_step = db.query(TaskStep).filter(TaskStep.id == step_id).first()
+def get_task_step(db: Session, step_id: int, user_id: int) -> Optional[TaskStep]:
+    return db.query(TaskStep).join(Task, Task.id == TaskStep.task_id).filter(
+        and_(TaskStep.id == step_id, Task.user_id == user_id)
+    ).first()
+
+
+def update_task_step(
+    db: Session, step_id: int, is_completed: bool, user_id: Optional[int] = None, commit: bool = True
+) -> Optional[TaskStep]:
+    if user_id is not None:
+        db_step = get_task_step(db, step_id, user_id)
+    else:
+        db_step = db.query(TaskStep).filter(TaskStep.id == step_id).first()
     if not db_step:
         return None
     
@@ -158,35 +668,35 @@ def update_task_step(db: Session, step_id: int, is_completed: bool) -> Optional[
     else:
         db_step.completed_at = None
     
+    bump_data_version(db, db_step.task.user_id)
+    if not commit:
+        db.flush()
+        return db_step
     db.commit()
     db.refresh(db_step)
     return db_step
 
 
 def get_task_stats(db: Session, user_id: int) -> dict:
-    """Получить статистику по задачам пользователя"""
-    total = db.query(Task).filter(Task.user_id == user_id).count()
-    completed = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.status == TaskStatus.completed)
-    ).count()
-    pending = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.status.in_([TaskStatus.pending, TaskStatus.in_progress]))
-    ).count()
-    overdue = len(get_overdue_tasks(db, user_id))
-    
-    from ..db.models.task import TaskPriority
-    yearly_debts = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.priority == TaskPriority.yearly_debt)
-    ).count()
-    semester_debts = db.query(Task).filter(
-        and_(Task.user_id == user_id, Task.priority == TaskPriority.semester_debt)
-    ).count()
-    
+    """
+    Получить статистику по задачам пользователя - одна строка счетчиков
+    по первичному ключу. К задачам, уже отмеченным фоновой проверкой
+    просрочки, добавляются невыполненные задачи с прошедшим сроком, до
+    которых проверка еще не дошла (как в get_overdue_tasks).
+    """
+    counters = get_counter_values(db, user_id)
+    not_marked_overdue = db.query(func.count(Task.id)).filter(
+        Task.user_id == user_id,
+        Task.deadline < datetime.now(timezone.utc),
+        Task.status.in_([TaskStatus.pending, TaskStatus.in_progress])
+    ).scalar()
     return {
-        "total_tasks": total,
-        "completed_tasks": completed,
-        "pending_tasks": pending,
-        "overdue_tasks": overdue,
-        "yearly_debts": yearly_debts,
-        "semester_debts": semester_debts
-    } 
\ No newline at end of file
+        "total_tasks": counters["total"],
+        "completed_tasks": counters["status_completed"],
+        "pending_tasks": counters["status_pending"] + counters["status_in_progress"],
+        "overdue_tasks": counters["status_overdue"] + not_marked_overdue,
+        "yearly_debts": counters["priority_yearly_debt"],
+        "semester_debts": counters["priority_semester_debt"],
+        "by_priority": {priority.value: counters[f"priority_{priority.value}"] for priority in TaskPriority},
+        "by_type": {task_type.value: counters[f"type_{task_type.value}"] for task_type in TaskType}
+    }
@@ -0,0 +1,132 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from ..db.models.task import Task, TaskType, TaskPriority, TaskStatus
+from ..db.models.task_counters import UserTaskCounters
+from ..db.models.user import User
+from .user import lock_user_data
+
+COUNTER_COLUMNS = (
+    ["total", "created"]
+    + [f"status_{status.value}" for status in TaskStatus]
+    + [f"priority_{priority.value}" for priority in TaskPriority]
+    + [f"type_{task_type.value}" for task_type in TaskType]
+)
+
+Deltas = Dict[int, Dict[str, int]]
+
+
+def task_delta(task, sign: int = 1) -> Dict[str, int]:
+    """
+    Вклад задачи в счетчики (sign = -1 - вычесть). task - задача или строка
+    с полями status, priority, task_type, occurrence_date.
+    """
+    status = TaskStatus(task.status or TaskStatus.pending)
+    delta = {
+        "total": sign,
+        f"status_{status.value}": sign,
+        f"priority_{TaskPriority(task.priority).value}": sign,
+        f"type_{TaskType(task.task_type).value}": sign,
+    }
+    if task.occurrence_date is None:
+        delta["created"] = sign
+    return delta
+
+
+def add_delta(deltas: Deltas, user_id: int, delta: Dict[str, int]) -> Deltas:
+    """Прибавить приращение пользователя к накопленным"""
+    user_deltas = deltas.setdefault(user_id, {})
+    for column, value in delta.items():
+        user_deltas[column] = user_deltas.get(column, 0) + value
+    return deltas
+
+
+def apply_counter_deltas(db: Session, deltas: Deltas) -> None:
+    """Применить приращения счетчиков одним запросом (без commit - в транзакции изменения задач)"""
+    rows = [
+        {"user_id": user_id, **{column: delta.get(column, 0) for column in COUNTER_COLUMNS}}
+        for user_id, delta in sorted(deltas.items())  # единый порядок блокировок
+        if any(delta.values())
+    ]
+    if not rows:
+        return
+    db.execute(_ADD_COUNTERS, rows)
+
+
+def _add_counters_statement():
+    # Строки передаются параметрами (executemany), а не в .values(): иначе на
+    # каждое новое число пользователей в пачке компилируется и кэшируется
+    # отдельный запрос
+    stmt = insert(UserTaskCounters)
+    set_ = {column: getattr(UserTaskCounters, column) + stmt.excluded[column] for column in COUNTER_COLUMNS}
+    set_["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(index_elements=[UserTaskCounters.user_id], set_=set_)
+
+
+_ADD_COUNTERS = _add_counters_statement()
+
+
+def _counted(user_filter) -> select:
+    """Счетчики, посчитанные по таблице tasks, для пользователей под фильтром"""
+    status = func.coalesce(Task.status, TaskStatus.pending)
+    columns = [
+        func.count(Task.id).label("total"),
+        func.count(Task.id).filter(Task.occurrence_date.is_(None)).label("created"),
+    ]
+    columns += [func.count(Task.id).filter(status == value).label(f"status_{value.value}") for value in TaskStatus]
+    columns += [
+        func.count(Task.id).filter(Task.priority == value).label(f"priority_{value.value}") for value in TaskPriority
+    ]
+    columns += [func.count(Task.id).filter(Task.task_type == value).label(f"type_{value.value}") for value in TaskType]
+    return select(User.id.label("user_id"), *columns).outerjoin(
+        Task, Task.user_id == User.id
+    ).where(user_filter).group_by(User.id)
+
+
+def _upsert_counted(db: Session, user_filter) -> int:
+    """Записать пересчитанные счетчики; возвращает количество исправленных строк"""
+    stmt = insert(UserTaskCounters).from_select(["user_id"] + COUNTER_COLUMNS, _counted(user_filter))
+    current = tuple_(*[getattr(UserTaskCounters, column) for column in COUNTER_COLUMNS])
+    counted = tuple_(*[stmt.excluded[column] for column in COUNTER_COLUMNS])
+    set_ = {column: stmt.excluded[column] for column in COUNTER_COLUMNS}
+    set_["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserTaskCounters.user_id], set_=set_, where=current.is_distinct_from(counted)
+    )
+    return db.execute(stmt).rowcount
+
+
+def refresh_task_counters(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Пересчитать счетчики пользователей по задачам (без commit) - для массовых
+    изменений, приращения которых заранее неизвестны.
+    """
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        _upsert_counted(db, User.id.in_(user_ids))
+
+
+def reconcile_task_counters(db: Session, user_id_from: int, user_id_to: int) -> int:
+    """
+    Сверить счетчики пользователей из диапазона id с таблицей tasks и
+    исправить расхождения. Возвращает количество исправленных строк.
+    Пользователи блокируются до подсчета, как при изменении их задач:
+    приращение, зафиксированное после снимка подсчета, иначе было бы
+    перезаписано устаревшим числом.
+    """
+    user_ids = db.scalars(select(User.id).where(User.id.between(user_id_from, user_id_to))).all()
+    fixed = _upsert_counted(db, User.id.in_(lock_user_data(db, *user_ids)))
+    db.commit()
+    return fixed
+
+
+def get_task_counters(db: Session, user_id: int) -> Optional[UserTaskCounters]:
+    """Счетчики задач пользователя (поиск по первичному ключу)"""
+    return db.get(UserTaskCounters, user_id)
+
+
+def get_counter_values(db: Session, user_id: int) -> Dict[str, int]:
+    """Счетчики задач пользователя словарем; без строки счетчиков - нули"""
+    counters = get_task_counters(db, user_id)
+    return {column: getattr(counters, column) if counters else 0 for column in COUNTER_COLUMNS}
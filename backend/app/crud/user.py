@@ -1,6 +1,8 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from ..core.security import get_password_hash, verify_password
 from ..db.models.user import User
 from ..db.models.push_subscription import PushSubscription
@@ -17,6 +19,40 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
+def bump_data_version(db: Session, *user_ids: int) -> None:
+    """
+    Отметить изменение задач, целей или достижений пользователей (без commit -
+    в транзакции самого изменения). Новая версия меняет ETag условных GET.
+    """
+    user_ids = sorted(set(user_ids))  # единый порядок блокировок строк users
+    if not user_ids:
+        return
+    db.execute(
+        update(User).where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def lock_user_data(db: Session, *user_ids: int, skip_locked: bool = False) -> List[int]:
+    """
+    Заблокировать строки users до конца транзакции перед изменением задач,
+    этапов и целей пользователей. Номера изменений синхронизации выдаются
+    под этой блокировкой (триггер sync_touch), поэтому у пользователя они
+    идут в порядке commit. Взятая первой, до блокировок самих задач и
+    целей, и в порядке id, она не дает взаимных блокировок.
+    С skip_locked занятые пользователи пропускаются; возвращает
+    заблокированные id.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return []
+    return db.scalars(
+        select(User.id).where(User.id.in_(user_ids)).order_by(User.id)
+        .with_for_update(key_share=True, skip_locked=skip_locked)
+    ).all()
+
+
 # OAuth methods removed as per PRD requirements
 
 
@@ -73,31 +109,47 @@ def change_password(db: Session, user_id: int, current_password: str, new_passwo
     return True
 
 
-def save_push_subscription(db: Session, user_id: int, endpoint: str, p256dh_key: str, auth_key: str) -> bool:
-    """Сохранить push-подписку пользователя"""
+def save_push_subscription(db: Session, user_id: int, endpoint: str, p256dh_key: str, auth_key: str) -> Optional[bool]:
+    """
+    Сохранить push-подписку устройства одним INSERT ... ON CONFLICT DO UPDATE.
+    Подписки различаются по endpoint, у пользователя может быть несколько
+    устройств. PWA переподписывается при каждой загрузке, поэтому неизменная
+    подписка не перезаписывается. Возвращает True, если подписка создана или
+    изменена, False, если она не изменилась, None при ошибке.
+    """
     try:
-        # Удаляем старую подписку если есть
-        old_subscription = db.query(PushSubscription).filter(PushSubscription.user_id == user_id).first()
-        if old_subscription:
-            db.delete(old_subscription)
-            db.commit()  # Важно: коммитим удаление перед созданием новой
-        
-        # Создаем новую подписку
-        new_subscription = PushSubscription(
+        stmt = insert(PushSubscription).values(
             user_id=user_id,
             endpoint=endpoint,
             p256dh_key=p256dh_key,
-            auth_key=auth_key
+            auth_key=auth_key,
+            failure_count=0
         )
-        db.add(new_subscription)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PushSubscription.endpoint],
+            set_={
+                "user_id": stmt.excluded.user_id,
+                "p256dh_key": stmt.excluded.p256dh_key,
+                "auth_key": stmt.excluded.auth_key,
+                "failure_count": 0,
+                "updated_at": func.now()
+            },
+            where=tuple_(
+                PushSubscription.user_id, PushSubscription.p256dh_key, PushSubscription.auth_key
+            ).is_distinct_from(tuple_(
+                stmt.excluded.user_id, stmt.excluded.p256dh_key, stmt.excluded.auth_key
+            ))
+        ).returning(PushSubscription.id)
+        
+        changed = db.execute(stmt).first() is not None
         db.commit()
-        return True
+        return changed
     except Exception as e:
         db.rollback()
         logger.error(f"Ошибка сохранения push-подписки для пользователя {user_id}: {e}")
-        return False
+        return None
 
 
-def get_push_subscription(db: Session, user_id: int) -> Optional[PushSubscription]:
-    """Получить push-подписку пользователя"""
-    return db.query(PushSubscription).filter(PushSubscription.user_id == user_id).first() 
\ No newline at end of file
+def get_push_subscriptions(db: Session, user_id: int) -> List[PushSubscription]:
+    """Получить push-подписки всех устройств пользователя"""
+    return db.query(PushSubscription).filter(PushSubscription.user_id == user_id).all()
@@ -3,6 +3,10 @@ from .task import Task, TaskStep, TaskType, TaskPriority, TaskStatus
 from .goal import Goal, Achievement, UserAchievement, GoalType
 from .push_subscription import PushSubscription
 from .notification import Notification
+from .activity import UserActivity
+from .leaderboard import UserPoints
+from .task_counters import UserTaskCounters
+from .sync import SyncTombstone
 
 __all__ = [
     "User",
@@ -16,5 +20,9 @@ __all__ = [
     "UserAchievement",
     "GoalType",
     "PushSubscription",
-    "Notification"
+    "Notification",
+    "UserActivity",
+    "UserPoints",
+    "UserTaskCounters",
+    "SyncTombstone"
 ] 
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..base import Base
+
+
+class UserActivity(Base):
+    __tablename__ = "user_activity"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    # Битовая строка дней активности: бит i - день start_date + i (UTC)
+    start_date = Column(Date, nullable=True)
+    bitmap = Column(LargeBinary, nullable=False, default=b"")
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationship
+    user = relationship("User", back_populates="activity")
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 from ..base import Base
+from .task import TaskType, TaskPriority
+from .sync import change_seq_column
 
 
 class GoalType(str, enum.Enum):
@@ -14,6 +16,9 @@ class GoalType(str, enum.Enum):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_change_seq", "user_id", "change_seq"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -32,8 +37,14 @@ class Goal(Base):
     is_completed = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     
+    # Автоматический прогресс: +1 за каждую выполненную задачу, подходящую под фильтр
+    auto_progress = Column(Boolean, default=False, nullable=False)
+    task_type_filter = Column(Enum(TaskType), nullable=True)  # None - любой тип
+    task_priority_filter = Column(Enum(TaskPriority), nullable=True)  # None - любой приоритет
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    change_seq = change_seq_column()
     
     # Relationship
     user = relationship("User", back_populates="goals")
@@ -62,6 +73,10 @@ class Achievement(Base):
 
 class UserAchievement(Base):
     __tablename__ = "user_achievements"
+    __table_args__ = (
+        # Достижение присваивается пользователю не больше одного раза
+        UniqueConstraint("user_id", "achievement_id", name="uq_user_achievements_user_achievement"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -8,15 +8,20 @@ class PushSubscription(Base):
     __tablename__ = "push_subscriptions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    # Подписка на устройство: у пользователя их может быть несколько (телефон, ноутбук)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     # WebPush subscription data
-    endpoint = Column(Text, nullable=False)
+    endpoint = Column(Text, nullable=False, unique=True)
     p256dh_key = Column(Text, nullable=False)
     auth_key = Column(Text, nullable=False)
     
+    # Надежность устройства: ошибки доставки подряд и время последней ошибки
+    failure_count = Column(Integer, nullable=False, default=0)
+    last_failure_at = Column(DateTime(timezone=True), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship
-    user = relationship("User", back_populates="push_subscription_data") 
\ No newline at end of file
+    user = relationship("User", back_populates="push_subscriptions")
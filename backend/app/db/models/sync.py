@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, Sequence, FetchedValue
+from sqlalchemy.sql import func
+from ..base import Base
+
+# Общая последовательность изменений задач, этапов и целей. Номер строки
+# выдается при вставке и заново при каждом изменении (триггер sync_touch),
+# удаление оставляет запись в sync_tombstones (триггер sync_tombstone).
+# Оба триггера сначала блокируют строку пользователя до конца транзакции,
+# поэтому номера одного пользователя идут в порядке commit
+sync_change_seq = Sequence("sync_change_seq", metadata=Base.metadata)
+
+
+def change_seq_column() -> Column:
+    """Номер последнего изменения строки для синхронизации офлайн-клиентов"""
+    return Column(
+        BigInteger, server_default=sync_change_seq.next_value(), server_onupdate=FetchedValue(), nullable=False
+    )
+
+
+class SyncTombstone(Base):
+    """Удаленная задача, этап или цель: клиент удаляет свою копию при синхронизации"""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    entity_type = Column(String(16), nullable=False)  # "task", "step", "goal"
+    entity_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, server_default=sync_change_seq.next_value(), nullable=False)
+
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
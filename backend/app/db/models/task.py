@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import (
+    Column, Integer, String, Boolean, Date, DateTime, Text, ForeignKey, Enum, Index, UniqueConstraint, Computed
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.hybrid import hybrid_property
 import enum
 from datetime import datetime
 from ..base import Base
+from .sync import change_seq_column
 
 
 class TaskType(str, enum.Enum):
@@ -31,14 +35,39 @@ class TaskStatus(str, enum.Enum):
     overdue = "overdue"  # просрочено
 
 
+# Поисковый вектор задачи: название важнее описания, слова нормализуются
+# и по русскому, и по английскому словарю
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Выборка задач пользователя за период (календарь, ближайшие задачи)
+        Index("ix_tasks_user_id_deadline", "user_id", "deadline"),
+        # Повторяющиеся задачи пользователя разворачиваются в любой период
+        Index("ix_tasks_user_id_recurring", "user_id", postgresql_where="is_recurring"),
+        # Повторение серии создается не больше одного раза на дату
+        UniqueConstraint("recurrence_master_id", "occurrence_date", name="uq_tasks_recurrence_occurrence"),
+        # Полнотекстовый поиск и автодополнение по началу слова (pg_trgm)
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        # Изменения задач пользователя после курсора синхронизации
+        Index("ix_tasks_user_id_change_seq", "user_id", "change_seq"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
+    # Заполняется базой; в обычных выборках задач не загружается
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
     
     task_type = Column(Enum(TaskType), nullable=False)
     priority = Column(Enum(TaskPriority), nullable=False)
@@ -53,12 +82,23 @@ class Task(Base):
     # Repetition settings
     is_recurring = Column(Boolean, default=False)
     recurrence_pattern = Column(String, nullable=True)  # "daily", "weekly", "monthly"
+    recurrence_exdates = Column(ARRAY(Date), nullable=True)  # удаленные пользователем даты серии
+    recurrence_materialized_until = Column(Date, nullable=True)  # до какой даты созданы повторения
+    
+    # Созданное повторение серии: исходная задача и дата повторения
+    recurrence_master_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
+    occurrence_date = Column(Date, nullable=True)
     
     # Color for calendar
     color = Column(String(7), default="#3B82F6")  # hex color
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    change_seq = change_seq_column()
+    
+    # change_seq - версия строки: UPDATE и DELETE через ORM проверяют, что
+    # задачу не изменили после чтения (иначе StaleDataError)
+    __mapper_args__ = {"version_id_col": change_seq, "version_id_generator": False}
     
     # Relationships
     user = relationship("User", back_populates="tasks")
@@ -75,6 +115,9 @@ class Task(Base):
 
 class TaskStep(Base):
     __tablename__ = "task_steps"
+    __table_args__ = (
+        Index("ix_task_steps_task_id_change_seq", "task_id", "change_seq"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -86,6 +129,9 @@ class TaskStep(Base):
     
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    change_seq = change_seq_column()
+    
+    __mapper_args__ = {"version_id_col": change_seq, "version_id_generator": False}
     
     # Relationship
     task = relationship("Task", back_populates="steps") 
\ No newline at end of file
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..base import Base
+
+
+class UserTaskCounters(Base):
+    """
+    Счетчики задач пользователя для статистики. Поддерживаются приращениями
+    в транзакциях изменения задач, расхождения исправляет ночная сверка.
+    """
+    __tablename__ = "user_task_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    total = Column(Integer, nullable=False, default=0)
+    created = Column(Integer, nullable=False, default=0)  # без повторений серий, созданных планировщиком
+    
+    # По статусу
+    status_pending = Column(Integer, nullable=False, default=0)
+    status_in_progress = Column(Integer, nullable=False, default=0)
+    status_completed = Column(Integer, nullable=False, default=0)
+    status_overdue = Column(Integer, nullable=False, default=0)
+    
+    # По приоритету
+    priority_yearly_debt = Column(Integer, nullable=False, default=0)
+    priority_semester_debt = Column(Integer, nullable=False, default=0)
+    priority_current = Column(Integer, nullable=False, default=0)
+    
+    # По типу
+    type_coursework = Column(Integer, nullable=False, default=0)
+    type_exam = Column(Integer, nullable=False, default=0)
+    type_laboratory = Column(Integer, nullable=False, default=0)
+    type_lecture = Column(Integer, nullable=False, default=0)
+    type_seminar = Column(Integer, nullable=False, default=0)
+    type_project = Column(Integer, nullable=False, default=0)
+    type_homework = Column(Integer, nullable=False, default=0)
+    type_other = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationship
+    user = relationship("User", back_populates="task_counters")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..base import Base
@@ -21,6 +21,9 @@ class User(Base):
     # Notification settings - only WebPush and Email
     email_notifications = Column(Boolean, default=True)
     
+    # Версия данных пользователя (задачи, цели, достижения) для ETag условных запросов
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -28,5 +31,8 @@ class User(Base):
     tasks = relationship("Task", back_populates="user")
     goals = relationship("Goal", back_populates="user")
     achievements = relationship("UserAchievement", back_populates="user")
-    push_subscription_data = relationship("PushSubscription", back_populates="user", uselist=False)
-    notifications = relationship("Notification", back_populates="user") 
\ No newline at end of file
+    push_subscriptions = relationship("PushSubscription", back_populates="user")
+    notifications = relationship("Notification", back_populates="user")
+    activity = relationship("UserActivity", back_populates="user", uselist=False)
+    points = relationship("UserPoints", back_populates="user", uselist=False)
+    task_counters = relationship("UserTaskCounters", back_populates="user", uselist=False) 
\ No newline at end of file
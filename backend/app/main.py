@@ -1,11 +1,15 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm.exc import StaleDataError
 from .core.config import settings
+from .core.serialization import JSONResponse
 from .api.v1 import api_router
 from .services.background_tasks import BackgroundTaskService
+from .services.push_encryption import encryption_pool
+from .services.push_notifications import push_service
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -18,30 +22,37 @@ async def lifespan(app: FastAPI):
     # Запуск
     logger.info("Запуск приложения...")
     
-    # Запускаем фоновые задачи только если VAPID ключи настроены
-    if settings.VAPID_PRIVATE_KEY and settings.VAPID_PUBLIC_KEY:
-        task = asyncio.create_task(BackgroundTaskService.start_background_scheduler())
-        logger.info("Планировщик фоновых задач запущен")
-    else:
+    # Серии, созданные до материализации повторений или пропустившие продление,
+    # продлеваются до горизонта при запуске (в фоне, не задерживая запуск)
+    asyncio.get_running_loop().run_in_executor(None, BackgroundTaskService.materialize_recurring_tasks)
+    
+    # Планировщик поддерживает данные (просрочка, повторения, счетчики) всегда,
+    # push-уведомления отправляются только если VAPID ключи настроены
+    notifications = bool(settings.VAPID_PRIVATE_KEY and settings.VAPID_PUBLIC_KEY)
+    if not notifications:
         logger.warning("VAPID ключи не настроены, фоновые уведомления отключены")
-        task = None
+    task = asyncio.create_task(BackgroundTaskService.start_background_scheduler(notifications))
+    logger.info("Планировщик фоновых задач запущен")
     
     yield
     
     # Завершение
     logger.info("Завершение работы приложения...")
-    if task:
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            logger.info("Планировщик фоновых задач остановлен")
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        logger.info("Планировщик фоновых задач остановлен")
+    
+    await push_service.close()
+    encryption_pool.shutdown()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"/api/v1/openapi.json",
+    default_response_class=JSONResponse,
     lifespan=lifespan
 )
 
@@ -58,6 +69,12 @@ if settings.BACKEND_CORS_ORIGINS:
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """Задачу изменили после чтения (версия строки не совпала) - клиент перечитывает и повторяет"""
+    return JSONResponse(status_code=409, content={"detail": "Данные изменились, обновите их и повторите"})
+
+
 @app.get("/")
 def read_root():
     return {
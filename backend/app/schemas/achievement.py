@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 
 
 class AchievementBase(BaseModel):
@@ -45,6 +45,15 @@ class UserStats(BaseModel):
     overdue_tasks: int
     completion_rate: float
     current_streak: int
+    longest_streak: int = 0
     total_points: int
     achievements_count: int
-    completed_goals: int 
\ No newline at end of file
+    completed_goals: int
+
+
+class ActivityHeatmap(BaseModel):
+    date_from: date
+    date_to: date
+    active_days: List[date]
+    current_streak: int
+    longest_streak: int
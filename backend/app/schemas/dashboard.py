@@ -0,0 +1,16 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from .user import User
+from .task import Task, TaskStats
+from .goal import Goal
+from .achievement import UserStats
+
+
+class Dashboard(BaseModel):
+    """Данные главной страницы; в ответ входят только запрошенные разделы"""
+    user: Optional[User] = None
+    upcoming: Optional[List[Task]] = None
+    overdue: Optional[List[Task]] = None
+    task_stats: Optional[TaskStats] = None
+    user_stats: Optional[UserStats] = None
+    goals: Optional[List[Goal]] = None
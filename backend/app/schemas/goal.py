@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from ..db.models.goal import GoalType
+from ..db.models.task import TaskType, TaskPriority
 
 
 class GoalBase(BaseModel):
@@ -12,6 +13,9 @@ class GoalBase(BaseModel):
     start_date: datetime
     end_date: datetime
     is_active: bool = True
+    auto_progress: bool = False
+    task_type_filter: Optional[TaskType] = None
+    task_priority_filter: Optional[TaskPriority] = None
 
 
 class GoalCreate(GoalBase):
@@ -28,6 +32,9 @@ class GoalUpdate(BaseModel):
     end_date: Optional[datetime] = None
     is_completed: Optional[bool] = None
     is_active: Optional[bool] = None
+    auto_progress: Optional[bool] = None
+    task_type_filter: Optional[TaskType] = None
+    task_priority_filter: Optional[TaskPriority] = None
 
 
 class Goal(GoalBase):
@@ -44,4 +51,13 @@ class Goal(GoalBase):
 
 
 class GoalProgressUpdate(BaseModel):
-    increment: int = 1 
\ No newline at end of file
+    increment: int = 1
+
+
+class GoalProgressBatchItem(BaseModel):
+    goal_id: int
+    increment: int = 1
+
+
+class GoalProgressBatch(BaseModel):
+    items: List[GoalProgressBatchItem]
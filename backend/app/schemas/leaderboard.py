@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    full_name: Optional[str] = None
+    points: int
+
+
+class LeaderboardPage(BaseModel):
+    total_users: int
+    entries: List[LeaderboardEntry]
+
+
+class LeaderboardAround(BaseModel):
+    total_users: int
+    rank: Optional[int] = None
+    points: int
+    entries: List[LeaderboardEntry]
@@ -0,0 +1,88 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+from datetime import date, datetime
+from ..db.models.task import TaskStatus
+from .task import TaskBase, TaskCreate, TaskStep, TaskUpdate
+from .goal import Goal
+
+
+class SyncTask(TaskBase):
+    """Задача в ответе синхронизации; этапы передаются отдельным списком"""
+    id: int
+    user_id: int
+    status: TaskStatus
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    recurrence_master_id: Optional[int] = None
+    occurrence_date: Optional[date] = None
+    change_seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncTaskStep(TaskStep):
+    change_seq: int
+
+
+class SyncGoal(Goal):
+    change_seq: int
+
+
+class SyncTombstone(BaseModel):
+    entity_type: str  # "task", "step", "goal"
+    entity_id: int
+    change_seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncChanges(BaseModel):
+    """
+    Изменения после курсора since. cursor - курсор для следующего запроса;
+    has_more - изменения есть и дальше, запрос нужно повторить сразу.
+    """
+    cursor: int
+    has_more: bool
+    tasks: List[SyncTask] = []
+    steps: List[SyncTaskStep] = []
+    goals: List[SyncGoal] = []
+    deleted: List[SyncTombstone] = []
+
+
+# Пакет офлайн-изменений
+class SyncMutation(BaseModel):
+    """
+    Одно изменение из очереди клиента. base_version - change_seq задачи
+    (этапа), от которого клиент делал изменение; при расхождении изменение
+    не применяется (конфликт). Без base_version - без проверки.
+    """
+    op: Literal["create_task", "update_task", "delete_task", "toggle_step"]
+    client_id: Optional[str] = None  # временный id задачи, созданной офлайн (create_task)
+    task_id: Optional[int] = None
+    task_client_id: Optional[str] = None  # ссылка на задачу, созданную раньше в этом же пакете
+    step_id: Optional[int] = None
+    base_version: Optional[int] = None
+    task: Optional[TaskCreate] = None  # create_task
+    changes: Optional[TaskUpdate] = None  # update_task
+    is_completed: Optional[bool] = None  # toggle_step
+
+
+class SyncMutationBatch(BaseModel):
+    mutations: List[SyncMutation]
+
+
+class SyncMutationResult(BaseModel):
+    index: int
+    status: str  # "applied", "conflict", "not_found", "invalid"
+    client_id: Optional[str] = None
+    id: Optional[int] = None
+    version: Optional[int] = None  # change_seq после изменения (при конфликте - текущий)
+    current: Optional[SyncTask] = None  # задача на сервере при конфликте
+    detail: Optional[str] = None
+
+
+class SyncMutationResults(BaseModel):
+    results: List[SyncMutationResult]
@@ -1,7 +1,8 @@
-from typing import Optional, List
-from pydantic import BaseModel
-from datetime import datetime
+from typing import Dict, Optional, List
+from pydantic import BaseModel, Field, field_validator
+from datetime import date, datetime
 from ..db.models.task import TaskType, TaskPriority, TaskStatus
+from ..services.recurrence import parse_rule
 
 
 # Схемы для этапов задач
@@ -42,12 +43,21 @@ class TaskBase(BaseModel):
     deadline: datetime
     is_recurring: bool = False
     recurrence_pattern: Optional[str] = None
-    color: str = "#3B82F6"
+    color: str = Field("#3B82F6", max_length=7)  # столбец String(7)
+
+
+def _check_recurrence_pattern(value: Optional[str]) -> Optional[str]:
+    """Сохраняются только правила, которые умеет разворачивать services.recurrence"""
+    if value and parse_rule(value) is None:
+        raise ValueError("Неподдерживаемое правило повторения")
+    return value
 
 
 class TaskCreate(TaskBase):
     steps: List[TaskStepCreate] = []
 
+    _recurrence_pattern = field_validator("recurrence_pattern")(_check_recurrence_pattern)
+
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
@@ -58,7 +68,9 @@ class TaskUpdate(BaseModel):
     deadline: Optional[datetime] = None
     is_recurring: Optional[bool] = None
     recurrence_pattern: Optional[str] = None
-    color: Optional[str] = None
+    color: Optional[str] = Field(None, max_length=7)
+
+    _recurrence_pattern = field_validator("recurrence_pattern")(_check_recurrence_pattern)
 
 
 class Task(TaskBase):
@@ -68,12 +80,37 @@ class Task(TaskBase):
     completed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    recurrence_master_id: Optional[int] = None  # исходная задача серии для созданного повторения
+    occurrence_date: Optional[date] = None
     steps: List[TaskStep] = []
 
     class Config:
         from_attributes = True
 
 
+class TaskSummary(BaseModel):
+    """
+    Сокращенная задача для списков: заполнены только запрошенные поля
+    (параметр fields), в ответ не входят остальные
+    """
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    task_type: Optional[TaskType] = None
+    priority: Optional[TaskPriority] = None
+    status: Optional[TaskStatus] = None
+    deadline: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    is_recurring: Optional[bool] = None
+    recurrence_pattern: Optional[str] = None
+    color: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    recurrence_master_id: Optional[int] = None
+    occurrence_date: Optional[date] = None
+    steps: Optional[List[TaskStep]] = None
+
+
 # Схемы для фильтров и статистики
 class TaskFilter(BaseModel):
     task_type: Optional[TaskType] = None
@@ -89,4 +126,38 @@ class TaskStats(BaseModel):
     pending_tasks: int
     overdue_tasks: int
     yearly_debts: int
-    semester_debts: int 
\ No newline at end of file
+    semester_debts: int
+    by_priority: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+
+
+class CalendarOccurrence(BaseModel):
+    """Задача или повторение повторяющейся задачи в календаре"""
+    task_id: int
+    title: str
+    task_type: TaskType
+    priority: TaskPriority
+    status: TaskStatus
+    deadline: datetime  # срок этого повторения
+    color: str
+    is_recurring: bool
+    is_occurrence: bool = False  # True - повторение, еще не созданное как задача
+    recurrence_master_id: Optional[int] = None  # исходная задача серии
+
+
+# Схемы для поиска
+class TaskSearchResult(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    task_type: TaskType
+    priority: TaskPriority
+    status: TaskStatus
+    deadline: datetime
+    color: str
+    rank: float
+
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchResult]
+    next_cursor: Optional[str] = None  # передать в cursor для следующей страницы
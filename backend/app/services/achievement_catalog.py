@@ -0,0 +1,61 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from ..schemas.achievement import Achievement
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Неизменяемый снимок каталога: схемы, готовое JSON-тело ответа и его ETag"""
+
+    def __init__(self, achievements: List[Achievement]):
+        self.achievements = achievements
+        self.by_id = {achievement.id: achievement for achievement in achievements}
+        self.points_by_id = {achievement.id: achievement.points for achievement in achievements}
+        self.body = json.dumps(
+            [achievement.model_dump(mode="json") for achievement in achievements],
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+class AchievementCatalog:
+    """
+    Кэш каталога достижений на процесс.
+
+    Каталог меняется только при развертывании (entrypoint.sh заполняет его
+    до запуска приложения), поэтому читается из базы один раз. После ручного
+    изменения таблицы achievements нужно вызвать invalidate().
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    from ..crud.achievement import get_all_achievements
+
+                    achievements = [Achievement.model_validate(a) for a in get_all_achievements(db)]
+                    self._snapshot = CatalogSnapshot(achievements)
+                    logger.info(f"📚 Каталог достижений загружен: {len(achievements)} шт.")
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Сбросить кэш после изменения каталога"""
+        with self._lock:
+            self._snapshot = None
+
+
+# Singleton instance
+achievement_catalog = AchievementCatalog()
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from bisect import bisect_right
+from typing import List, Dict, Tuple, Optional, Callable
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from ..db.models.goal import UserAchievement, Goal
+from ..crud.task_counters import get_counter_values
+from .achievement_catalog import AchievementCatalog, CatalogSnapshot, achievement_catalog
+
+logger = logging.getLogger(__name__)
+
+# Типы условий, которые пересчитываются инкрементально по событиям
+TASKS_CREATED = "tasks_created"
+TASKS_COMPLETED = "tasks_completed"
+GOALS_COMPLETED = "goals_completed"
+STREAK_DAYS = "streak_days"
+
+# Время жизни закэшированного счетчика: другие процессы приложения меняют
+# те же данные, поэтому счетчик периодически перечитывается из базы
+COUNTER_TTL_SECONDS = 300
+COUNTER_CACHE_MAX_SIZE = 50000
+
+
+class AchievementIndex:
+    """
+    Индекс достижений в памяти: для каждого condition_type - пороги
+    condition_value по возрастанию. Новые пересеченные пороги находятся
+    бинарным поиском, без перебора всех достижений.
+    Строится из кэша каталога и перестраивается после его сброса.
+    """
+
+    def __init__(self, catalog: AchievementCatalog):
+        self.catalog = catalog
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._thresholds: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, db: Session) -> Dict[str, Tuple[List[int], List[int]]]:
+        snapshot = self.catalog.get(db)
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    ordered = sorted(snapshot.achievements, key=lambda a: (a.condition_type, a.condition_value, a.id))
+                    index: Dict[str, Tuple[List[int], List[int]]] = {}
+                    for achievement in ordered:
+                        values, ids = index.setdefault(achievement.condition_type, ([], []))
+                        values.append(achievement.condition_value)
+                        ids.append(achievement.id)
+                    self._thresholds = index
+                    self._snapshot = snapshot
+        return self._thresholds
+
+    def crossed(self, db: Session, condition_type: str, old_value: int, new_value: int) -> List[int]:
+        """Достижения, пороги которых лежат в (old_value, new_value]"""
+        if new_value <= old_value:
+            return []
+        values, ids = self._get(db).get(condition_type, ([], []))
+        return ids[bisect_right(values, old_value):bisect_right(values, new_value)]
+
+    def reached(self, db: Session, condition_type: str, value: int) -> List[int]:
+        """Все достижения, пороги которых не больше value"""
+        values, ids = self._get(db).get(condition_type, ([], []))
+        return ids[:bisect_right(values, value)]
+
+    def condition_types(self, db: Session) -> List[str]:
+        return list(self._get(db))
+
+
+class AchievementEngine:
+    """
+    Инкрементальная проверка достижений по доменным событиям.
+
+    Каждое событие затрагивает один condition_type. Для него хранится счетчик
+    пользователя: при первом обращении он читается из базы, дальше
+    изменяется на дельту события. Проверяются только пороги между старым
+    и новым значением счетчика.
+    """
+
+    def __init__(self, index: AchievementIndex):
+        self.index = index
+        self._counters: Dict[Tuple[int, str], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._count_queries: Dict[str, Callable[[Session, int], int]] = {
+            # Повторения серий создает планировщик, а не пользователь
+            TASKS_CREATED: lambda db, user_id: get_counter_values(db, user_id)["created"],
+            TASKS_COMPLETED: lambda db, user_id: get_counter_values(db, user_id)["status_completed"],
+            GOALS_COMPLETED: lambda db, user_id: db.query(Goal).filter(
+                and_(Goal.user_id == user_id, Goal.is_completed == True)
+            ).count(),
+        }
+
+    def on_task_created(self, db: Session, user_id: int) -> List[UserAchievement]:
+        return self._apply(db, user_id, TASKS_CREATED, 1)
+
+    def on_task_completed(self, db: Session, user_id: int) -> List[UserAchievement]:
+        return self._apply(db, user_id, TASKS_COMPLETED, 1)
+
+    def on_task_uncompleted(self, db: Session, user_id: int) -> None:
+        self.forget(user_id, TASKS_COMPLETED)
+
+    def on_task_deleted(self, db: Session, user_id: int) -> None:
+        self.forget(user_id, TASKS_CREATED, TASKS_COMPLETED)
+
+    def on_goal_completed(self, db: Session, user_id: int) -> List[UserAchievement]:
+        return self._apply(db, user_id, GOALS_COMPLETED, 1)
+
+    def on_goal_uncompleted(self, db: Session, user_id: int) -> None:
+        self.forget(user_id, GOALS_COMPLETED)
+
+    def on_streak_changed(self, db: Session, user_id: int, streak: int) -> List[UserAchievement]:
+        """Серия дней известна точно (из битовой строки активности) - счетчик не нужен"""
+        return self._apply(db, user_id, STREAK_DAYS, value=streak)
+
+    def remember(self, user_id: int, condition_type: str, value: int) -> None:
+        """Запомнить точное значение счетчика (например, после полного пересчета)"""
+        with self._lock:
+            if len(self._counters) >= COUNTER_CACHE_MAX_SIZE:
+                self._counters.clear()
+            self._counters[(user_id, condition_type)] = (value, time.monotonic())
+
+    def forget(self, user_id: int, *condition_types: str) -> None:
+        """Сбросить счетчики: уменьшение не пересекает порогов, значение перечитается при следующем событии"""
+        with self._lock:
+            for condition_type in condition_types:
+                self._counters.pop((user_id, condition_type), None)
+
+    def _apply(
+        self, db: Session, user_id: int, condition_type: str, delta: int = 0, value: Optional[int] = None
+    ) -> List[UserAchievement]:
+        from ..crud.achievement import award_achievements
+
+        try:
+            with self._lock:
+                cached = self._counters.get((user_id, condition_type))
+            if cached and time.monotonic() - cached[1] < COUNTER_TTL_SECONDS:
+                old_value = cached[0]
+                new_value = old_value + delta if value is None else value
+                # Счетчик известен - проверяем только пересеченные пороги
+                candidates = self.index.crossed(db, condition_type, old_value, new_value)
+            else:
+                # Событие уже записано в базу, поэтому COUNT включает его
+                new_value = self._count_queries[condition_type](db, user_id) if value is None else value
+                # Счетчик неизвестен - проверяем все достигнутые пороги: это наверстывает
+                # достижения, пропущенные до появления счетчика
+                candidates = self.index.reached(db, condition_type, new_value)
+            self.remember(user_id, condition_type, new_value)
+
+            return award_achievements(db, user_id, candidates)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка проверки достижений {condition_type} для пользователя {user_id}: {e}", exc_info=True)
+            return []
+
+
+# Singleton instances
+achievement_index = AchievementIndex(achievement_catalog)
+achievement_engine = AchievementEngine(achievement_index)
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+
+class ActivityBitmap:
+    """
+    Дни активности пользователя в виде битовой строки.
+
+    Бит i означает, что в день start + i пользователь выполнил хотя бы одну задачу.
+    Год активности занимает 46 байт, серии дней считаются битовыми операциями
+    над целым числом без перебора задач.
+    """
+
+    def __init__(self, start: Optional[date] = None, bits: int = 0):
+        self.start = start
+        self.bits = bits
+
+    @classmethod
+    def from_bytes(cls, start: Optional[date], data: Optional[bytes]) -> "ActivityBitmap":
+        return cls(start, int.from_bytes(data or b"", "little"))
+
+    @classmethod
+    def from_days(cls, days: Iterable[date]) -> "ActivityBitmap":
+        bitmap = cls()
+        for day in sorted(set(days)):
+            bitmap.set(day)
+        return bitmap
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def set(self, day: date) -> bool:
+        """Отметить день активным. Возвращает False, если он уже был отмечен"""
+        if self.start is None:
+            self.start = day
+        elif day < self.start:
+            # Задача выполнена задним числом - сдвигаем начало битовой строки
+            self.bits <<= (self.start - day).days
+            self.start = day
+
+        mask = 1 << (day - self.start).days
+        if self.bits & mask:
+            return False
+        self.bits |= mask
+        return True
+
+    def is_active(self, day: date) -> bool:
+        if self.start is None or day < self.start:
+            return False
+        return bool(self.bits >> (day - self.start).days & 1)
+
+    def current_streak(self, today: date) -> int:
+        """
+        Серия дней подряд, заканчивающаяся сегодня. Если сегодня задач еще
+        не было, серия считается до вчерашнего дня - она еще не прервана.
+        """
+        if self.start is None or today < self.start:
+            return 0
+
+        end = (today - self.start).days
+        if not self.bits >> end & 1:
+            end -= 1
+            if end < 0 or not self.bits >> end & 1:
+                return 0
+
+        # Нули в битах 0..end: самый старший из них ограничивает серию снизу
+        mask = (1 << (end + 1)) - 1
+        zeros = ~self.bits & mask
+        return end + 1 - zeros.bit_length()
+
+    def longest_streak(self) -> int:
+        """Самая длинная серия: число шагов x &= x >> 1 до обнуления"""
+        bits = self.bits
+        longest = 0
+        while bits:
+            bits &= bits >> 1
+            longest += 1
+        return longest
+
+    def active_days(self, date_from: date, date_to: date) -> List[date]:
+        """Активные дни в диапазоне [date_from, date_to] - данные для тепловой карты"""
+        if self.start is None or date_to < self.start:
+            return []
+
+        first = max(0, (date_from - self.start).days)
+        last = (date_to - self.start).days
+        if last < first:
+            return []
+
+        window = self.bits >> first & ((1 << (last - first + 1)) - 1)
+        days = []
+        while window:
+            low = window & -window
+            days.append(self.start + timedelta(days=first + low.bit_length() - 1))
+            window ^= low
+        return days
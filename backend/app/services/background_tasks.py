@@ -1,19 +1,36 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from sqlalchemy import select, and_, func
 from sqlalchemy.orm import Session
 
+from ..core.clock import system_clock
+from ..core.config import settings
 from ..db.session import SessionLocal
-from ..db.models.task import Task
+from ..db.models.task import Task, TaskStatus
 from ..db.models.user import User
+from ..db.models.push_subscription import PushSubscription
 from .notifications import notification_service
+from .notification_coalescer import notification_coalescer
 from .task_status import TaskStatusService
+from .leaderboard import leaderboard
+from ..crud.points import reconcile_user_points
+from ..crud.achievement import sweep_achievements
+from ..crud.task import get_recurring_tasks, materialize_occurrences
+from ..crud.task_counters import reconcile_task_counters
+from .calendar_cache import calendar_cache
+from .achievement_catalog import achievement_catalog
 
 logger = logging.getLogger(__name__)
 
 
+# Интервал между тактами планировщика
+SCHEDULER_TICK_SECONDS = 60
+
+
 class BackgroundTaskService:
+    # Источник времени и ожидания; в тестах и симуляции подменяется на SimulatedClock
+    clock = system_clock
     
     @staticmethod
     def get_db():
@@ -24,56 +41,73 @@ class BackgroundTaskService:
         finally:
             pass  # Не закрываем здесь, закроем в finally каждой задачи
     
+    @staticmethod
+    def _user_id_ranges(db: Session, chunk_size: int):
+        """Диапазоны id пользователей [first, last] по chunk_size пользователей"""
+        last_user_id = 0
+        while True:
+            first_user_id = db.execute(
+                select(func.min(User.id)).where(User.id > last_user_id)
+            ).scalar()
+            if first_user_id is None:
+                return
+            
+            # Верхняя граница пачки - chunk_size-й пользователь (или последний)
+            last_user_id = db.execute(
+                select(User.id).where(User.id >= first_user_id)
+                .order_by(User.id).offset(chunk_size - 1).limit(1)
+            ).scalar() or db.execute(select(func.max(User.id))).scalar()
+            yield first_user_id, last_user_id
+    
+    @staticmethod
+    async def _queue_by_user(db: Session, stmt, build_message) -> int:
+        """
+        Потоково читает строки (серверный курсор, пачками по SCHEDULER_SCAN_CHUNK_SIZE)
+        и ставит уведомления в очередь. Запрос должен быть упорядочен по user_id:
+        тогда после каждой пачки дайджесты пользователей, которые уже не встретятся
+        в выборке, отправляются сразу, и память не растет вместе с таблицей.
+        """
+        queued_count = 0
+        result = db.execute(stmt.execution_options(yield_per=settings.SCHEDULER_SCAN_CHUNK_SIZE))
+        for rows in result.partitions():
+            for row in rows:
+                message = build_message(row)
+                if message is None:
+                    continue
+                try:
+                    await notification_coalescer.add(row.user_id, message)
+                    queued_count += 1
+                except Exception as e:
+                    logger.error(f"Ошибка постановки уведомления в очередь для пользователя {row.user_id}: {e}")
+            
+            # Пользователи с меньшим id уже полностью прочитаны - их дайджесты готовы
+            await notification_coalescer.flush_users_before(rows[-1].user_id)
+        return queued_count
+    
     @staticmethod
     async def check_deadline_reminders():
         """Проверяет и отправляет напоминания о дедлайнах"""
         db = BackgroundTaskService.get_db()
         try:
             # Используем UTC для всех операций со временем
-            now = datetime.now(timezone.utc)
+            now = BackgroundTaskService.clock.now()
             
-            # Напоминания за 1 день
+            # Окна напоминаний за 30 минут и за 1 час вложены в окно за 1 день,
+            # поэтому одной выборки достаточно и задачи не дублируются
             tomorrow = now + timedelta(days=1)
-            tasks_tomorrow = db.query(Task).filter(
+            stmt = select(Task.id, Task.user_id, Task.title, Task.deadline).where(
                 Task.deadline <= tomorrow,
                 Task.deadline > now,
-                Task.status != 'completed'
-            ).all()
-            
-            # Напоминания за 1 час
-            one_hour_later = now + timedelta(hours=1)
-            tasks_one_hour = db.query(Task).filter(
-                Task.deadline <= one_hour_later,
-                Task.deadline > now,
-                Task.status != 'completed'
-            ).all()
-            
-            # Напоминания за 30 минут
-            thirty_min_later = now + timedelta(minutes=30)
-            tasks_thirty_min = db.query(Task).filter(
-                Task.deadline <= thirty_min_later,
-                Task.deadline > now,
-                Task.status != 'completed'
-            ).all()
+                Task.status != TaskStatus.completed
+            ).order_by(Task.user_id, Task.deadline)
             
-            sent_count = 0
+            queued_count = await BackgroundTaskService._queue_by_user(
+                db, stmt,
+                lambda row: notification_service.build_deadline_message(row.title, row.deadline)
+            )
             
-            # Собираем все задачи в один список, чтобы избежать дублирования
-            tasks_to_notify = list(set(tasks_tomorrow + tasks_one_hour + tasks_thirty_min))
-
-            # Отправляем напоминания
-            for task in tasks_to_notify:
-                try:
-                    success = await notification_service.send_deadline_notification(
-                        task.user_id, task.title, task.deadline
-                    )
-                    if success:
-                        sent_count += 1
-                except Exception as e:
-                    logger.error(f"Ошибка отправки напоминания о дедлайне для задачи {task.id}: {e}")
-            
-            if sent_count > 0:
-                logger.info(f"Отправлено {sent_count} напоминаний о дедлайнах")
+            if queued_count > 0:
+                logger.info(f"В очередь поставлено {queued_count} напоминаний о дедлайнах")
             
         except Exception as e:
             logger.error(f"Ошибка при отправке напоминаний о дедлайнах: {e}", exc_info=True)
@@ -85,40 +119,29 @@ class BackgroundTaskService:
         """Проверяет и отправляет уведомления о просроченных задачах"""
         db = BackgroundTaskService.get_db()
         try:
-            now = datetime.now(timezone.utc)
+            now = BackgroundTaskService.clock.now()
             
             # Задачи просроченные на 1 день или более
-            overdue_tasks = db.query(Task).filter(
-                Task.deadline < now,
-                Task.status != 'completed'
-            ).all()
-            
-            sent_count = 0
+            stmt = select(Task.id, Task.user_id, Task.title, Task.deadline).where(
+                Task.deadline <= now - timedelta(days=1),
+                Task.status != TaskStatus.completed
+            ).order_by(Task.user_id, Task.deadline)
             
-            for task in overdue_tasks:
+            def build_message(row):
                 # Убедимся, что у дедлайна есть таймзона
-                deadline = task.deadline
+                deadline = row.deadline
                 if deadline.tzinfo is None:
                     deadline = deadline.replace(tzinfo=timezone.utc)
-
+                
                 days_overdue = (now - deadline).days
-                if days_overdue > 0:  # Только если прошел минимум 1 день
-                    try:
-                        # Отправляем уведомление о просроченной задаче
-                        title = f"⚠️ Задача просрочена на {days_overdue} дн."
-                        body = f"{task.title} - проверьте статус выполнения"
-                        data = {'type': 'overdue', 'task_id': task.id, 'days_overdue': days_overdue}
-                        
-                        success = await notification_service.send_push_notification(
-                            task.user_id, title, body, data
-                        )
-                        if success:
-                            sent_count += 1
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки уведомления о просрочке для задачи {task.id}: {e}")
+                if days_overdue <= 0:  # Только если прошел минимум 1 день
+                    return None
+                return notification_service.build_overdue_message(row.id, row.title, days_overdue)
             
-            if sent_count > 0:
-                logger.info(f"Отправлено {sent_count} напоминаний о просроченных задачах")
+            queued_count = await BackgroundTaskService._queue_by_user(db, stmt, build_message)
+            
+            if queued_count > 0:
+                logger.info(f"В очередь поставлено {queued_count} напоминаний о просроченных задачах")
             
         except Exception as e:
             logger.error(f"Ошибка при отправке напоминаний о просроченных задачах: {e}", exc_info=True)
@@ -130,84 +153,207 @@ class BackgroundTaskService:
         """Отправляет ежедневные сводки пользователям"""
         db = BackgroundTaskService.get_db()
         try:
-            # Получаем всех активных пользователей с push-подписками
-            users = db.query(User).filter(
+            now = BackgroundTaskService.clock.now()
+            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            today_end = today_start + timedelta(days=1)
+            
+            # Статистика за сегодня по всем активным пользователям с push-подписками - одним запросом
+            due_today = and_(Task.deadline >= today_start, Task.deadline < today_end)
+            stmt = select(
+                User.id.label('user_id'),
+                func.count(Task.id).filter(due_today).label('total_tasks'),
+                func.count(Task.id).filter(due_today, Task.status == TaskStatus.completed).label('completed_tasks')
+            ).select_from(User).outerjoin(
+                Task, Task.user_id == User.id
+            ).where(
                 User.is_active == True,
-                User.push_subscription != None
-            ).all()
+                # У пользователя может быть несколько устройств - достаточно одного
+                select(PushSubscription.id).where(PushSubscription.user_id == User.id).exists()
+            ).group_by(User.id).order_by(User.id)
             
-            sent_count = 0
+            queued_count = await BackgroundTaskService._queue_by_user(
+                db, stmt,
+                lambda row: notification_service.build_daily_summary_message(row.total_tasks, row.completed_tasks)
+            )
             
-            for user in users:
-                # Получаем статистику задач пользователя
-                now = datetime.now(timezone.utc)
-                today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                today_end = today_start + timedelta(days=1)
-                
-                total_tasks = db.query(Task).filter(
-                    Task.user_id == user.id,
-                    Task.deadline >= today_start,
-                    Task.deadline < today_end
-                ).count()
-                
-                completed_tasks = db.query(Task).filter(
-                    Task.user_id == user.id,
-                    Task.deadline >= today_start,
-                    Task.deadline < today_end,
-                    Task.status == 'completed'
-                ).count()
-                
-                overdue_tasks = db.query(Task).filter(
-                    Task.user_id == user.id,
-                    Task.deadline < now,
-                    Task.status != 'completed'
-                ).count()
+            if queued_count > 0:
+                logger.info(f"В очередь поставлено {queued_count} ежедневных сводок")
+            
+        except Exception as e:
+            logger.error(f"Ошибка при отправке ежедневных сводок: {e}", exc_info=True)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def reconcile_leaderboard():
+        """Сверяет очки рейтинга с полученными достижениями"""
+        db = BackgroundTaskService.get_db()
+        try:
+            fixed_count = reconcile_user_points(db)
+            if fixed_count > 0:
+                logger.warning(f"Исправлено расхождений в очках рейтинга: {fixed_count}")
+            leaderboard.invalidate()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка сверки очков рейтинга: {e}", exc_info=True)
+        finally:
+            db.close()
+    
+    @staticmethod
+    async def sweep_all_achievements(notifications: bool = True):
+        """
+        Ночная проверка достижений всех пользователей, в том числе неактивных.
+        Пользователи обрабатываются пачками по диапазонам id, каждая пачка -
+        один INSERT ... SELECT; с notifications уведомления ставятся в очередь
+        дайджестов.
+        """
+        db = BackgroundTaskService.get_db()
+        try:
+            chunk_size = settings.ACHIEVEMENT_SWEEP_CHUNK_SIZE
+            catalog = achievement_catalog.get(db)
+            awarded_count = 0
+            
+            for first_user_id, last_user_id in BackgroundTaskService._user_id_ranges(db, chunk_size):
+                awarded = sweep_achievements(db, first_user_id, last_user_id)
+                awarded_count += len(awarded)
+                if not notifications:
+                    continue
                 
-                try:
-                    success = await notification_service.send_daily_summary(
-                        user.id, total_tasks, completed_tasks
-                    )
-                    if success:
-                        sent_count += 1
-                except Exception as e:
-                    logger.error(f"Ошибка отправки ежедневной сводки для пользователя {user.id}: {e}")
+                for user_id, achievement_id in sorted(awarded):
+                    achievement = catalog.by_id.get(achievement_id)
+                    if achievement:
+                        await notification_coalescer.add(
+                            user_id, notification_service.build_achievement_message(achievement.name)
+                        )
+                await notification_coalescer.flush_users_before(last_user_id + 1)
             
-            if sent_count > 0:
-                logger.info(f"Отправлено {sent_count} ежедневных сводок")
+            if awarded_count > 0:
+                logger.info(f"🏆 Ночная проверка: присвоено достижений {awarded_count}")
             
         except Exception as e:
-            logger.error(f"Ошибка при отправке ежедневных сводок: {e}", exc_info=True)
+            db.rollback()
+            logger.error(f"Ошибка ночной проверки достижений: {e}", exc_info=True)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def reconcile_all_task_counters():
+        """
+        Сверяет счетчики задач пользователей с таблицей tasks и исправляет
+        расхождения (например, после ручных правок в базе). Каждая пачка
+        пользователей - один INSERT ... SELECT, неизменные строки не пишутся.
+        """
+        db = BackgroundTaskService.get_db()
+        try:
+            fixed_count = 0
+            chunk_size = settings.TASK_COUNTERS_RECONCILE_CHUNK_SIZE
+            for first_user_id, last_user_id in BackgroundTaskService._user_id_ranges(db, chunk_size):
+                fixed_count += reconcile_task_counters(db, first_user_id, last_user_id)
+            if fixed_count > 0:
+                logger.warning(f"Исправлено расхождений в счетчиках задач: {fixed_count}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка сверки счетчиков задач: {e}", exc_info=True)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def materialize_recurring_tasks():
+        """
+        Продлевает повторяющиеся серии задач до горизонта RECURRENCE_HORIZON_WEEKS.
+        Серии обрабатываются пачками, каждая пачка - одна транзакция с
+        идемпотентными вставками повторений.
+        """
+        db = BackgroundTaskService.get_db()
+        try:
+            now = BackgroundTaskService.clock.now()
+            chunk_size = settings.SCHEDULER_SCAN_CHUNK_SIZE
+            created_count = 0
+            last_task_id = 0
+            
+            while True:
+                masters = get_recurring_tasks(db, last_task_id, chunk_size, now)
+                if not masters:
+                    break
+                last_task_id = masters[-1].id
+                created_count += materialize_occurrences(db, masters, now)
+                db.commit()
+                db.expunge_all()
+            
+            if created_count > 0:
+                calendar_cache.clear()
+                logger.info(f"🔁 Создано повторений задач: {created_count}")
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка создания повторений задач: {e}", exc_info=True)
         finally:
             db.close()
     
     @staticmethod
-    async def start_background_scheduler():
-        """Запускает планировщик фоновых задач"""
+    async def run_scheduler_tick(notifications: bool = True):
+        """
+        Один такт планировщика: выполняет задачи, которым пришло время.
+        Задачи, поддерживающие данные (просрочка, повторения, счетчики,
+        достижения), выполняются всегда; push-уведомления - только с
+        notifications (настроены VAPID ключи).
+        """
+        clock = BackgroundTaskService.clock
+        
+        # Обновляем статусы просроченных задач
+        updated_count = TaskStatusService.update_overdue_tasks(now=clock.now())
+        if updated_count > 0:
+            logger.info(f"Обновлено статусов просрочки: {updated_count}")
+        
+        current_minute = clock.now().minute
+        current_time = clock.now().time()
+        if notifications:
+            # Проверяем напоминания о дедлайнах
+            await BackgroundTaskService.check_deadline_reminders()
+            
+            # Проверяем просроченные задачи каждый час
+            if current_minute == 0:  # Каждый час в :00
+                await BackgroundTaskService.check_overdue_tasks()
+            
+            # Отправляем ежедневные сводки в 9:00 UTC
+            if current_time.hour == 9 and current_time.minute == 0:
+                await BackgroundTaskService.send_daily_summaries()
+        
+        # Продлеваем повторяющиеся задачи до горизонта каждый час в :05 - продление
+        # идемпотентно и берет только отставшие серии, так пропущенный такт догоняется
+        if current_minute == 5:
+            BackgroundTaskService.materialize_recurring_tasks()
+        
+        # Проверяем достижения всех пользователей в 3:00 UTC
+        if current_time.hour == 3 and current_time.minute == 0:
+            await BackgroundTaskService.sweep_all_achievements(notifications)
+        
+        # Сверяем счетчики задач в 4:00 UTC
+        if current_time.hour == 4 and current_time.minute == 0:
+            BackgroundTaskService.reconcile_all_task_counters()
+        
+        # Сверяем очки рейтинга каждый час в :30
+        if current_minute == 30:
+            BackgroundTaskService.reconcile_leaderboard()
+        
+        # Отправляем накопленные за такт уведомления - по одному дайджесту на пользователя
+        if notifications:
+            digest_count = await notification_coalescer.flush()
+            if digest_count > 0:
+                logger.info(f"Отправлено дайджестов уведомлений: {digest_count}")
+    
+    @staticmethod
+    async def start_background_scheduler(notifications: bool = True):
+        """Запускает планировщик фоновых задач (notifications - с push-уведомлениями)"""
         logger.info("Запуск планировщика фоновых задач")
         
         while True:
             try:
-                # Обновляем статусы просроченных задач каждые 15 минут
-                updated_count = TaskStatusService.update_overdue_tasks()
-                if updated_count > 0:
-                    logger.info(f"Обновлено статусов просрочки: {updated_count}")
-                
-                # Проверяем напоминания о дедлайнах каждые 15 минут
-                await BackgroundTaskService.check_deadline_reminders()
-                
-                # Проверяем просроченные задачи каждый час
-                current_minute = datetime.now(timezone.utc).minute
-                if current_minute == 0:  # Каждый час в :00
-                    await BackgroundTaskService.check_overdue_tasks()
-                
-                # Отправляем ежедневные сводки в 9:00 UTC
-                current_time = datetime.now(timezone.utc).time()
-                if current_time.hour == 9 and current_time.minute == 0:
-                    await BackgroundTaskService.send_daily_summaries()
+                await BackgroundTaskService.run_scheduler_tick(notifications)
                 
                 # Ждем 1 минуту до следующей проверки
-                await asyncio.sleep(60)
+                await BackgroundTaskService.clock.sleep(SCHEDULER_TICK_SECONDS)
                 
             except Exception as e:
                 logger.error(f"Ошибка в планировщике фоновых задач: {e}", exc_info=True)
-                await asyncio.sleep(60)  # При ошибке ждем 1 минуту 
\ No newline at end of file
+                await BackgroundTaskService.clock.sleep(SCHEDULER_TICK_SECONDS)  # При ошибке ждем 1 минуту
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from ..core.config import settings
+from ..schemas.task import CalendarOccurrence
+
+CALENDAR_CACHE_MAX_USERS = 10000
+CALENDAR_CACHE_MAX_RANGES = 16  # периодов на пользователя (день, неделя, месяц и соседние)
+
+
+class CalendarCache:
+    """
+    Развернутый календарь пользователя по запрошенным периодам.
+
+    Календарь меняется только при изменении задач пользователя, поэтому
+    результат хранится до следующей мутации (create/update/delete задачи
+    сбрасывает кэш пользователя). Изменения других процессов приложения
+    подхватываются не позже чем через CALENDAR_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._users: "OrderedDict[int, OrderedDict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, date_from: datetime, date_to: datetime) -> Optional[List[CalendarOccurrence]]:
+        with self._lock:
+            ranges = self._users.get(user_id)
+            if ranges is None:
+                return None
+            cached = ranges.get((date_from, date_to))
+            if cached is None or time.monotonic() - cached[1] >= settings.CALENDAR_CACHE_TTL_SECONDS:
+                return None
+            ranges.move_to_end((date_from, date_to))
+            self._users.move_to_end(user_id)
+            return cached[0]
+
+    def put(self, user_id: int, date_from: datetime, date_to: datetime, items: List[CalendarOccurrence]) -> None:
+        with self._lock:
+            ranges: "OrderedDict[Tuple[datetime, datetime], tuple]" = self._users.setdefault(user_id, OrderedDict())
+            ranges[(date_from, date_to)] = (items, time.monotonic())
+            ranges.move_to_end((date_from, date_to))
+            while len(ranges) > CALENDAR_CACHE_MAX_RANGES:
+                ranges.popitem(last=False)
+            self._users.move_to_end(user_id)
+            while len(self._users) > CALENDAR_CACHE_MAX_USERS:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Сбросить календарь пользователя после изменения его задач"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Сбросить весь кэш (массовое изменение статусов задач)"""
+        with self._lock:
+            self._users.clear()
+
+
+# Singleton instance
+calendar_cache = CalendarCache()
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..crud import achievement as crud_achievement
+from ..crud import goal as crud_goal
+from ..crud import task as crud_task
+from ..db.models.user import User
+from ..schemas.dashboard import Dashboard
+from ..schemas.goal import Goal as GoalSchema
+from ..schemas.task import Task as TaskSchema, TaskStats
+from ..schemas.achievement import UserStats
+from ..schemas.user import User as UserSchema
+
+SECTIONS = ("user", "upcoming", "overdue", "task_stats", "user_stats", "goals")
+
+
+class DashboardService:
+    """
+    Сборка главной страницы одним запросом вместо шести.
+
+    Разделы собираются группами в сессии запроса, одна за другой в одном
+    потоке: запрос держит одно соединение из пула, как и остальные
+    эндпоинты. Внутри группы запросы общие: ближайшие и просроченные
+    задачи выбираются одним запросом, обе статистики читают одну строку
+    счетчиков задач.
+    """
+
+    @staticmethod
+    def _task_lists(db: Session, user_id: int, fields: Set[str], days: int) -> Dict[str, Any]:
+        upcoming, overdue = crud_task.get_dashboard_tasks(db, user_id, days)
+        return {
+            "upcoming": [TaskSchema.model_validate(task) for task in upcoming],
+            "overdue": [TaskSchema.model_validate(task) for task in overdue],
+        }
+
+    @staticmethod
+    def _stats(db: Session, user_id: int, fields: Set[str], days: int) -> Dict[str, Any]:
+        sections = {}
+        if "task_stats" in fields:
+            sections["task_stats"] = TaskStats(**crud_task.get_task_stats(db, user_id))
+        if "user_stats" in fields:
+            sections["user_stats"] = UserStats(**crud_achievement.get_user_stats(db, user_id))
+        return sections
+
+    @staticmethod
+    def _goals(db: Session, user_id: int, fields: Set[str], days: int) -> Dict[str, Any]:
+        return {"goals": [GoalSchema.model_validate(goal) for goal in crud_goal.get_user_goals(db, user_id)]}
+
+    def _sections(self, db: Session, user_id: int, fields: Set[str], days: int) -> Dict[str, Any]:
+        groups = []
+        if fields & {"upcoming", "overdue"}:
+            groups.append(self._task_lists)
+        if fields & {"task_stats", "user_stats"}:
+            groups.append(self._stats)
+        if "goals" in fields:
+            groups.append(self._goals)
+
+        sections: Dict[str, Any] = {}
+        for group in groups:
+            sections.update(group(db, user_id, fields, days))
+        return sections
+
+    async def build(self, db: Session, user: User, fields: Set[str], days: int = 7) -> Dashboard:
+        sections = await run_in_threadpool(self._sections, db, user.id, fields, days)
+        if "user" in fields:
+            sections["user"] = UserSchema.model_validate(user)
+        return Dashboard(**{name: value for name, value in sections.items() if name in fields})
+
+
+# Singleton instance
+dashboard_service = DashboardService()
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, NamedTuple
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from ..db.models.goal import Goal
+from ..db.models.task import Task, TaskType, TaskPriority
+
+# Правила другого процесса приложения подхватываются не позже чем через TTL
+GOAL_RULES_TTL_SECONDS = 300
+GOAL_RULES_CACHE_MAX_SIZE = 50000
+
+
+class GoalRule(NamedTuple):
+    goal_id: int
+    task_type: Optional[TaskType]
+    priority: Optional[TaskPriority]
+    start_date: datetime
+    end_date: datetime
+    created_at: datetime
+
+    def matches(self, task: Task, at: datetime) -> bool:
+        return (
+            (self.task_type is None or self.task_type == task.task_type)
+            and (self.priority is None or self.priority == task.priority)
+            and self.start_date <= at <= self.end_date
+        )
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class GoalRuleIndex:
+    """
+    Активные правила автоматического прогресса целей по пользователям.
+
+    Цель с auto_progress продвигается при выполнении задач, подходящих под
+    ее фильтр (тип задачи, приоритет) в пределах срока цели. Правила
+    пользователя читаются из базы один раз и хранятся в LRU-кэше: при
+    выполнении задачи подходящие цели находятся без запросов и без
+    перебора задач.
+    """
+
+    def __init__(self):
+        self._rules: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, user_id: int) -> List[GoalRule]:
+        goals = db.query(
+            Goal.id, Goal.task_type_filter, Goal.task_priority_filter, Goal.start_date, Goal.end_date,
+            Goal.created_at
+        ).filter(
+            and_(Goal.user_id == user_id, Goal.is_active == True, Goal.auto_progress == True)
+        ).all()
+        return [
+            GoalRule(goal.id, goal.task_type_filter, goal.task_priority_filter,
+                     _aware(goal.start_date), _aware(goal.end_date), _aware(goal.created_at or goal.start_date))
+            for goal in goals
+        ]
+
+    def rules(self, db: Session, user_id: int) -> List[GoalRule]:
+        with self._lock:
+            cached = self._rules.get(user_id)
+            if cached and time.monotonic() - cached[1] < GOAL_RULES_TTL_SECONDS:
+                self._rules.move_to_end(user_id)
+                return cached[0]
+
+        rules = self._load(db, user_id)
+        with self._lock:
+            self._rules[user_id] = (rules, time.monotonic())
+            self._rules.move_to_end(user_id)
+            while len(self._rules) > GOAL_RULES_CACHE_MAX_SIZE:
+                self._rules.popitem(last=False)
+        return rules
+
+    def matching(
+        self, db: Session, user_id: int, task: Task, at: Optional[datetime] = None, created_by: bool = False
+    ) -> List[int]:
+        """
+        Цели пользователя, которые продвигает выполнение задачи в момент at.
+        С created_by - только цели, созданные не позже at (они получили
+        приращение при выполнении, и только с них его можно снять).
+        """
+        at = _aware(at or datetime.now(timezone.utc))
+        return [
+            rule.goal_id for rule in self.rules(db, user_id)
+            if rule.matches(task, at) and not (created_by and rule.created_at > at)
+        ]
+
+    def invalidate(self, user_id: int) -> None:
+        """Сбросить правила пользователя после изменения его целей"""
+        with self._lock:
+            self._rules.pop(user_id, None)
+
+
+# Singleton instance
+goal_rule_index = GoalRuleIndex()
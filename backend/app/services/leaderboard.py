@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models.leaderboard import UserPoints
+
+logger = logging.getLogger(__name__)
+
+
+class FenwickTree:
+    """Дерево Фенвика над количеством пользователей с каждым числом очков"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        index += 1
+        while index <= self.size:
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Сумма элементов 0..index включительно"""
+        index = min(index, self.size - 1) + 1
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, k: int) -> int:
+        """Наименьший индекс, префиксная сумма которого не меньше k (k >= 1)"""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self._tree[next_position] < k:
+                position = next_position
+                k -= self._tree[next_position]
+            step >>= 1
+        return position
+
+
+class Leaderboard:
+    """
+    Рейтинг пользователей по очкам достижений.
+
+    Порядок: больше очков выше, при равенстве - меньший user_id. Дерево
+    Фенвика по значениям очков дает место пользователя и пользователя на
+    заданной позиции за O(log n), внутри одного значения очков пользователи
+    хранятся в отсортированных списках.
+
+    Источник данных - таблица user_points. Изменения этого процесса
+    применяются сразу, изменения других процессов подхватываются
+    перечитыванием таблицы раз в LEADERBOARD_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._points: Dict[int, int] = {}
+        self._buckets: Dict[int, List[int]] = {}
+        self._tree = FenwickTree(1)
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < settings.LEADERBOARD_REFRESH_SECONDS:
+            return
+        rows = db.query(UserPoints.user_id, UserPoints.points).all()
+        with self._lock:
+            self._rebuild({row.user_id: row.points for row in rows})
+            self._loaded_at = time.monotonic()
+
+    def _rebuild(self, points: Dict[int, int]) -> None:
+        self._points = {}
+        self._buckets = {}
+        self._tree = FenwickTree(max(points.values(), default=0) * 2 + 1)
+        for user_id, value in points.items():
+            self._insert(user_id, value)
+
+    def _insert(self, user_id: int, value: int) -> None:
+        value = max(0, value)
+        if value >= self._tree.size:
+            # Очков больше, чем вмещает дерево - перестраиваем с запасом
+            points = dict(self._points)
+            points[user_id] = value
+            self._rebuild(points)
+            return
+        self._points[user_id] = value
+        insort(self._buckets.setdefault(value, []), user_id)
+        self._tree.add(value, 1)
+
+    def _remove(self, user_id: int) -> None:
+        value = self._points.pop(user_id, None)
+        if value is None:
+            return
+        bucket = self._buckets[value]
+        del bucket[bisect_left(bucket, user_id)]
+        if not bucket:
+            del self._buckets[value]
+        self._tree.add(value, -1)
+
+    def set_points(self, user_id: int, points: int) -> None:
+        """Применить новое значение очков пользователя (после присвоения достижений)"""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Рейтинг еще не загружен - значение прочитается из таблицы
+            self._remove(user_id)
+            self._insert(user_id, points)
+
+    def invalidate(self) -> None:
+        """Перечитать user_points при следующем обращении"""
+        with self._lock:
+            self._loaded_at = None
+
+    @property
+    def total(self) -> int:
+        return len(self._points)
+
+    def _count_above(self, value: int) -> int:
+        return len(self._points) - self._tree.prefix(value)
+
+    def _position(self, user_id: int) -> Optional[int]:
+        """Позиция пользователя в рейтинге (с 0)"""
+        value = self._points.get(user_id)
+        if value is None:
+            return None
+        return self._count_above(value) + bisect_left(self._buckets[value], user_id)
+
+    def _slice(self, offset: int, limit: int) -> List[Tuple[int, int, int]]:
+        """Записи (место, user_id, очки) для позиций offset..offset+limit-1"""
+        total = len(self._points)
+        entries: List[Tuple[int, int, int]] = []
+        if offset >= total or limit <= 0:
+            return entries
+
+        # Значение очков, на которое попадает позиция offset
+        value = self._tree.find(total - offset)
+        above = self._count_above(value)
+        index = offset - above
+        while len(entries) < limit:
+            bucket = self._buckets[value]
+            for user_id in bucket[index:index + limit - len(entries)]:
+                # Одинаковые очки - одинаковое место
+                entries.append((above + 1, user_id, value))
+            below = self._tree.prefix(value - 1) if value > 0 else 0
+            if below == 0:
+                break
+            above += len(bucket)
+            value = self._tree.find(below)
+            index = 0
+        return entries
+
+    def top(self, db: Session, limit: int, offset: int = 0) -> List[Tuple[int, int, int]]:
+        """Страница рейтинга сверху"""
+        self._ensure_loaded(db)
+        with self._lock:
+            return self._slice(offset, limit)
+
+    def around(self, db: Session, user_id: int, radius: int) -> Tuple[Optional[int], List[Tuple[int, int, int]]]:
+        """Место пользователя и соседи: radius записей выше и ниже"""
+        self._ensure_loaded(db)
+        with self._lock:
+            position = self._position(user_id)
+            if position is None:
+                return None, []
+            start = max(0, position - radius)
+            entries = self._slice(start, position - start + radius + 1)
+            return entries[position - start][0], entries
+
+
+# Singleton instance
+leaderboard = Leaderboard()
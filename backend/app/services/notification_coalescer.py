@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+from ..core.config import settings
+from .notifications import notification_service
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationCoalescer:
+    """
+    Накопитель уведомлений между фоновыми задачами и NotificationService.
+
+    Всё, что адресовано одному пользователю в пределах такта планировщика,
+    объединяется в одно push-уведомление (дайджест): одна выборка подписки
+    и одно шифрование вместо отдельной отправки на каждую задачу.
+    """
+
+    def __init__(self, max_items: int, max_delay: float):
+        self.max_items = max(1, max_items)
+        self.max_delay = max_delay
+        self._pending: Dict[int, List[Dict[str, Any]]] = {}
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, user_id: int, message: Dict[str, Any]) -> None:
+        """Поставить уведомление (title, body, data) в очередь пользователя"""
+        items = self._pending.setdefault(user_id, [])
+        items.append(message)
+
+        # Дайджест заполнен - отправляем его сразу, не дожидаясь конца такта
+        if len(items) >= self.max_items:
+            await self._send(user_id, self._pending.pop(user_id))
+            return
+
+        if self._flush_timer is None or self._flush_timer.done():
+            self._flush_timer = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> int:
+        """Отправить все накопленные дайджесты. Возвращает количество успешных отправок"""
+        if self._flush_timer is not None and not self._flush_timer.done():
+            if self._flush_timer is not asyncio.current_task():
+                self._flush_timer.cancel()
+        self._flush_timer = None
+
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            return await self._send_many(pending)
+
+    async def flush_users_before(self, user_id: int) -> int:
+        """
+        Отправить дайджесты пользователей с id меньше user_id.
+        Используется при потоковом чтении, упорядоченном по user_id: такие
+        пользователи уже прочитаны полностью, и держать их в памяти незачем.
+        """
+        async with self._lock:
+            ready = {uid: items for uid, items in self._pending.items() if uid < user_id}
+            for uid in ready:
+                del self._pending[uid]
+            return await self._send_many(ready)
+
+    def pending_count(self) -> int:
+        """Количество уведомлений, ожидающих отправки"""
+        return sum(len(items) for items in self._pending.values())
+
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.sleep(self.max_delay)
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Ошибка отложенной отправки дайджестов: {e}", exc_info=True)
+
+    async def _send_many(self, pending: Dict[int, List[Dict[str, Any]]]) -> int:
+        if not pending:
+            return 0
+
+        messages = [
+            {'user_id': user_id, **self.build_digest(items)}
+            for user_id, items in pending.items()
+        ]
+        results = await notification_service.send_push_notifications(messages)
+        return sum(1 for success in results.values() if success)
+
+    async def _send(self, user_id: int, items: List[Dict[str, Any]]) -> bool:
+        message = self.build_digest(items)
+        try:
+            return await notification_service.send_push_notification(
+                user_id, message['title'], message['body'], message['data']
+            )
+        except Exception as e:
+            logger.error(f"Ошибка отправки дайджеста пользователю {user_id}: {e}")
+            return False
+
+    @staticmethod
+    def build_digest(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Собрать одно уведомление из нескольких"""
+        if len(items) == 1:
+            return items[0]
+
+        return {
+            'title': f"🔔 Новых уведомлений: {len(items)}",
+            'body': "\n".join(f"• {item['body']}" for item in items),
+            'data': {
+                'type': 'digest',
+                'items': [item.get('data') or {} for item in items],
+                'url': '/tasks'
+            }
+        }
+
+
+# Singleton instance
+notification_coalescer = NotificationCoalescer(
+    max_items=settings.NOTIFICATION_DIGEST_MAX_ITEMS,
+    max_delay=settings.NOTIFICATION_DIGEST_MAX_DELAY
+)
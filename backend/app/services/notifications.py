@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
 from ..db.session import get_db
@@ -55,60 +55,99 @@ class NotificationService:
             logger.error(f"Ошибка отправки уведомления: {e}", exc_info=True)
             return False
     
-    async def send_deadline_notification(self, user_id: int, task_title: str, deadline: datetime) -> bool:
-        """Отправка уведомления о приближающемся дедлайне"""
+    async def send_push_notifications(self, messages: List[Dict[str, Any]]) -> Dict[int, bool]:
+        """Массовая отправка push-уведомлений (user_id, title, body, data)"""
         try:
-            # Форматируем дату для отображения
-            deadline_str = deadline.strftime("%d.%m.%Y %H:%M")
-            
-            title = "⏰ Приближается дедлайн!"
-            body = f"Задача '{task_title}' должна быть выполнена до {deadline_str}"
-            
-            data = {
+            logger.info(f"Массовая отправка уведомлений: {len(messages)}")
+            return await self.push_service.send_batch(messages)
+        except Exception as e:
+            logger.error(f"Ошибка массовой отправки уведомлений: {e}", exc_info=True)
+            return {message['user_id']: False for message in messages}
+    
+    @staticmethod
+    def build_deadline_message(task_title: str, deadline: datetime) -> Dict[str, Any]:
+        """Сформировать уведомление о приближающемся дедлайне"""
+        # Форматируем дату для отображения
+        deadline_str = deadline.strftime("%d.%m.%Y %H:%M")
+        
+        return {
+            'title': "⏰ Приближается дедлайн!",
+            'body': f"Задача '{task_title}' должна быть выполнена до {deadline_str}",
+            'data': {
                 'type': 'deadline',
                 'task_title': task_title,
                 'deadline': deadline.isoformat(),
                 'url': '/tasks'
             }
-            
-            return await self.send_push_notification(user_id, title, body, data)
+        }
+    
+    @staticmethod
+    def build_overdue_message(task_id: int, task_title: str, days_overdue: int) -> Dict[str, Any]:
+        """Сформировать уведомление о просроченной задаче"""
+        return {
+            'title': f"⚠️ Задача просрочена на {days_overdue} дн.",
+            'body': f"{task_title} - проверьте статус выполнения",
+            'data': {'type': 'overdue', 'task_id': task_id, 'days_overdue': days_overdue}
+        }
+    
+    async def send_deadline_notification(self, user_id: int, task_title: str, deadline: datetime) -> bool:
+        """Отправка уведомления о приближающемся дедлайне"""
+        try:
+            message = self.build_deadline_message(task_title, deadline)
+            return await self.send_push_notification(
+                user_id, message['title'], message['body'], message['data']
+            )
             
         except Exception as e:
             logger.error(f"Ошибка отправки уведомления о дедлайне: {e}", exc_info=True)
             return False
     
-    async def send_daily_summary(self, user_id: int, tasks_count: int, completed_count: int) -> bool:
-        """Отправка ежедневной сводки"""
-        try:
-            title = "📊 Ежедневная сводка"
-            body = f"Сегодня у вас {tasks_count} задач, выполнено: {completed_count}"
-            
-            data = {
+    @staticmethod
+    def build_daily_summary_message(tasks_count: int, completed_count: int) -> Dict[str, Any]:
+        """Сформировать ежедневную сводку"""
+        return {
+            'title': "📊 Ежедневная сводка",
+            'body': f"Сегодня у вас {tasks_count} задач, выполнено: {completed_count}",
+            'data': {
                 'type': 'daily_summary',
                 'tasks_count': tasks_count,
                 'completed_count': completed_count,
                 'url': '/dashboard'
             }
-            
-            return await self.send_push_notification(user_id, title, body, data)
+        }
+    
+    async def send_daily_summary(self, user_id: int, tasks_count: int, completed_count: int) -> bool:
+        """Отправка ежедневной сводки"""
+        try:
+            message = self.build_daily_summary_message(tasks_count, completed_count)
+            return await self.send_push_notification(
+                user_id, message['title'], message['body'], message['data']
+            )
             
         except Exception as e:
             logger.error(f"Ошибка отправки ежедневной сводки: {e}", exc_info=True)
             return False
     
-    async def send_achievement_notification(self, user_id: int, achievement_name: str) -> bool:
-        """Отправка уведомления о достижении"""
-        try:
-            title = "🏆 Новое достижение!"
-            body = f"Поздравляем! Вы получили достижение: {achievement_name}"
-            
-            data = {
+    @staticmethod
+    def build_achievement_message(achievement_name: str) -> Dict[str, Any]:
+        """Сформировать уведомление о достижении"""
+        return {
+            'title': "🏆 Новое достижение!",
+            'body': f"Поздравляем! Вы получили достижение: {achievement_name}",
+            'data': {
                 'type': 'achievement',
                 'achievement_name': achievement_name,
                 'url': '/achievements'
             }
-            
-            return await self.send_push_notification(user_id, title, body, data)
+        }
+    
+    async def send_achievement_notification(self, user_id: int, achievement_name: str) -> bool:
+        """Отправка уведомления о достижении"""
+        try:
+            message = self.build_achievement_message(achievement_name)
+            return await self.send_push_notification(
+                user_id, message['title'], message['body'], message['data']
+            )
             
         except Exception as e:
             logger.error(f"Ошибка отправки уведомления о достижении: {e}", exc_info=True)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+
+from pywebpush import WebPusher
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_ENCODING = "aes128gcm"
+
+
+def encrypt_payload(subscription_info: Dict[str, Any], data: bytes) -> bytes:
+    """Зашифровать payload для одной подписки (ECDH + HKDF + AES-GCM, RFC 8188)"""
+    return WebPusher(subscription_info).encode(data, CONTENT_ENCODING)['body']
+
+
+def encrypt_chunk(items: List[Tuple[Dict[str, Any], bytes]]) -> List[Optional[bytes]]:
+    """
+    Зашифровать пачку сообщений. Выполняется в процессе-воркере пула,
+    поэтому функция должна быть на уровне модуля (pickle).
+    Для подписок с некорректными ключами возвращает None.
+    """
+    results = []
+    for subscription_info, data in items:
+        try:
+            results.append(encrypt_payload(subscription_info, data))
+        except Exception:
+            results.append(None)
+    return results
+
+
+class PushEncryptionPool:
+    """
+    Пул процессов для шифрования WebPush-сообщений.
+
+    Шифрование - чистая нагрузка на CPU, и при массовой рассылке оно блокирует
+    event loop. Сообщения режутся на пачки по batch_size (одна пачка - один
+    межпроцессный вызов) и шифруются параллельно в max_workers процессах.
+    При max_workers == 0, а также для рассылок меньше одной пачки,
+    шифрование выполняется в текущем процессе - накладные расходы IPC
+    для них больше, чем само шифрование.
+    """
+
+    def __init__(self, max_workers: int, batch_size: int):
+        self.max_workers = max(0, max_workers)
+        self.batch_size = max(1, batch_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Запущен пул шифрования push-уведомлений: {self.max_workers} процессов")
+        return self._executor
+
+    async def encrypt(self, items: List[Tuple[Dict[str, Any], bytes]]) -> List[Optional[bytes]]:
+        """Зашифровать сообщения, сохраняя порядок"""
+        if not items:
+            return []
+
+        if self.max_workers == 0 or len(items) < self.batch_size:
+            return encrypt_chunk(items)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        encrypted_chunks = await asyncio.gather(*[
+            loop.run_in_executor(executor, encrypt_chunk, chunk) for chunk in chunks
+        ])
+        return [body for chunk in encrypted_chunks for body in chunk]
+
+    def shutdown(self) -> None:
+        """Остановить процессы пула"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+encryption_pool = PushEncryptionPool(
+    max_workers=settings.PUSH_ENCRYPTION_WORKERS,
+    batch_size=settings.PUSH_ENCRYPTION_BATCH_SIZE
+)
@@ -0,0 +1,171 @@
+import calendar
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, NamedTuple
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+# Верхние границы INTERVAL и COUNT: больше не нужно ни одному расписанию,
+# а даты повторений остаются в пределах datetime
+MAX_INTERVAL = 1000
+MAX_COUNT = 1000
+
+# Короткие значения recurrence_pattern, которые сохраняет фронтенд
+SIMPLE_PATTERNS = {
+    "daily": "FREQ=DAILY",
+    "weekly": "FREQ=WEEKLY",
+    "monthly": "FREQ=MONTHLY",
+}
+
+
+class RecurrenceRule(NamedTuple):
+    freq: str
+    interval: int = 1
+    by_day: Optional[List[int]] = None  # дни недели для WEEKLY, 0 - понедельник
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def parse_rule(pattern: Optional[str]) -> Optional[RecurrenceRule]:
+    """
+    Разобрать правило повторения: "daily", "weekly", "monthly" или
+    подмножество RRULE (RFC 5545): FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL,
+    BYDAY (для WEEKLY), COUNT, UNTIL. Неподдерживаемое правило - None
+    (в том числе INTERVAL больше MAX_INTERVAL и COUNT больше MAX_COUNT).
+    """
+    if not pattern:
+        return None
+    pattern = SIMPLE_PATTERNS.get(pattern.strip().lower(), pattern.strip())
+    if pattern.upper().startswith("RRULE:"):
+        pattern = pattern[6:]
+
+    parts = {}
+    for part in pattern.split(";"):
+        if "=" not in part:
+            return None
+        key, value = part.split("=", 1)
+        parts[key.strip().upper()] = value.strip().upper()
+
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        return None
+
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        by_day = None
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                return None
+            by_day = sorted({WEEKDAYS[day] for day in parts["BYDAY"].split(",")})
+        until = None
+        if "UNTIL" in parts:
+            value = parts["UNTIL"]
+            fmt = "%Y%m%dT%H%M%SZ" if "T" in value else "%Y%m%d"
+            until = datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+            if "T" not in value:
+                until += timedelta(days=1) - timedelta(microseconds=1)  # до конца дня
+    except (KeyError, ValueError):
+        return None
+
+    if not 1 <= interval <= MAX_INTERVAL or (count is not None and not 1 <= count <= MAX_COUNT):
+        return None
+    return RecurrenceRule(freq, interval, by_day, count, until)
+
+
+def _add_months(start: datetime, months: int) -> Optional[datetime]:
+    """Тот же день через months месяцев; None, если такого дня нет (31-е в апреле)"""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+# Повторение за пределами datetime (после 9999 года) - конец серии:
+# расширители останавливаются на OverflowError/ValueError, а не падают
+def _daily(start: datetime, rule: RecurrenceRule, window_from: datetime) -> Iterator[tuple]:
+    step = timedelta(days=rule.interval)
+    # Сразу переходим к первому повторению окна - без перебора прошлых
+    index = max(0, (window_from - start) // step)
+    while True:
+        try:
+            occurrence = start + step * index
+        except OverflowError:
+            return
+        yield index, occurrence
+        index += 1
+
+
+def _weekly(start: datetime, rule: RecurrenceRule, window_from: datetime) -> Iterator[tuple]:
+    by_day = rule.by_day or [start.weekday()]
+    week_start = start - timedelta(days=start.weekday())
+    step = timedelta(weeks=rule.interval)
+    period = max(0, (window_from - week_start) // step)
+    # Номер повторения считается без перебора: в каждом периоде len(by_day) дней
+    # (в первом - только дни не раньше start)
+    first_period = [day for day in by_day if day >= start.weekday()]
+    index = len(first_period) + (period - 1) * len(by_day) if period > 0 else 0
+    while True:
+        days = first_period if period == 0 else by_day
+        for day in days:
+            try:
+                occurrence = week_start + step * period + timedelta(days=day)
+            except OverflowError:
+                return
+            yield index, occurrence
+            index += 1
+        period += 1
+
+
+def _monthly(start: datetime, rule: RecurrenceRule, window_from: datetime) -> Iterator[tuple]:
+    months_between = (window_from.year - start.year) * 12 + window_from.month - start.month
+    period = max(0, months_between // rule.interval - 1)
+    # COUNT учитывает только существующие даты (31-е бывает не каждый месяц),
+    # поэтому при COUNT пропускать прошлые периоды нельзя
+    if rule.count is not None:
+        period = 0
+    index = 0
+    while True:
+        try:
+            occurrence = _add_months(start, period * rule.interval)
+        except ValueError:
+            return
+        if occurrence is not None:
+            yield index, occurrence
+            index += 1
+        period += 1
+
+
+EXPANDERS = {"DAILY": _daily, "WEEKLY": _weekly, "MONTHLY": _monthly}
+
+
+def occurrences(
+    start: datetime, pattern: Optional[str], window_from: datetime, window_to: datetime
+) -> Iterator[datetime]:
+    """
+    Лениво перечислить повторения задачи с первым сроком start, попадающие
+    в [window_from, window_to). Повторения до окна не перебираются (кроме
+    MONTHLY с COUNT), после конца окна генератор останавливается.
+    Сам start входит всегда (как DTSTART в RFC 5545), даже если не
+    подходит под BYDAY; без правила повторения - только он.
+    """
+    start, window_from, window_to = _aware(start), _aware(window_from), _aware(window_to)
+    if window_from <= start < window_to:
+        yield start
+    rule = parse_rule(pattern)
+    if rule is None:
+        return
+
+    for index, occurrence in EXPANDERS[rule.freq](start, rule, window_from):
+        if occurrence >= window_to:
+            return
+        if rule.count is not None and index >= rule.count:
+            return
+        if rule.until is not None and occurrence > rule.until:
+            return
+        if occurrence >= window_from and occurrence > start:
+            yield occurrence
@@ -1,39 +1,79 @@
-from typing import List
+from typing import List, Optional
+from sqlalchemy import and_, bindparam, select, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
+from ..core.config import settings
 from ..db.models.task import Task, TaskStatus
 from ..db.session import SessionLocal
+from ..crud.activity import record_activity
+from ..crud.goal import apply_task_completion, notify_goal_transitions
+from ..crud.task_counters import add_delta, apply_counter_deltas, task_delta
+from ..crud.user import bump_data_version, lock_user_data
+from .achievement_engine import achievement_engine
+from .calendar_cache import calendar_cache
 
 
 class TaskStatusService:
     """Сервис для управления статусами задач"""
     
     @staticmethod
-    def update_overdue_tasks() -> int:
+    def update_overdue_tasks(now: Optional[datetime] = None) -> int:
         """
-        Обновляет статусы просроченных задач.
+        Обновляет статусы просроченных задач на момент now (по умолчанию - текущее время).
         Возвращает количество обновленных задач.
         """
         db = SessionLocal()
         try:
-            now = datetime.now(timezone.utc)
+            now = now or datetime.now(timezone.utc)
+            chunk_size = settings.SCHEDULER_SCAN_CHUNK_SIZE
             
-            # Находим задачи, которые просрочены, но еще не помечены как просроченные
-            overdue_tasks = db.query(Task).filter(
+            # Задачи, которые просрочены, но еще не помечены как просроченные
+            overdue = and_(
                 Task.deadline < now,
                 Task.status.in_([TaskStatus.pending, TaskStatus.in_progress]),
                 Task.is_overdue == False
-            ).all()
+            )
             
-            updated_count = 0
-            for task in overdue_tasks:
-                task.is_overdue = True
-                task.status = TaskStatus.overdue
-                updated_count += 1
+            # Прежний статус нужен счетчикам задач, UPDATE ... RETURNING возвращает уже новый
+            batch = select(Task.id, Task.status).where(
+                Task.id.in_(bindparam("task_ids", expanding=True)),
+                Task.user_id.in_(bindparam("user_ids", expanding=True)),
+                overdue
+            ).with_for_update(skip_locked=True).cte("batch")
+            mark_overdue = (
+                update(Task)
+                .where(Task.id == batch.c.id)
+                .values(is_overdue=True, status=TaskStatus.overdue)
+                .returning(Task.user_id, batch.c.status)
+                .execution_options(synchronize_session=False)
+            )
             
-            if updated_count > 0:
+            # Обновляем пачками прямо в базе, не загружая задачи в память;
+            # каждая пачка - короткая транзакция, строки под чужой блокировкой пропускаются
+            updated_count = 0
+            while True:
+                candidates = db.execute(select(Task.id, Task.user_id).where(overdue).limit(chunk_size)).all()
+                if not candidates:
+                    break
+                # Пользователи блокируются раньше задач, как при любом изменении их
+                # данных; занятые другим изменением дождутся следующей пачки или такта
+                user_ids = lock_user_data(db, *[row.user_id for row in candidates], skip_locked=True)
+                rows = db.execute(
+                    mark_overdue, {"task_ids": [row.id for row in candidates], "user_ids": user_ids}
+                ).all()
+                deltas = {}
+                for row in rows:
+                    add_delta(deltas, row.user_id, {f"status_{TaskStatus(row.status).value}": -1, "status_overdue": 1})
+                apply_counter_deltas(db, deltas)
+                bump_data_version(db, *deltas)
                 db.commit()
                 
+                updated_count += len(rows)
+                if len(candidates) < chunk_size or not rows:
+                    break
+            
+            if updated_count:
+                calendar_cache.clear()
             return updated_count
             
         except Exception as e:
@@ -54,6 +94,7 @@ class TaskStatusService:
     @staticmethod
     def mark_task_as_completed(db: Session, task_id: int, user_id: int) -> bool:
         """Отметить задачу как выполненную"""
+        lock_user_data(db, user_id)
         task = db.query(Task).filter(
             Task.id == task_id,
             Task.user_id == user_id
@@ -62,9 +103,23 @@ class TaskStatusService:
         if not task:
             return False
             
+        was_completed = task.status == TaskStatus.completed
+        deltas = add_delta({}, user_id, task_delta(task, -1))
         task.status = TaskStatus.completed
         task.completed_at = datetime.now(timezone.utc)
         task.is_overdue = False  # Сбрасываем флаг просрочки
         
+        # Цели с автоматическим прогрессом продвигаются в той же транзакции
+        goal_transitions = [] if was_completed else apply_task_completion(db, user_id, task, 1)
+        
+        add_delta(deltas, user_id, task_delta(task))
+        apply_counter_deltas(db, deltas)
+        bump_data_version(db, user_id)
         db.commit()
+        calendar_cache.invalidate(user_id)
+        
+        notify_goal_transitions(db, user_id, goal_transitions)
+        if not was_completed:
+            achievement_engine.on_task_completed(db, user_id)
+            achievement_engine.on_streak_changed(db, user_id, record_activity(db, user_id))
         return True 
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ночной проверки достижений (BackgroundTaskService.sweep_all_achievements).
+
+Заполняет базу тестовыми пользователями с задачами (часть задач выполнена),
+прогоняет проверку и сообщает время, число SQL-запросов, присвоенных
+достижений и поставленных в очередь уведомлений. Push-уведомления не
+отправляются, а записываются. Каталог достижений должен быть заполнен
+(entrypoint.sh делает это при первом запуске).
+
+Запуск из каталога backend:
+    python -m benchmarks.achievement_sweep --users 100000 --tasks-per-user 10
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Task, User
+from app.db.models.task import TaskStatus
+from app.services.achievement_catalog import achievement_catalog
+from app.services.background_tasks import BackgroundTaskService
+from app.services.notification_coalescer import notification_coalescer
+from app.services.notifications import notification_service
+from benchmarks.dataset import BENCH_EMAIL_DOMAIN, QueryCounter, cleanup, seed_users, seed_tasks
+from benchmarks.scheduler_replay import RecordingPushService
+
+
+async def run(args) -> None:
+    settings.ACHIEVEMENT_SWEEP_CHUNK_SIZE = args.chunk_size
+    recorder = RecordingPushService()
+    notification_service.push_service = recorder
+
+    db = SessionLocal()
+    try:
+        if not achievement_catalog.get(db).achievements:
+            print("Каталог достижений пуст - присваивать нечего")
+            return
+
+        cleanup(db)
+        print(f"Заполнение базы: {args.users} пользователей, {args.tasks_per_user} задач на пользователя...")
+        user_ids = seed_users(db, args.users)
+        now = datetime.now(timezone.utc)
+        seed_tasks(db, user_ids, args.tasks_per_user, lambda rng, n: now + timedelta(days=rng.randint(-30, 30)))
+
+        # Выполнена примерно половина задач, у разных пользователей по-разному
+        bench_users = db.query(User.id).filter(User.email.like(f"bench-%@{BENCH_EMAIL_DOMAIN}"))
+        db.execute(
+            update(Task).where(Task.user_id.in_(bench_users), (Task.id + Task.user_id) % 2 == 0)
+            .values(status=TaskStatus.completed, completed_at=now)
+        )
+        db.commit()
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        await BackgroundTaskService.sweep_all_achievements()
+        await notification_coalescer.flush()
+        elapsed = time.perf_counter() - started
+        counter.close()
+
+        print()
+        print(f"Время проверки:               {elapsed:.2f} с")
+        print(f"Пользователей в секунду:      {args.users / elapsed:.0f}")
+        print(f"SQL-запросов:                 {counter.count}")
+        print(f"Отправлено дайджестов:        {recorder.sent}")
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк ночной проверки достижений")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--tasks-per-user', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=settings.ACHIEVEMENT_SWEEP_CHUNK_SIZE)
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
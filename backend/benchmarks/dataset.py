@@ -0,0 +1,138 @@
+"""
+Общие помощники бенчмарков: тестовые данные и счетчик SQL-запросов.
+
+Тестовые пользователи помечаются email вида bench-N@bench.local,
+cleanup() удаляет их вместе со всеми связанными строками.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import event, insert
+
+from app.db.base import engine
+from app.db.models import (
+    User, Task, TaskStep, PushSubscription, Notification, UserActivity, UserPoints, UserAchievement, UserTaskCounters,
+    Goal
+)
+from app.db.models.task import TaskType, TaskPriority, TaskStatus
+from app.crud.task_counters import refresh_task_counters
+from benchmarks.mock_push_server import DEFAULT_SECRET, make_subscription
+
+BENCH_EMAIL_DOMAIN = "bench.local"
+INSERT_CHUNK = 10000
+
+
+class QueryCounter:
+    """Счетчик SQL-запросов, выполненных через engine приложения"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def close(self) -> None:
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+def cleanup(db) -> None:
+    """Удалить данные предыдущих прогонов"""
+    user_ids = db.query(User.id).filter(User.email.like(f"bench-%@{BENCH_EMAIL_DOMAIN}"))
+    task_ids = db.query(Task.id).filter(Task.user_id.in_(user_ids))
+    db.query(Notification).filter(Notification.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(TaskStep).filter(TaskStep.task_id.in_(task_ids)).delete(synchronize_session=False)
+    db.query(Task).filter(Task.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(PushSubscription).filter(PushSubscription.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(UserActivity).filter(UserActivity.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(UserPoints).filter(UserPoints.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(UserTaskCounters).filter(UserTaskCounters.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(UserAchievement).filter(UserAchievement.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(Goal).filter(Goal.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.email.like(f"bench-%@{BENCH_EMAIL_DOMAIN}")).delete(synchronize_session=False)
+    db.commit()
+
+
+def seed_users(db, users: int, mock_url: Optional[str] = None, devices_per_user: int = 1) -> List[int]:
+    """Пользователи с push-подписками устройств (на mock push-сервиса, если указан его адрес)"""
+    user_ids = db.execute(
+        insert(User).returning(User.id),
+        [
+            {
+                'email': f"bench-{i}@{BENCH_EMAIL_DOMAIN}",
+                'hashed_password': "!",
+                'full_name': f"Bench {i}",
+                'is_active': True,
+                'is_verified': True,
+                'email_notifications': True
+            }
+            for i in range(users)
+        ]
+    ).scalars().all()
+
+    base_url = mock_url or "http://127.0.0.1:8090"
+    subscriptions = []
+    for index, user_id in enumerate(user_ids):
+        for device in range(devices_per_user):
+            subscription = make_subscription(base_url, DEFAULT_SECRET, index * devices_per_user + device)
+            subscriptions.append({
+                'user_id': user_id,
+                'endpoint': subscription['endpoint'],
+                'p256dh_key': subscription['keys']['p256dh'],
+                'auth_key': subscription['keys']['auth']
+            })
+    for start in range(0, len(subscriptions), INSERT_CHUNK):
+        db.execute(insert(PushSubscription), subscriptions[start:start + INSERT_CHUNK])
+    db.commit()
+    return user_ids
+
+
+def seed_tasks(db, user_ids: List[int], tasks_per_user: int, deadline_offsets, seed: int = 42) -> int:
+    """
+    Задачи для пользователей. deadline_offsets(rng, n) возвращает дедлайн
+    n-й задачи пользователя. Возвращает количество созданных задач.
+    """
+    rng = random.Random(seed)
+    task_types = list(TaskType)
+    tasks = []
+    for user_id in user_ids:
+        for n in range(tasks_per_user):
+            task_type = task_types[n % len(task_types)]
+            tasks.append({
+                'user_id': user_id,
+                'title': f"Задача №{n + 1}",
+                'task_type': task_type,
+                'priority': TaskPriority.current,
+                'status': TaskStatus.pending,
+                'deadline': deadline_offsets(rng, n),
+                'is_overdue': False,
+                'color': "#3B82F6"
+            })
+    for start in range(0, len(tasks), INSERT_CHUNK):
+        db.execute(insert(Task), tasks[start:start + INSERT_CHUNK])
+    # Задачи вставлены в обход crud - счетчики пересчитываются целиком
+    refresh_task_counters(db, user_ids)
+    db.commit()
+    return len(tasks)
+
+
+def reminder_window_deadlines(now: datetime):
+    """Дедлайны во всех окнах напоминаний, в просрочке и в далеком будущем"""
+    def deadline(rng: random.Random, n: int) -> datetime:
+        offsets = [
+            timedelta(minutes=20),
+            timedelta(minutes=50),
+            timedelta(hours=rng.randint(2, 23)),
+            -timedelta(days=rng.randint(2, 10)),
+            timedelta(days=rng.randint(3, 60)),
+        ]
+        return now + offsets[n % len(offsets)]
+    return deadline
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
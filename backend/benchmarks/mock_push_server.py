@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Локальный mock push-сервиса (аналог FCM / autopush) для замеров без внешней сети.
+
+Сервер принимает WebPush-сообщения на /push/{index}, расшифровывает их,
+добавляет настраиваемую задержку, случайно отвечает ошибкой 500 или 410 Gone
+и считает пропускную способность. Ключи подписок выводятся детерминированно
+из общего секрета и номера подписки, поэтому бенчмарк и сервер могут
+работать в разных процессах без общего состояния.
+
+Запуск из каталога backend:
+    python -m benchmarks.mock_push_server --port 8090 --latency-ms 20 --error-rate 0.01 --gone-rate 0.005
+Статистика: GET http://127.0.0.1:8090/stats, сброс: POST /stats/reset
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from typing import Dict, Any, Tuple
+
+import http_ece
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+DEFAULT_SECRET = "student-planner-bench"
+
+# Порядок группы кривой P-256
+P256_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def subscription_keys(secret: str, index: int) -> Tuple[ec.EllipticCurvePrivateKey, bytes]:
+    """Детерминированные ключи подписки: приватный ключ получателя и auth secret"""
+    seed = hashlib.sha256(f"{secret}:{index}".encode()).digest()
+    private_value = int.from_bytes(seed, 'big') % (P256_ORDER - 1) + 1
+    private_key = ec.derive_private_key(private_value, ec.SECP256R1())
+    auth_secret = hashlib.sha256(seed + b"auth").digest()[:16]
+    return private_key, auth_secret
+
+
+def make_subscription(base_url: str, secret: str, index: int) -> Dict[str, Any]:
+    """Данные подписки в том виде, в котором их присылает браузер"""
+    private_key, auth_secret = subscription_keys(secret, index)
+    p256dh = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.X962,
+        format=serialization.PublicFormat.UncompressedPoint
+    )
+    return {
+        'endpoint': f"{base_url.rstrip('/')}/push/{index}",
+        'keys': {'p256dh': b64url(p256dh), 'auth': b64url(auth_secret)}
+    }
+
+
+class MockPushStats:
+    """Счетчики принятых сообщений"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.received = 0
+        self.delivered = 0
+        self.errors = 0
+        self.gone = 0
+        self.decrypt_failures = 0
+        self.bytes_received = 0
+        self.first_at = None
+        self.last_at = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (self.last_at - self.first_at) if self.first_at and self.last_at else 0
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'errors': self.errors,
+            'gone': self.gone,
+            'decrypt_failures': self.decrypt_failures,
+            'bytes_received': self.bytes_received,
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(self.received / elapsed, 1) if elapsed > 0 else None
+        }
+
+
+def create_app(
+    secret: str = DEFAULT_SECRET,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    gone_rate: float = 0.0,
+    seed: int = None
+) -> Starlette:
+    stats = MockPushStats()
+    keys_cache: Dict[int, Tuple[ec.EllipticCurvePrivateKey, bytes]] = {}
+    rng = random.Random(seed)
+
+    async def receive_push(request: Request) -> Response:
+        index = request.path_params['index']
+        body = await request.body()
+
+        now = time.perf_counter()
+        stats.received += 1
+        stats.bytes_received += len(body)
+        stats.first_at = stats.first_at or now
+        stats.last_at = now
+
+        if latency_ms or jitter_ms:
+            await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        roll = rng.random()
+        if roll < gone_rate:
+            stats.gone += 1
+            return Response(status_code=410)
+        if roll < gone_rate + error_rate:
+            stats.errors += 1
+            return Response(status_code=500)
+
+        if index not in keys_cache:
+            keys_cache[index] = subscription_keys(secret, index)
+        private_key, auth_secret = keys_cache[index]
+        try:
+            payload = http_ece.decrypt(
+                body,
+                private_key=private_key,
+                auth_secret=auth_secret,
+                version=request.headers.get('content-encoding', 'aes128gcm')
+            )
+            json.loads(payload)
+        except Exception:
+            stats.decrypt_failures += 1
+            return Response(status_code=400)
+
+        stats.last_at = time.perf_counter()
+        stats.delivered += 1
+        return Response(status_code=201)
+
+    async def read_stats(request: Request) -> Response:
+        return JSONResponse(stats.as_dict())
+
+    async def reset_stats(request: Request) -> Response:
+        stats.reset()
+        return JSONResponse(stats.as_dict())
+
+    return Starlette(routes=[
+        Route('/push/{index:int}', receive_push, methods=['POST']),
+        Route('/stats', read_stats, methods=['GET']),
+        Route('/stats/reset', reset_stats, methods=['POST']),
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock push-сервиса для бенчмарков")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--secret', default=DEFAULT_SECRET)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument('--gone-rate', type=float, default=0.0, help="доля ответов 410 Gone")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(
+        secret=args.secret,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        gone_rate=args.gone_rate,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Сквозной бенчмарк конвейера уведомлений.
+
+Заполняет базу тестовыми пользователями, подписками и задачами, поднимает
+локальный mock push-сервиса (benchmarks/mock_push_server.py) и прогоняет
+фоновые задачи BackgroundTaskService так же, как это делает планировщик.
+Сообщает отправок в секунду, задержку отправки p50/p99 и число SQL-запросов
+на одну отправку.
+
+База берется из тех же переменных окружения, что и у приложения
+(DATABASE_URL или POSTGRES_*). Тестовые данные помечаются email вида
+bench-N@bench.local и удаляются после прогона (если не указан --keep).
+
+Запуск из каталога backend:
+    python -m benchmarks.notification_pipeline --users 2000 --tasks-per-user 5 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.services.background_tasks import BackgroundTaskService
+from app.services.notification_coalescer import notification_coalescer
+from app.services.push_encryption import encryption_pool
+from app.services.push_notifications import push_service
+from app.services.task_status import TaskStatusService
+from benchmarks.dataset import (
+    QueryCounter, cleanup, seed_users, seed_tasks, reminder_window_deadlines, percentile
+)
+
+
+def start_mock_server(port: int, latency_ms: float, error_rate: float, gone_rate: float) -> subprocess.Popen:
+    process = subprocess.Popen([
+        sys.executable, '-m', 'benchmarks.mock_push_server',
+        '--port', str(port),
+        '--latency-ms', str(latency_ms),
+        '--error-rate', str(error_rate),
+        '--gone-rate', str(gone_rate),
+        '--seed', '1'
+    ], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock push-сервиса не запустился")
+
+
+async def run(args) -> None:
+    mock_url = args.mock_url or f"http://127.0.0.1:{args.port}"
+    mock_process = None if args.mock_url else start_mock_server(
+        args.port, args.latency_ms, args.error_rate, args.gone_rate
+    )
+
+    # Отправка идет в локальный mock: проверка внешней сети не нужна
+    settings.PUSH_CHECK_CONNECTIVITY = False
+    vapid_key = ec.generate_private_key(ec.SECP256R1())
+    push_service.vapid_private_key = vapid_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    encryption_pool.max_workers = args.workers
+
+    # Замеряем каждую отправку в push-сервис
+    send_latencies = []
+    original_post = push_service._post
+
+    async def timed_post(endpoint, body):
+        started = time.perf_counter()
+        try:
+            return await original_post(endpoint, body)
+        finally:
+            send_latencies.append(time.perf_counter() - started)
+
+    push_service._post = timed_post
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        print(f"Заполнение базы: {args.users} пользователей, {args.tasks_per_user} задач "
+              f"и {args.devices_per_user} устройств на пользователя...")
+        user_ids = seed_users(db, args.users, mock_url, args.devices_per_user)
+        seed_tasks(db, user_ids, args.tasks_per_user, reminder_window_deadlines(datetime.now(timezone.utc)))
+
+        httpx.post(f"{mock_url}/stats/reset")
+        counter = QueryCounter()
+        job_durations = {}
+
+        started = time.perf_counter()
+        job_started = time.perf_counter()
+        TaskStatusService.update_overdue_tasks()
+        job_durations['update_overdue_tasks'] = time.perf_counter() - job_started
+
+        for job in (
+            BackgroundTaskService.check_deadline_reminders,
+            BackgroundTaskService.check_overdue_tasks,
+            BackgroundTaskService.send_daily_summaries,
+        ):
+            job_started = time.perf_counter()
+            await job()
+            job_durations[job.__name__] = time.perf_counter() - job_started
+
+        job_started = time.perf_counter()
+        delivered = await notification_coalescer.flush()
+        job_durations['flush'] = time.perf_counter() - job_started
+        elapsed = time.perf_counter() - started
+
+        mock_stats = httpx.get(f"{mock_url}/stats").json()
+        sends = len(send_latencies)
+
+        print()
+        for name, duration in job_durations.items():
+            print(f"  {name:<28} {duration:8.3f} с")
+        print()
+        print(f"Отправок в push-сервис:       {sends}")
+        print(f"Доставлено дайджестов:        {delivered}")
+        print(f"Отправок в секунду:           {sends / elapsed:.1f}")
+        print(f"Задержка отправки p50 / p99:  {percentile(send_latencies, 0.5) * 1000:.1f} / "
+              f"{percentile(send_latencies, 0.99) * 1000:.1f} мс")
+        print(f"SQL-запросов всего:           {counter.count}")
+        print(f"SQL-запросов на отправку:     {counter.count / sends if sends else 0:.2f}")
+        print(f"Mock push-сервиса:            {mock_stats}")
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+        await push_service.close()
+        encryption_pool.shutdown()
+        if mock_process:
+            mock_process.terminate()
+            mock_process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк конвейера уведомлений")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tasks-per-user', type=int, default=5)
+    parser.add_argument('--devices-per-user', type=int, default=1, help="push-подписок на пользователя")
+    parser.add_argument('--workers', type=int, default=settings.PUSH_ENCRYPTION_WORKERS,
+                        help="процессов для шифрования")
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--mock-url', default=None, help="использовать уже запущенный mock")
+    parser.add_argument('--latency-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--gone-rate', type=float, default=0.0)
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк шифрования push-уведомлений в пуле процессов.
+Сообщает пропускную способность (сообщений в секунду) для разных размеров пула.
+
+Запуск из каталога backend:
+    python -m benchmarks.push_encryption --messages 20000 --workers 0 1 2 4
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.services.push_encryption import PushEncryptionPool
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def make_subscription(index: int) -> dict:
+    """Подписка браузера со случайными ключами p256dh/auth"""
+    receiver_key = ec.generate_private_key(ec.SECP256R1())
+    p256dh = receiver_key.public_key().public_bytes(
+        encoding=serialization.Encoding.X962,
+        format=serialization.PublicFormat.UncompressedPoint
+    )
+    return {
+        'endpoint': f"http://127.0.0.1:8090/push/{index}",
+        'keys': {'p256dh': b64url(p256dh), 'auth': b64url(os.urandom(16))}
+    }
+
+
+def make_payload(index: int) -> bytes:
+    return json.dumps({
+        'title': "⏰ Приближается дедлайн!",
+        'body': f"Задача 'Лабораторная работа №{index}' должна быть выполнена до 01.01.2026 10:00",
+        'icon': '/icons/icon-192x192.png',
+        'badge': '/icons/icon-72x72.png',
+        'tag': 'notification',
+        'requireInteraction': False,
+        'data': {'type': 'deadline', 'url': '/tasks'}
+    }).encode('utf-8')
+
+
+async def run(messages: int, workers: list, batch_size: int) -> None:
+    # Подписок немного - ключи переиспользуются, генерация не должна влиять на замер
+    subscriptions = [make_subscription(i) for i in range(min(messages, 1000))]
+    items = [(subscriptions[i % len(subscriptions)], make_payload(i)) for i in range(messages)]
+
+    print(f"Сообщений: {messages}, размер пачки: {batch_size}, CPU: {os.cpu_count()}")
+    print(f"{'процессов':>10} {'сек':>8} {'сообщ./сек':>12}")
+
+    for pool_size in workers:
+        pool = PushEncryptionPool(max_workers=pool_size, batch_size=batch_size)
+        try:
+            # Прогрев: запуск процессов пула не входит в замер
+            await pool.encrypt(items[:batch_size * max(pool_size, 1)])
+
+            started = time.perf_counter()
+            encrypted = await pool.encrypt(items)
+            elapsed = time.perf_counter() - started
+        finally:
+            pool.shutdown()
+
+        assert len(encrypted) == messages and all(encrypted)
+        print(f"{pool_size:>10} {elapsed:>8.2f} {messages / elapsed:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк шифрования push-уведомлений")
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.messages, args.workers, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
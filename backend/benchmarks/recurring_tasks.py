@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк повторяющихся задач: создание повторений до горизонта
+(BackgroundTaskService.materialize_recurring_tasks) и чтение календаря.
+
+Заполняет базу тестовыми пользователями с еженедельными сериями (семинары
+по нескольким дням недели) и прогоняет создание повторений трижды: первый
+прогон, повторный в тот же день (новых задач быть не должно) и ночной
+на следующий день (серии продлеваются на один день). Затем измеряет
+чтение календаря на месяц без кэша.
+
+Запуск из каталога backend:
+    python -m benchmarks.recurring_tasks --users 2000 --series-per-user 20
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.core.clock import SimulatedClock
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Task
+from app.db.models.task import TaskType, TaskPriority, TaskStatus
+from app.crud.task import get_calendar
+from app.services.background_tasks import BackgroundTaskService
+from app.services.calendar_cache import calendar_cache
+from benchmarks.dataset import QueryCounter, cleanup, seed_users, percentile
+
+PATTERNS = ["FREQ=WEEKLY;BYDAY=MO,WE", "FREQ=WEEKLY;BYDAY=TU,TH", "weekly", "FREQ=WEEKLY;INTERVAL=2", "daily"]
+
+
+def seed_series(db, user_ids, series_per_user: int, now: datetime) -> int:
+    rng = random.Random(42)
+    tasks = []
+    for user_id in user_ids:
+        for n in range(series_per_user):
+            tasks.append({
+                'user_id': user_id,
+                'title': f"Семинар №{n + 1}",
+                'task_type': TaskType.seminar,
+                'priority': TaskPriority.current,
+                'status': TaskStatus.pending,
+                'deadline': now - timedelta(days=rng.randint(0, 60), hours=rng.randint(0, 12)),
+                'is_overdue': False,
+                'is_recurring': True,
+                'recurrence_pattern': PATTERNS[n % len(PATTERNS)],
+                'color': "#3B82F6"
+            })
+    for start in range(0, len(tasks), 1000):
+        db.execute(insert(Task), tasks[start:start + 1000])
+    db.commit()
+    return len(tasks)
+
+
+def run(args) -> None:
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        now = datetime.now(timezone.utc)
+        print(f"Заполнение базы: {args.users} пользователей, {args.series_per_user} серий на пользователя...")
+        user_ids = seed_users(db, args.users)
+        seed_series(db, user_ids, args.series_per_user, now)
+
+        clock = SimulatedClock(now)
+        BackgroundTaskService.clock = clock
+        for attempt, advance in (("первый", 0), ("повторный", 0), ("на следующий день", 86400)):
+            clock.advance(advance)
+            counter = QueryCounter()
+            before = db.query(Task).filter(Task.recurrence_master_id.isnot(None)).count()
+            started = time.perf_counter()
+            BackgroundTaskService.materialize_recurring_tasks()
+            elapsed = time.perf_counter() - started
+            counter.close()
+            created = db.query(Task).filter(Task.recurrence_master_id.isnot(None)).count() - before
+            print(f"Создание повторений ({attempt}): {elapsed:.2f} с, "
+                  f"{counter.count} SQL-запросов, создано задач: {created}")
+
+        # Месяц внутри горизонта и месяц за горизонтом (серии разворачиваются на лету)
+        horizon = timedelta(weeks=settings.RECURRENCE_HORIZON_WEEKS)
+        for label, window_from in (("внутри горизонта", now), ("за горизонтом", now + horizon)):
+            timings = []
+            items = 0
+            for user_id in random.Random(1).sample(user_ids, min(args.reads, len(user_ids))):
+                calendar_cache.clear()
+                started = time.perf_counter()
+                items += len(get_calendar(db, user_id, window_from, window_from + timedelta(days=31)))
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"Календарь на месяц {label}: p50 {percentile(timings, 0.5):.1f} мс, "
+                  f"p95 {percentile(timings, 0.95):.1f} мс, в среднем {items / len(timings):.0f} записей")
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк повторяющихся задач")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--series-per-user', type=int, default=20)
+    parser.add_argument('--reads', type=int, default=200, help="сколько календарей прочитать")
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Проверка ограниченного потребления памяти фоновыми задачами (tracemalloc).
+
+Для нескольких объемов данных заполняет базу задачами в окне напоминаний,
+выполняет check_deadline_reminders и check_overdue_tasks и измеряет пик
+выделенной Python-памяти. Проверка считается пройденной, если пик не
+превышает --max-peak-mb и при росте таблицы в N раз растет не более чем
+в --max-growth раз. Push-уведомления не отправляются, а считаются.
+
+Запуск из каталога backend (код возврата 1 при превышении):
+    python -m benchmarks.scheduler_memory --users 2000 8000 --tasks-per-user 10
+"""
+import argparse
+import asyncio
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.core.clock import SimulatedClock
+from app.db.base import SessionLocal
+from app.services.background_tasks import BackgroundTaskService
+from app.services.notification_coalescer import notification_coalescer
+from app.services.notifications import notification_service
+from benchmarks.dataset import cleanup, seed_users, seed_tasks
+from benchmarks.scheduler_replay import RecordingPushService
+
+
+def due_and_overdue(now: datetime):
+    """Половина задач в окне напоминаний, половина просрочена на 2+ дня"""
+    def deadline(rng, n: int) -> datetime:
+        if n % 2:
+            return now + timedelta(minutes=rng.randint(5, 23 * 60))
+        return now - timedelta(days=rng.randint(2, 30))
+    return deadline
+
+
+async def measure(users: int, tasks_per_user: int, now: datetime) -> float:
+    """Пик памяти (МБ) при обработке users * tasks_per_user задач"""
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        user_ids = seed_users(db, users)
+        seed_tasks(db, user_ids, tasks_per_user, due_and_overdue(now))
+    finally:
+        db.close()
+
+    recorder = RecordingPushService()
+    notification_service.push_service = recorder
+
+    tracemalloc.start()
+    try:
+        await BackgroundTaskService.check_deadline_reminders()
+        await BackgroundTaskService.check_overdue_tasks()
+        await notification_coalescer.flush()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+    finally:
+        db.close()
+
+    print(f"  задач: {users * tasks_per_user:>9}, уведомлений: {recorder.sent:>7}, пик памяти: {peak / 2**20:8.2f} МБ")
+    return peak / 2**20
+
+
+async def run(args) -> bool:
+    now = datetime.fromisoformat(args.start)
+    BackgroundTaskService.clock = SimulatedClock(now)
+
+    peaks = []
+    for users in args.users:
+        peaks.append(await measure(users, args.tasks_per_user, now))
+
+    ok = True
+    if max(peaks) > args.max_peak_mb:
+        print(f"❌ Пик памяти {max(peaks):.2f} МБ превышает порог {args.max_peak_mb} МБ")
+        ok = False
+    growth = peaks[-1] / peaks[0] if peaks[0] else 0
+    size_growth = args.users[-1] / args.users[0]
+    if len(peaks) > 1 and growth > args.max_growth:
+        print(f"❌ При росте данных в {size_growth:.1f} раз пик памяти вырос в {growth:.2f} раз")
+        ok = False
+    if ok:
+        print(f"✅ Память ограничена: рост данных в {size_growth:.1f} раз, рост пика в {growth:.2f} раз")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Проверка памяти фоновых задач")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 4000])
+    parser.add_argument('--tasks-per-user', type=int, default=10)
+    parser.add_argument('--max-peak-mb', type=float, default=64.0)
+    parser.add_argument('--max-growth', type=float, default=1.5)
+    parser.add_argument('--start', default="2025-09-01T12:00:00+00:00")
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Прогон фонового планировщика в виртуальном времени.
+
+BackgroundTaskService получает SimulatedClock, и такты планировщика
+выполняются подряд без ожидания: сутки (1440 тактов) проходят за секунды
+или минуты. База заполняется пользователями с дедлайнами, равномерно
+распределенными по интервалу прогона. Push-уведомления не отправляются,
+а записываются. Для каждого такта фиксируются число SQL-запросов,
+число отправленных уведомлений и длительность каждой фоновой задачи.
+
+Прогон детерминирован (фиксированные начальное время и seed), поэтому
+результаты можно сравнивать между версиями планировщика (--output).
+
+Запуск из каталога backend:
+    python -m benchmarks.scheduler_replay --users 5000 --tasks-per-user 10 --hours 24 --output replay.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+from app.core.clock import SimulatedClock
+from app.db.base import SessionLocal
+from app.services.background_tasks import BackgroundTaskService, SCHEDULER_TICK_SECONDS
+from app.services.notifications import notification_service
+from app.services.task_status import TaskStatusService
+from benchmarks.dataset import QueryCounter, cleanup, seed_users, seed_tasks, percentile
+
+SCHEDULER_JOBS = [
+    (BackgroundTaskService, 'check_deadline_reminders'),
+    (BackgroundTaskService, 'check_overdue_tasks'),
+    (BackgroundTaskService, 'send_daily_summaries'),
+    (TaskStatusService, 'update_overdue_tasks'),
+]
+
+
+class RecordingPushService:
+    """Вместо отправки в push-сервис записывает количество уведомлений"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, bool]:
+        self.sent += len(messages)
+        return {message['user_id']: True for message in messages}
+
+    async def send_notification(self, user_id: int, title: str, body: str, data=None) -> bool:
+        self.sent += 1
+        return True
+
+
+def instrument_jobs(durations: Dict[str, float]) -> None:
+    """Оборачивает фоновые задачи замером длительности текущего такта"""
+    for owner, name in SCHEDULER_JOBS:
+        job = getattr(owner, name)
+
+        if asyncio.iscoroutinefunction(job):
+            async def timed(*args, _job=job, _name=name, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await _job(*args, **kwargs)
+                finally:
+                    durations[_name] = durations.get(_name, 0.0) + time.perf_counter() - started
+        else:
+            def timed(*args, _job=job, _name=name, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return _job(*args, **kwargs)
+                finally:
+                    durations[_name] = durations.get(_name, 0.0) + time.perf_counter() - started
+
+        setattr(owner, name, staticmethod(timed))
+
+
+def spread_deadlines(start: datetime, hours: int):
+    """Дедлайны равномерно от суток до начала прогона до суток после его конца"""
+    span_seconds = (hours + 48) * 3600
+
+    def deadline(rng, n: int) -> datetime:
+        return start - timedelta(hours=24) + timedelta(seconds=rng.randrange(span_seconds))
+    return deadline
+
+
+def summarize(ticks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    queries = [tick['queries'] for tick in ticks]
+    summary = {
+        'ticks': len(ticks),
+        'queries_total': sum(queries),
+        'queries_per_tick_avg': round(sum(queries) / len(ticks), 2) if ticks else 0,
+        'queries_per_tick_max': max(queries, default=0),
+        'pushes_total': sum(tick['pushes'] for tick in ticks),
+        'jobs': {}
+    }
+    job_names = sorted({name for tick in ticks for name in tick['jobs']})
+    for name in job_names:
+        durations = [tick['jobs'][name] for tick in ticks if name in tick['jobs']]
+        summary['jobs'][name] = {
+            'runs': len(durations),
+            'avg_ms': round(sum(durations) / len(durations) * 1000, 2),
+            'p99_ms': round(percentile(durations, 0.99) * 1000, 2),
+            'max_ms': round(max(durations) * 1000, 2)
+        }
+    return summary
+
+
+async def replay(args) -> Dict[str, Any]:
+    start = datetime.fromisoformat(args.start)
+    clock = SimulatedClock(start)
+    BackgroundTaskService.clock = clock
+
+    recorder = RecordingPushService()
+    notification_service.push_service = recorder
+
+    durations: Dict[str, float] = {}
+    instrument_jobs(durations)
+
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        print(f"Заполнение базы: {args.users} пользователей, {args.tasks_per_user} задач на пользователя...")
+        user_ids = seed_users(db, args.users)
+        seed_tasks(db, user_ids, args.tasks_per_user, spread_deadlines(clock.now(), args.hours), seed=args.seed)
+
+        counter = QueryCounter()
+        ticks = []
+        total_ticks = args.hours * 3600 // SCHEDULER_TICK_SECONDS
+        started = time.perf_counter()
+
+        for _ in range(total_ticks):
+            durations.clear()
+            queries_before = counter.count
+            pushes_before = recorder.sent
+
+            await BackgroundTaskService.run_scheduler_tick()
+
+            ticks.append({
+                'at': clock.now().isoformat(),
+                'queries': counter.count - queries_before,
+                'pushes': recorder.sent - pushes_before,
+                'jobs': dict(durations)
+            })
+            await clock.sleep(SCHEDULER_TICK_SECONDS)
+
+        counter.close()
+        result = {
+            'start': args.start,
+            'users': args.users,
+            'tasks_per_user': args.tasks_per_user,
+            'wall_seconds': round(time.perf_counter() - started, 2),
+            'summary': summarize(ticks),
+            'ticks': ticks
+        }
+        return result
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Прогон планировщика в виртуальном времени")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tasks-per-user', type=int, default=10)
+    parser.add_argument('--hours', type=int, default=24, help="длительность прогона в виртуальных часах")
+    parser.add_argument('--start', default="2025-09-01T00:00:00+00:00", help="начало виртуального времени")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="сохранить результаты по тактам в JSON")
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    result = asyncio.run(replay(args))
+
+    print(f"Прогон: {args.hours} ч виртуального времени за {result['wall_seconds']} с")
+    print(json.dumps(result['summary'], ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Результаты по тактам сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сериализации списков задач (GET /tasks/, /tasks/upcoming/list,
+/tasks/overdue/list).
+
+Сравнивает прежний путь ответа - задачи в ORM, проверка response_model
+(pydantic, from_attributes) и json.dumps - с текущим: словари из строк
+запроса (crud.task.get_tasks) и orjson. Оба ответа разбираются и
+сравниваются, чтобы убедиться, что содержимое не изменилось.
+
+Запуск из каталога backend:
+    python -m benchmarks.task_list_serialization --users 20 --tasks-per-user 500
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from app.core.serialization import JSONResponse
+from app.crud.task import get_tasks
+from app.db.base import SessionLocal
+from app.db.models import Task, TaskStep
+from app.schemas.task import Task as TaskSchema
+from benchmarks.dataset import QueryCounter, cleanup, seed_users, seed_tasks, percentile, INSERT_CHUNK
+
+TASK_LIST = TypeAdapter(List[TaskSchema])
+
+
+def seed_steps(db, user_ids, max_steps: int) -> int:
+    """Этапы задач: у n-й задачи n % (max_steps + 1) этапов"""
+    task_ids = [task_id for (task_id,) in db.query(Task.id).filter(Task.user_id.in_(user_ids)).order_by(Task.id)]
+    steps = [
+        {'task_id': task_id, 'title': f"Этап {order + 1}", 'order': order, 'is_completed': order % 2 == 1}
+        for n, task_id in enumerate(task_ids)
+        for order in range(n % (max_steps + 1))
+    ]
+    for start in range(0, len(steps), INSERT_CHUNK):
+        db.execute(insert(TaskStep), steps[start:start + INSERT_CHUNK])
+    db.commit()
+    return len(steps)
+
+
+def response_model_body(db, user_id: int, limit: int, eager: bool) -> bytes:
+    """Прежний путь: задачи в ORM -> TypeAdapter(List[Task]) -> json.dumps (как JSONResponse starlette)"""
+    query = db.query(Task).filter(Task.user_id == user_id)
+    if eager:
+        query = query.options(selectinload(Task.steps))
+    tasks = TASK_LIST.validate_python(query.offset(0).limit(limit).all(), from_attributes=True)
+    content = TASK_LIST.dump_python(tasks, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def rows_body(db, user_id: int, limit: int) -> bytes:
+    """Текущий путь: словари из строк запроса -> orjson"""
+    return JSONResponse(get_tasks(db, user_id, skip=0, limit=limit)).body
+
+
+def normalized(body: bytes):
+    tasks = json.loads(body)
+    for task in tasks:
+        task["steps"].sort(key=lambda step: (step["order"], step["id"]))
+    return sorted(tasks, key=lambda task: task["id"])
+
+
+def measure(label: str, db, runs: int, user_ids, call) -> None:
+    rng = random.Random(1)
+    counter = QueryCounter()
+    timings = []
+    size = 0
+    try:
+        for _ in range(runs):
+            db.expunge_all()  # задачи загружаются заново, как в новом запросе
+            started = time.perf_counter()
+            size = len(call(rng.choice(user_ids)))
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        counter.close()
+    print(
+        f"{label:<34} p50 {percentile(timings, 0.5):7.1f} мс   p95 {percentile(timings, 0.95):7.1f} мс   "
+        f"запросов {counter.count / runs:5.1f}   {size // 1024} КБ"
+    )
+
+
+def run(args) -> None:
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        print(f"Заполнение базы: {args.users} пользователей, {args.tasks_per_user} задач на пользователя...")
+        user_ids = seed_users(db, args.users)
+        now = datetime.now(timezone.utc)
+        seed_tasks(db, user_ids, args.tasks_per_user, lambda rng, n: now + timedelta(hours=rng.randint(-240, 720)))
+        print(f"Этапов: {seed_steps(db, user_ids, args.max_steps)}")
+
+        limit = args.tasks_per_user
+        old = normalized(response_model_body(db, user_ids[0], limit, eager=False))
+        new = normalized(rows_body(db, user_ids[0], limit))
+        assert old == new, "Ответы прежнего и текущего пути различаются"
+        print(f"Ответы совпадают ({len(new)} задач)")
+
+        measure("response_model (как было)", db, args.runs, user_ids,
+                lambda user_id: response_model_body(db, user_id, limit, eager=False))
+        measure("response_model + selectinload", db, args.runs, user_ids,
+                lambda user_id: response_model_body(db, user_id, limit, eager=True))
+        measure("строки + orjson", db, args.runs, user_ids, lambda user_id: rows_body(db, user_id, limit))
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации списков задач")
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks-per-user', type=int, default=500)
+    parser.add_argument('--max-steps', type=int, default=3, help="наибольшее число этапов задачи")
+    parser.add_argument('--runs', type=int, default=100, help="запросов на каждое измерение")
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк поиска задач (GET /tasks/search, GET /tasks/search/suggest).
+
+Заполняет базу тестовыми пользователями с задачами, названия и описания
+которых собраны из учебного словаря, и измеряет задержку поиска и подсказок
+для случайных пользователей и запросов (в том числе недопечатанных слов).
+Для оценки на миллионах строк: --users 10000 --tasks-per-user 100.
+
+Запуск из каталога backend:
+    python -m benchmarks.task_search --users 10000 --tasks-per-user 100
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import insert, text
+
+from app.db.base import SessionLocal
+from app.db.models import Task
+from app.db.models.task import TaskType, TaskPriority, TaskStatus
+from app.crud.task import search_tasks, suggest_task_titles, decode_search_cursor
+from benchmarks.dataset import cleanup, seed_users, percentile
+
+SUBJECTS = [
+    "базы данных", "математический анализ", "линейная алгебра", "физика", "история",
+    "программирование", "английский язык", "экономика", "философия", "дискретная математика",
+    "operating systems", "computer networks", "machine learning", "statistics",
+]
+KINDS = ["Курсовая по", "Лабораторная по", "Экзамен:", "Домашнее задание по", "Семинар по", "Project on"]
+DETAILS = [
+    "подготовить отчет", "сдать преподавателю", "решить задачи из сборника", "прочитать главу",
+    "write a summary", "оформить презентацию", "повторить лекции", "индексы и нормализация",
+]
+QUERIES = ["базы", "лабораторная физика", "экзамен", "матем", "networks", "отчет", "history", "лин алг", "презент"]
+
+
+def seed_search_tasks(db, user_ids, tasks_per_user: int) -> int:
+    rng = random.Random(42)
+    task_types = list(TaskType)
+    batch = []
+    total = 0
+    for user_id in user_ids:
+        for n in range(tasks_per_user):
+            batch.append({
+                'user_id': user_id,
+                'title': f"{rng.choice(KINDS)} {rng.choice(SUBJECTS)} №{n + 1}",
+                'description': ", ".join(rng.sample(DETAILS, 2)),
+                'task_type': task_types[n % len(task_types)],
+                'priority': TaskPriority.current,
+                'status': TaskStatus.pending,
+                'deadline': "2026-01-01T00:00:00+00:00",
+                'is_overdue': False,
+                'color': "#3B82F6"
+            })
+        if len(batch) >= 10000:
+            db.execute(insert(Task), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(Task), batch)
+        total += len(batch)
+    db.commit()
+    db.execute(text("ANALYZE tasks"))
+    return total
+
+
+def measure(label: str, runs: int, call) -> None:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<30} p50 {percentile(timings, 0.5):6.1f} мс   p95 {percentile(timings, 0.95):6.1f} мс")
+
+
+def run(args) -> None:
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        print(f"Заполнение базы: {args.users} пользователей, {args.tasks_per_user} задач на пользователя...")
+        user_ids = seed_users(db, args.users)
+        seed_search_tasks(db, user_ids, args.tasks_per_user)
+        print(f"Всего задач в базе: {db.query(Task).count()}")
+
+        rng = random.Random(1)
+
+        def two_pages():
+            user_id, q = rng.choice(user_ids), rng.choice(QUERIES)
+            page = search_tasks(db, user_id, q, limit=20)
+            if page.next_cursor:
+                # Вторая страница - по ключу, без OFFSET
+                search_tasks(db, user_id, q, limit=20, cursor=decode_search_cursor(page.next_cursor))
+
+        measure("Поиск (первая страница)", args.runs,
+                lambda: search_tasks(db, rng.choice(user_ids), rng.choice(QUERIES), limit=20))
+        measure("Поиск (две страницы)", args.runs, two_pages)
+        measure("Подсказки", args.runs,
+                lambda: suggest_task_titles(db, rng.choice(user_ids), rng.choice(QUERIES)[:3]))
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска задач")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--tasks-per-user', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=500, help="запросов на каждое измерение")
+    parser.add_argument('--keep', action='store_true', help="не удалять тестовые данные")
+    args = parser.parse_args()
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Общие фикстуры тестов API: клиент приложения (без lifespan - планировщик
+не запускается) и тестовый пользователь с токеном доступа.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db.base import SessionLocal
+from app.db.models.user import User
+from app.main import app
+from benchmarks.dataset import cleanup, seed_users
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def api_user():
+    """id тестового пользователя; данные удаляются до и после теста"""
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        yield seed_users(db, 1)[0]
+        cleanup(db)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def auth_headers(api_user):
+    db = SessionLocal()
+    try:
+        email = db.get(User, api_user).email
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
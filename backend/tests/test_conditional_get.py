@@ -0,0 +1,106 @@
+"""
+Условный GET (ETag / If-None-Match): 304, пока данные пользователя не
+менялись, и новый ETag после любого изменения задач, этапов, целей и
+изменений синхронизации. Нужна база PostgreSQL приложения; без нее тесты
+пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_conditional_get.py
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.base import engine
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+CACHED_URL = "/api/v1/tasks/"
+
+
+def deadline(days: int = 1) -> str:
+    return (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def data(client, auth_headers):
+    """Задача с этапом и цель пользователя"""
+    task = client.post("/api/v1/tasks/", headers=auth_headers, json={
+        "title": "задача",
+        "task_type": "homework",
+        "priority": "current",
+        "deadline": deadline(),
+        "steps": [{"title": "этап"}]
+    }).json()
+    goal = client.post("/api/v1/goals/", headers=auth_headers, json={
+        "title": "цель",
+        "goal_type": "weekly",
+        "target_value": 10,
+        "start_date": deadline(0),
+        "end_date": deadline(7)
+    }).json()
+    return {"task": task, "step": task["steps"][0], "goal": goal}
+
+
+def etag(client, headers) -> str:
+    response = client.get(CACHED_URL, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_unchanged_data_is_not_modified(client, auth_headers, data):
+    tag = etag(client, auth_headers)
+
+    response = client.get(CACHED_URL, headers={**auth_headers, "If-None-Match": tag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == tag
+    assert response.content == b""
+
+
+WRITES = {
+    "create_task": lambda client, headers, data: client.post("/api/v1/tasks/", headers=headers, json={
+        "title": "новая", "task_type": "exam", "priority": "current", "deadline": deadline()
+    }),
+    "update_task": lambda client, headers, data: client.put(
+        f"/api/v1/tasks/{data['task']['id']}", headers=headers, json={"title": "переименована"}
+    ),
+    "delete_task": lambda client, headers, data: client.delete(f"/api/v1/tasks/{data['task']['id']}", headers=headers),
+    "complete_step": lambda client, headers, data: client.put(
+        f"/api/v1/tasks/steps/{data['step']['id']}/complete", headers=headers, params={"is_completed": True}
+    ),
+    "create_goal": lambda client, headers, data: client.post("/api/v1/goals/", headers=headers, json={
+        "title": "новая цель", "goal_type": "monthly", "target_value": 3,
+        "start_date": deadline(0), "end_date": deadline(30)
+    }),
+    "update_goal": lambda client, headers, data: client.put(
+        f"/api/v1/goals/{data['goal']['id']}", headers=headers, json={"title": "переименована"}
+    ),
+    "goal_progress": lambda client, headers, data: client.post(
+        f"/api/v1/goals/{data['goal']['id']}/progress", headers=headers, json={"increment": 1}
+    ),
+    "goals_progress_batch": lambda client, headers, data: client.post("/api/v1/goals/progress", headers=headers, json={
+        "items": [{"goal_id": data["goal"]["id"], "increment": 1}]
+    }),
+    "delete_goal": lambda client, headers, data: client.delete(f"/api/v1/goals/{data['goal']['id']}", headers=headers),
+    "sync_mutations": lambda client, headers, data: client.post("/api/v1/sync/mutations", headers=headers, json={
+        "mutations": [{"op": "update_task", "task_id": data["task"]["id"], "changes": {"title": "офлайн"}}]
+    }),
+}
+
+
+@pytest.mark.parametrize("write", WRITES.values(), ids=WRITES.keys())
+def test_write_changes_etag(client, auth_headers, data, write):
+    tag = etag(client, auth_headers)
+
+    assert write(client, auth_headers, data).status_code == 200
+
+    response = client.get(CACHED_URL, headers={**auth_headers, "If-None-Match": tag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != tag
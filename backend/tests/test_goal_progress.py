@@ -0,0 +1,82 @@
+"""
+Пакетное обновление прогресса целей POST /goals/progress: все изменения
+или ни одного. Нужна база PostgreSQL приложения; без нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_goal_progress.py
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.base import engine
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+UNKNOWN_GOAL_ID = 2 ** 31 - 1
+
+
+def create_goal(client, headers, title: str) -> dict:
+    now = datetime.now(timezone.utc)
+    response = client.post("/api/v1/goals/", headers=headers, json={
+        "title": title,
+        "goal_type": "weekly",
+        "target_value": 10,
+        "start_date": now.isoformat(),
+        "end_date": (now + timedelta(days=7)).isoformat()
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def progress(client, headers) -> dict:
+    response = client.get("/api/v1/goals/", headers=headers)
+    assert response.status_code == 200
+    return {goal["id"]: goal["current_value"] for goal in response.json()}
+
+
+def test_batch_applies_in_request_order(client, auth_headers):
+    first = create_goal(client, auth_headers, "первая")
+    second = create_goal(client, auth_headers, "вторая")
+
+    response = client.post("/api/v1/goals/progress", headers=auth_headers, json={"items": [
+        {"goal_id": second["id"], "increment": 2},
+        {"goal_id": first["id"], "increment": 1},
+        {"goal_id": second["id"], "increment": 1}
+    ]})
+
+    assert response.status_code == 200
+    assert [(goal["id"], goal["current_value"]) for goal in response.json()] == [(second["id"], 3), (first["id"], 1)]
+
+
+def test_unknown_goal_rejects_whole_batch(client, auth_headers):
+    goal = create_goal(client, auth_headers, "цель")
+
+    response = client.post("/api/v1/goals/progress", headers=auth_headers, json={"items": [
+        {"goal_id": goal["id"], "increment": 5},
+        {"goal_id": UNKNOWN_GOAL_ID, "increment": 1}
+    ]})
+
+    assert response.status_code == 404
+    assert progress(client, auth_headers) == {goal["id"]: 0}
+
+
+def test_zero_increment_returns_goal_unchanged(client, auth_headers):
+    goal = create_goal(client, auth_headers, "цель")
+
+    response = client.post("/api/v1/goals/progress", headers=auth_headers, json={"items": [
+        {"goal_id": goal["id"], "increment": 0}
+    ]})
+
+    assert response.status_code == 200
+    [returned] = response.json()
+    assert returned["id"] == goal["id"]
+    assert returned["current_value"] == 0
+    assert returned["updated_at"] == goal["updated_at"]
+    assert progress(client, auth_headers) == {goal["id"]: 0}
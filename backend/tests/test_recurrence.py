@@ -0,0 +1,48 @@
+"""
+Правила повторения: границы INTERVAL и COUNT и серии, доходящие до
+конца диапазона datetime.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_recurrence.py
+"""
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.task import TaskUpdate
+from app.services.recurrence import MAX_COUNT, MAX_INTERVAL, occurrences, parse_rule
+
+START = datetime(2025, 1, 31, tzinfo=timezone.utc)
+END_OF_TIME = datetime.max.replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("pattern", [
+    f"FREQ=DAILY;INTERVAL={MAX_INTERVAL + 1}",
+    "FREQ=DAILY;INTERVAL=1000000000",
+    f"FREQ=MONTHLY;COUNT={MAX_COUNT + 1}",
+    "FREQ=YEARLY",
+    "каждый день",
+])
+def test_unsupported_pattern_is_rejected(pattern):
+    assert parse_rule(pattern) is None
+    with pytest.raises(ValidationError):
+        TaskUpdate(recurrence_pattern=pattern)
+
+
+@pytest.mark.parametrize("pattern", ["daily", "FREQ=WEEKLY;BYDAY=MO,WE", f"FREQ=MONTHLY;INTERVAL={MAX_INTERVAL}"])
+def test_supported_pattern_is_accepted(pattern):
+    assert TaskUpdate(recurrence_pattern=pattern).recurrence_pattern == pattern
+
+
+@pytest.mark.parametrize("freq", ["DAILY", "WEEKLY", "MONTHLY"])
+def test_series_ends_at_datetime_limit(freq):
+    dates = list(occurrences(START, f"FREQ={freq};INTERVAL={MAX_INTERVAL}", START, END_OF_TIME))
+    assert dates[0] == START
+    assert dates == sorted(dates)
+    assert dates[-1].year > 9000
+
+
+def test_daily_series_at_last_day():
+    last_day = datetime(9999, 12, 31, tzinfo=timezone.utc)
+    assert list(occurrences(last_day, "daily", last_day, END_OF_TIME)) == [last_day]
@@ -0,0 +1,84 @@
+"""
+Продление серий фоновой задачей: серия, которую не удалось развернуть, не
+останавливает продление остальных. Нужна база PostgreSQL приложения; без
+нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_recurring_materialization.py
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.clock import SimulatedClock
+from app.crud import task as crud_task
+from app.db.base import SessionLocal, engine
+from app.db.models.task import Task, TaskType, TaskPriority, TaskStatus
+from app.services.background_tasks import BackgroundTaskService
+from benchmarks.dataset import cleanup, seed_users
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+NOW = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+BROKEN_PATTERN = "FREQ=WEEKLY;BYDAY=FR"
+
+
+@pytest.fixture
+def masters():
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        user_id = seed_users(db, 1)[0]
+        ids = db.execute(insert(Task).returning(Task.id), [
+            {
+                'user_id': user_id,
+                'title': f"Серия {pattern}",
+                'task_type': TaskType.homework,
+                'priority': TaskPriority.current,
+                'status': TaskStatus.pending,
+                'deadline': NOW,
+                'is_overdue': False,
+                'is_recurring': True,
+                'recurrence_pattern': pattern,
+                'color': "#3B82F6"
+            }
+            for pattern in ("daily", BROKEN_PATTERN, "weekly")
+        ]).scalars().all()
+        db.commit()
+        yield ids
+        cleanup(db)
+    finally:
+        db.close()
+
+
+def test_broken_series_is_skipped(masters, monkeypatch):
+    expand = crud_task.occurrences
+
+    def occurrences(start, pattern, window_from, window_to):
+        if pattern == BROKEN_PATTERN:
+            raise ValueError("сломанная серия")
+        return expand(start, pattern, window_from, window_to)
+
+    monkeypatch.setattr(crud_task, "occurrences", occurrences)
+    monkeypatch.setattr(BackgroundTaskService, "clock", SimulatedClock(NOW))
+    BackgroundTaskService.materialize_recurring_tasks()
+
+    db = SessionLocal()
+    try:
+        created = dict(
+            db.query(Task.recurrence_master_id, Task.id).filter(Task.recurrence_master_id.in_(masters)).all()
+        )
+        materialized = dict(db.query(Task.id, Task.recurrence_materialized_until).filter(Task.id.in_(masters)).all())
+    finally:
+        db.close()
+    daily, broken, weekly = masters
+    assert set(created) == {daily, weekly}
+    assert materialized[daily] is not None and materialized[weekly] is not None
+    # Не отмечена продленной - будет развернута снова в следующий раз
+    assert materialized[broken] is None
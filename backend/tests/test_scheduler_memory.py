@@ -0,0 +1,107 @@
+"""
+Потребление памяти фоновыми задачами не растет вместе с таблицей задач
+(tracemalloc). Нужна база PostgreSQL приложения; без нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_scheduler_memory.py
+"""
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.clock import SimulatedClock
+from app.core.config import settings
+from app.db.base import SessionLocal, engine
+from app.services.background_tasks import BackgroundTaskService
+from app.services.notification_coalescer import notification_coalescer
+from app.services.notifications import notification_service
+from app.services.task_status import TaskStatusService
+from benchmarks.dataset import cleanup, seed_users, seed_tasks
+from benchmarks.scheduler_replay import RecordingPushService
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+NOW = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+CHUNK_SIZE = 100
+TASKS_PER_USER = 10
+# Рост данных в 4 раза: пик памяти может вырасти не больше чем в полтора раза
+SMALL_USERS, LARGE_USERS = 100, 400
+MAX_GROWTH = 1.5
+
+
+def due_and_overdue(rng, n: int) -> datetime:
+    """Половина задач в окне напоминаний, половина просрочена на 2+ дня"""
+    if n % 2:
+        return NOW + timedelta(minutes=rng.randint(5, 23 * 60))
+    return NOW - timedelta(days=rng.randint(2, 30))
+
+
+def seed(users: int) -> None:
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        seed_tasks(db, seed_users(db, users), TASKS_PER_USER, due_and_overdue)
+    finally:
+        db.close()
+
+
+def peak_memory(job) -> int:
+    """Пик выделенной Python-памяти (байт) при выполнении job"""
+    tracemalloc.start()
+    try:
+        job()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+async def notify_overdue() -> None:
+    await BackgroundTaskService.check_deadline_reminders()
+    await BackgroundTaskService.check_overdue_tasks()
+    await notification_coalescer.flush()
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_SCAN_CHUNK_SIZE", CHUNK_SIZE)
+    monkeypatch.setattr(BackgroundTaskService, "clock", SimulatedClock(NOW))
+    monkeypatch.setattr(notification_service, "push_service", RecordingPushService())
+    yield
+    db = SessionLocal()
+    try:
+        cleanup(db)
+    finally:
+        db.close()
+
+
+def measure(users: int, job) -> int:
+    seed(users)
+    job()  # прогрев: кэши запросов SQLAlchemy не относятся к объему данных
+    seed(users)
+    return peak_memory(job)
+
+
+def test_queue_by_user_memory_is_bounded(scheduler):
+    job = lambda: asyncio.run(notify_overdue())
+    small = measure(SMALL_USERS, job)
+    large = measure(LARGE_USERS, job)
+    assert notification_service.push_service.sent > 0
+    assert large <= small * MAX_GROWTH, f"пик памяти {small} -> {large} байт"
+
+
+def test_update_overdue_tasks_memory_is_bounded(scheduler):
+    updated = []
+    job = lambda: updated.append(TaskStatusService.update_overdue_tasks(NOW))
+    small = measure(SMALL_USERS, job)
+    large = measure(LARGE_USERS, job)
+    assert updated[-1] == LARGE_USERS * TASKS_PER_USER // 2
+    assert large <= small * MAX_GROWTH, f"пик памяти {small} -> {large} байт"
@@ -0,0 +1,102 @@
+"""
+Курсор синхронизации не пропускает изменения параллельных транзакций:
+номер изменения, выданный раньше, не может быть зафиксирован позже
+большего номера того же пользователя. Нужна база PostgreSQL приложения;
+без нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_sync_cursor.py
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text, update
+from sqlalchemy.exc import OperationalError
+
+from app.crud import task as crud_task
+from app.crud.sync import get_changes
+from app.db.base import SessionLocal, engine
+from app.db.models.task import Task, TaskType, TaskPriority
+from app.schemas.task import TaskCreate
+from benchmarks.dataset import cleanup, seed_users
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+
+def new_task(title: str) -> TaskCreate:
+    return TaskCreate(
+        title=title,
+        task_type=TaskType.homework,
+        priority=TaskPriority.current,
+        deadline=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+
+
+def sync(user_id: int, since: int):
+    """Один запрос синхронизации клиента - отдельная транзакция"""
+    db = SessionLocal()
+    try:
+        return get_changes(db, user_id, since)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def user_id():
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        yield seed_users(db, 1)[0]
+        cleanup(db)
+    finally:
+        db.close()
+
+
+def test_cursor_does_not_pass_uncommitted_change(user_id):
+    db = SessionLocal()
+    try:
+        task_id = crud_task.create_task(db, new_task("существующая"), user_id).id
+    finally:
+        db.close()
+    cursor = sync(user_id, 0).cursor
+
+    # Первая транзакция меняет задачу массовым запросом в обход ORM (как
+    # отметка просрочки или изменение серии) и пока не фиксируется
+    first = SessionLocal()
+    first.execute(update(Task).where(Task.id == task_id).values(is_overdue=True))
+
+    # Вторая транзакция того же пользователя пытается зафиксироваться раньше
+    second_ids = []
+
+    def second_writer():
+        db = SessionLocal()
+        try:
+            second_ids.append(crud_task.create_task(db, new_task("новая"), user_id).id)
+        finally:
+            db.close()
+
+    writer = threading.Thread(target=second_writer)
+    writer.start()
+    writer.join(timeout=1)
+    # Вторая запись ждет фиксации первой: номер изменения выдается под
+    # блокировкой пользователя
+    assert writer.is_alive()
+
+    # Клиент синхронизируется между записями
+    seen = set()
+    changes = sync(user_id, cursor)
+    seen.update(task.id for task in changes.tasks)
+
+    first.commit()
+    first.close()
+    writer.join(timeout=10)
+    assert not writer.is_alive()
+
+    changes = sync(user_id, changes.cursor)
+    seen.update(task.id for task in changes.tasks)
+    assert seen == {task_id, second_ids[0]}
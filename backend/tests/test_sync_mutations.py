@@ -0,0 +1,85 @@
+"""
+Пакет изменений синхронизации: изменение, нарушающее ограничения базы,
+отклоняется вместе со своей точкой сохранения, остальные изменения пакета
+применяются. Нужна база PostgreSQL приложения; без нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_sync_mutations.py
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.crud import task as crud_task
+from app.crud.sync import APPLIED, INVALID, apply_mutations
+from app.crud.task_counters import get_counter_values
+from app.db.base import SessionLocal, engine
+from app.db.models.task import Task, TaskType, TaskPriority
+from app.schemas.sync import SyncMutation
+from app.schemas.task import TaskCreate, TaskUpdate
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+
+def new_task(title: str) -> TaskCreate:
+    return TaskCreate(
+        title=title,
+        task_type=TaskType.homework,
+        priority=TaskPriority.current,
+        deadline=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+
+
+# Изменения собираются в обход проверки схемы, чтобы до базы дошли
+# значения, нарушающие ее ограничения
+def create_without_title(task_id: int) -> SyncMutation:
+    # NOT NULL (IntegrityError)
+    task = TaskCreate.model_construct(**{**new_task("-").model_dump(), "title": None})
+    return SyncMutation(op="create_task", client_id="invalid", task=task)
+
+
+def update_with_long_color(task_id: int) -> SyncMutation:
+    # String(7) (DataError)
+    return SyncMutation(op="update_task", task_id=task_id, changes=TaskUpdate.model_construct(color="#12345678"))
+
+
+@pytest.mark.parametrize("invalid", [create_without_title, update_with_long_color])
+def test_invalid_mutation_rejected_others_applied(api_user, invalid):
+    db = SessionLocal()
+    try:
+        existing = crud_task.create_task(db, new_task("существующая"), api_user)
+        mutations = [
+            SyncMutation(op="create_task", client_id="first", task=new_task("первая")),
+            invalid(existing.id),
+            SyncMutation(op="update_task", task_id=existing.id, changes=TaskUpdate(title="переименована")),
+            SyncMutation(op="create_task", client_id="last", task=new_task("последняя")),
+        ]
+
+        results = apply_mutations(db, api_user, mutations)
+
+        assert [result.status for result in results] == [APPLIED, INVALID, APPLIED, APPLIED]
+        db.expire_all()
+        tasks = db.query(Task).filter(Task.user_id == api_user).all()
+        assert sorted(task.title for task in tasks) == ["первая", "переименована", "последняя"]
+        assert all(task.color == "#3B82F6" for task in tasks)
+        # Приращения счетчиков отклоненного изменения откатываются вместе с ним
+        assert get_counter_values(db, api_user)["total"] == 3
+    finally:
+        db.close()
+
+
+def test_long_color_is_rejected_by_schema(client, auth_headers):
+    task = {"title": "задача", "task_type": "homework", "priority": "current",
+            "deadline": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(), "color": "#12345678"}
+
+    assert client.post("/api/v1/tasks/", headers=auth_headers, json=task).status_code == 422
+    response = client.post("/api/v1/sync/mutations", headers=auth_headers, json={
+        "mutations": [{"op": "create_task", "client_id": "a", "task": task}]
+    })
+    assert response.status_code == 422
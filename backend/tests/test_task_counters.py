@@ -0,0 +1,84 @@
+"""
+Сверка счетчиков задач не затирает приращения параллельных изменений.
+Нужна база PostgreSQL приложения; без нее тесты пропускаются.
+
+Запуск из каталога backend:
+    python -m pytest tests/test_task_counters.py
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+
+from app.crud import task as crud_task
+from app.crud.task_counters import get_task_counters, reconcile_task_counters
+from app.db.base import SessionLocal, engine
+from app.db.models.task import Task, TaskType, TaskPriority
+from app.schemas.task import TaskCreate
+from benchmarks.dataset import cleanup, seed_users
+
+try:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+except OperationalError:
+    pytest.skip("База данных недоступна", allow_module_level=True)
+
+
+def new_task(title: str) -> TaskCreate:
+    return TaskCreate(
+        title=title,
+        task_type=TaskType.homework,
+        priority=TaskPriority.current,
+        deadline=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+
+
+@pytest.fixture
+def user_id():
+    db = SessionLocal()
+    try:
+        cleanup(db)
+        yield seed_users(db, 1)[0]
+        cleanup(db)
+    finally:
+        db.close()
+
+
+def test_reconcile_waits_for_concurrent_writer(user_id):
+    db = SessionLocal()
+    try:
+        crud_task.create_task(db, new_task("существующая"), user_id)
+    finally:
+        db.close()
+
+    # Изменение задач пользователя еще не зафиксировано
+    writer = SessionLocal()
+    crud_task.create_task(writer, new_task("новая"), user_id, commit=False)
+
+    def reconcile():
+        db = SessionLocal()
+        try:
+            reconcile_task_counters(db, user_id, user_id)
+        finally:
+            db.close()
+
+    reconciler = threading.Thread(target=reconcile)
+    reconciler.start()
+    reconciler.join(timeout=1)
+    # Сверка ждет пользователя, а не считает задачи без новой
+    assert reconciler.is_alive()
+
+    writer.commit()
+    writer.close()
+    reconciler.join(timeout=10)
+    assert not reconciler.is_alive()
+
+    db = SessionLocal()
+    try:
+        total = db.query(func.count(Task.id)).filter(Task.user_id == user_id).scalar()
+        assert total == 2
+        assert get_task_counters(db, user_id).total == total
+    finally:
+        db.close()